@@ -0,0 +1,126 @@
+#for usage cd to the repo root and python scripts/bench_render.py [--items 1000] [--terraform]
+import argparse
+import copy
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+import render
+import toolchain
+from deploy import render_run_dir
+
+def synthetic_config(items: int) -> dict:
+    """Build a config with `items` list entries spread over firewall rules, IAM members, buckets and secrets."""
+    firewall = items * 2 // 5
+    iam = items * 3 // 10
+    buckets = items // 5
+    secrets = items - firewall - iam - buckets
+    return {
+        "project_id": "bench-render-0001",
+        "billing_account": "000000-000000-000000",
+        "labels": {"purpose": "bench"},
+        "apis": ["compute.googleapis.com"],
+        "resources": {
+            "vpc": {"name": "bench-vpc"},
+            "firewall_rules": [
+                {"name": f"bench-fw-{i}", "network": "bench-vpc", "ports": [str(1000 + i)], "source_ranges": ["10.0.0.0/8"]}
+                for i in range(firewall)
+            ],
+            "iam": [
+                {"role": "roles/viewer", "member": f"user:bench-{i}@example.com"}
+                for i in range(iam)
+            ],
+            "storage_buckets": [
+                {"name": f"bench-bucket-{i}", "labels": {"index": str(i)}}
+                for i in range(buckets)
+            ],
+            "secrets": [
+                {"name": f"bench-secret-{i}", "value": f"value-{i}"}
+                for i in range(secrets)
+            ],
+        },
+    }
+
+def timed(cmd: List[str], cwd: str) -> float:
+    started = time.perf_counter()
+    subprocess.run(cmd, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+def incremental(label: str, data: dict, build: Callable[[dict], str]) -> dict:
+    """Time a cold render, a re-render of the same config and a re-render after editing one bucket."""
+    render.clear_memo()
+    row = {"renderer": label}
+    edited = copy.deepcopy(data)
+    edited["resources"]["storage_buckets"][0]["labels"]["index"] = "edited"
+    for step, config in (("cold", data), ("unchanged", data), ("one_edit", edited)):
+        before = render.memo_stats()["misses"]
+        started = time.perf_counter()
+        build(config)
+        row[step] = time.perf_counter() - started
+        row[f"{step}_blocks"] = render.memo_stats()["misses"] - before
+    return row
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-item and for_each rendering for a synthetic config.")
+    parser.add_argument("--items", type=int, default=1000, help="Number of list items in the synthetic config (default: 1000)")
+    parser.add_argument("--terraform", action="store_true",
+                        help="Also time terraform init/validate/plan (needs terraform on PATH and GCP credentials for plan)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated run directories")
+    args = parser.parse_args(sys.argv[1:])
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(script_dir)
+    data = synthetic_config(args.items)
+    # Run dirs live under .tf-runs so module sources resolve like a real deploy
+    bench_root = tempfile.mkdtemp(prefix="bench-", dir=os.path.join(project_root, ".tf-runs"))
+
+    print(f"[INFO] Synthetic config with {args.items} items -> {bench_root}")
+    rows = []
+    try:
+        for mode in ("per-item", "for_each"):
+            run_dir = os.path.join(bench_root, mode)
+            os.makedirs(run_dir)
+            started = time.perf_counter()
+            tfvars_path = render_run_dir(run_dir, project_root, data, project_exists=False, for_each=(mode == "for_each"))
+            row = {"mode": mode, "render": time.perf_counter() - started}
+            with open(os.path.join(run_dir, "main.tf"), "r", encoding="utf-8") as f:
+                main_tf = f.read()
+            row["module_calls"] = main_tf.count("\nmodule \"") + main_tf.startswith("module \"")
+            row["main_tf_kb"] = len(main_tf.encode("utf-8")) / 1024
+            if args.terraform:
+                row["init"] = timed([toolchain.command("terraform"), "init", "-input=false", "-backend=false"], run_dir)
+                row["validate"] = timed([toolchain.command("terraform"), "validate"], run_dir)
+                row["plan"] = timed([toolchain.command("terraform"), "plan", "-input=false", "-lock=false", "-refresh=false", "-var-file", tfvars_path], run_dir)
+            rows.append(row)
+    finally:
+        if not args.keep:
+            shutil.rmtree(bench_root, ignore_errors=True)
+
+    columns = ["mode", "module_calls", "main_tf_kb", "render"] + (["init", "validate", "plan"] if args.terraform else [])
+    print("\n" + " | ".join(f"{c:>12}" for c in columns))
+    for row in rows:
+        cells = []
+        for c in columns:
+            value = row[c]
+            cells.append(f"{value:>12.3f}" if isinstance(value, float) else f"{value:>12}")
+        print(" | ".join(cells))
+    print("\n(times in seconds)")
+
+    # Per-resource memo: only blocks whose resource changed are rendered again
+    run_dir = os.path.join(project_root, ".tf-runs", "bench-incremental")
+    rows = [
+        incremental("modules", data, lambda config: render.build_module_blocks(run_dir, project_root, config)),
+        incremental("inline", data, lambda config: render.inline_resources(config["resources"])),
+    ]
+    columns = ["renderer", "cold", "cold_blocks", "unchanged", "unchanged_blocks", "one_edit", "one_edit_blocks"]
+    print("\n" + " | ".join(f"{c:>16}" for c in columns))
+    for row in rows:
+        print(" | ".join(f"{row[c]:>16.4f}" if isinstance(row[c], float) else f"{row[c]:>16}" for c in columns))
+    print("\n(times in seconds; *_blocks = blocks rendered, the rest came from the memo)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#for usage import from the GUI (Configuration Manager, deploy and destroy pickers); index kept in .tf-runs/.config-index.json
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from render import MODULE_TYPES, type_items
+
+INDEX_VERSION = 2
+JOURNAL_FILE = "deploy-journal.json"  # deploy.py's per-project phase journal, in .tf-runs/<project_id>/
+# libyaml's loader when PyYAML has it: several hundred configs parse in a fraction of the time
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+def resource_counts(resources: dict) -> Dict[str, int]:
+    """Items per resource type, counted the way the renderer reads them (vpc: {...} counts under vpcs)."""
+    counts: Dict[str, int] = {}
+    known = set()
+    for spec in MODULE_TYPES:
+        known.update((spec["key"], spec.get("single_key")))
+        if isinstance(resources.get(spec["key"]), list) or spec.get("single_key") in resources:
+            count = len(type_items(resources, spec))
+            if count:
+                counts[spec["key"]] = count
+    # Lists the renderer has no module for still show up in the manager
+    counts.update((key, len(value)) for key, value in resources.items() if key not in known and isinstance(value, list) and value)
+    return counts
+
+class ConfigCatalog:
+    """project_id, resource counts per type, content hash and last deploy of every YAML in configs/.
+
+    Entries are keyed by file name and reused while the file's mtime and size are unchanged, so
+    refresh() only stats the directory and parses what was added or edited; the index is saved
+    to .tf-runs/.config-index.json and survives restarts. The last deploy comes from the project's
+    deploy journal (also cached by mtime), or from a GUI job if one is newer (see set_jobs()).
+    """
+
+    def __init__(self, configs_dir: str, project_root: str):
+        self.configs_dir = configs_dir
+        self.project_root = project_root
+        self.index_path = os.path.join(project_root, ".tf-runs", ".config-index.json")
+        self.lock = threading.Lock()
+        self.entries: Dict[str, dict] = {}
+        self.jobs: Dict[str, dict] = {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.entries = data.get("configs", {})
+        except (OSError, ValueError):
+            pass
+
+    def save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "configs": self.entries}, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            pass  # still cached in-process
+
+    def parse(self, path: str, stat: os.stat_result) -> dict:
+        with open(path, "rb") as f:
+            content = f.read()
+        entry = {"mtime": stat.st_mtime, "size": stat.st_size, "hash": hashlib.sha256(content).hexdigest(),
+                 "project_id": "", "resources": {}, "apis": 0, "error": ""}
+        try:
+            data = yaml.load(content, Loader=YAML_LOADER) or {}
+            if not isinstance(data, dict):
+                raise ValueError("top level is not a mapping")
+            apis = data.get("apis") or []
+            resources = data.get("resources") or {}
+            if not isinstance(apis, list):
+                raise ValueError("apis is not a list")
+            if not isinstance(resources, dict):
+                raise ValueError("resources is not a mapping")
+        except (yaml.YAMLError, ValueError) as e:
+            entry["error"] = str(e).splitlines()[0]
+            return entry
+        entry["project_id"] = str(data.get("project_id") or "")
+        entry["apis"] = len(apis)
+        entry["resources"] = resource_counts(resources)
+        return entry
+
+    def journal(self, entry: dict) -> None:
+        """Fill entry["journal"] from .tf-runs/<project_id>/deploy-journal.json when that changed."""
+        path = os.path.join(self.project_root, ".tf-runs", entry["project_id"], JOURNAL_FILE) if entry["project_id"] else ""
+        try:
+            mtime = os.stat(path).st_mtime if path else None
+        except OSError:
+            mtime = None
+        cached = entry.get("journal") or {}
+        if cached.get("mtime") == mtime:
+            return
+        phases: Dict[str, str] = {}
+        if mtime is not None:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    phases = json.load(f).get("phases", {})
+            except (OSError, ValueError):
+                pass
+        last = max(phases.items(), key=lambda item: item[1]) if phases else None
+        entry["journal"] = {"mtime": mtime, "applied": phases.get("apply", ""),
+                            "last_phase": last[0] if last else "", "at": last[1] if last else ""}
+
+    def refresh(self) -> "ConfigCatalog":
+        """Re-parse new or changed configs and drop deleted ones; unchanged files cost one stat."""
+        with self.lock:
+            seen = set()
+            changed = False
+            try:
+                listing = [e for e in os.scandir(self.configs_dir)
+                           if e.is_file() and e.name.endswith((".yaml", ".yml"))]
+            except OSError:
+                listing = []
+            for item in listing:
+                seen.add(item.name)
+                stat = item.stat()
+                entry = self.entries.get(item.name)
+                if entry is None or entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+                    try:
+                        entry = self.parse(item.path, stat)
+                    except OSError:
+                        continue
+                    self.entries[item.name] = entry
+                    changed = True
+                journal = entry.get("journal")
+                self.journal(entry)
+                changed = changed or entry.get("journal") != journal
+            for name in set(self.entries) - seen:
+                del self.entries[name]
+                changed = True
+            if changed:
+                self.save()
+        return self
+
+    def set_jobs(self, latest: Dict[str, dict]) -> None:
+        """Latest GUI deploy job per config name ({"status", "ended_at"/"created_at"}), for last_deploy()."""
+        self.jobs = latest
+
+    def last_deploy(self, name: str) -> Tuple[str, str]:
+        """(status, UTC timestamp) of the newest deploy of a config, or ("", "") if there was none."""
+        entry = self.entries.get(name) or {}
+        journal = entry.get("journal") or {}
+        found = ("applied", journal["applied"]) if journal.get("applied") else (
+            (f"{journal['last_phase']} only", journal["at"]) if journal.get("last_phase") else ("", ""))
+        job = self.jobs.get(name)
+        if job:
+            ts = job.get("ended_at") or job.get("created_at")
+            at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)) if ts else ""
+            if at >= found[1]:
+                found = (f"GUI {job['status']}", at)
+        return found
+
+    def names(self) -> List[str]:
+        return sorted(self.entries)
+
+    def get(self, name: str) -> Optional[dict]:
+        return self.entries.get(name)
+
+    def resource_types(self) -> List[str]:
+        return sorted({t for entry in self.entries.values() for t in entry["resources"]})
+
+    def query(self, search: str = "", resource_type: str = "", deployed: Optional[bool] = None,
+              limit: int = 25, offset: int = 0) -> Tuple[List[Tuple[str, dict]], int]:
+        """One page of (name, entry) sorted by name, and the number matching: search is a
+        case-insensitive substring of the name or project_id; deployed filters on last_deploy()."""
+        needle = search.lower()
+        matches = []
+        for name in sorted(self.entries):
+            entry = self.entries[name]
+            if needle and needle not in name.lower() and needle not in entry["project_id"].lower():
+                continue
+            if resource_type and not entry["resources"].get(resource_type):
+                continue
+            if deployed is not None and bool(self.last_deploy(name)[0]) != deployed:
+                continue
+            matches.append((name, entry))
+        return matches[offset:offset + limit], len(matches)
@@ -1,10 +1,21 @@
 #for usage cd to this location and python deploy.py ../configs/example-project.yaml
+import argparse
+import contextlib
+import hashlib
 import yaml
 import json
 import subprocess
 import sys
 import os
-from typing import List
+import re
+from datetime import datetime, timezone
+from typing import IO, List, Optional
+
+import telemetry
+import toolchain
+from profiling import Profiler
+from render import (MODULE_TYPES, build_module_blocks, build_module_items, condition_label, keyed_items, module_address,
+                    rel, renderer_digest, type_items)
 
 def yaml_to_dict(yaml_file: str) -> dict:
     with open(yaml_file, "r") as f:
@@ -16,11 +27,12 @@ def write_tfvars_json(data: dict, target_path: str) -> str:
     print(f"[INFO] Wrote tfvars -> {target_path}")
     return target_path
 
-def rel(from_dir: str, to_path: str) -> str:
-    return os.path.relpath(to_path, start=from_dir).replace("\\", "/")
+def write_minimal_root_tf(run_dir: str, module_source_rel: str, include_project_module: bool, create_project: bool, for_each: bool = False) -> None:
+    """Create minimal Terraform root files in run_dir. Optionally include the project module.
 
-def write_minimal_root_tf(run_dir: str, module_source_rel: str, include_project_module: bool, create_project: bool) -> None:
-    """Create minimal Terraform root files in run_dir. Optionally include the project module."""
+    for_each=True also declares `module_items`, the name-keyed map consumed by
+    the for_each module calls from build_module_blocks.
+    """
     required = (
         "terraform {\n"
         "  required_providers {\n"
@@ -86,614 +98,259 @@ def write_minimal_root_tf(run_dir: str, module_source_rel: str, include_project_
         "  default     = []\n"
         "}\n"
     )
+    if for_each:
+        variables += (
+            "\n"
+            "variable \"module_items\" {\n"
+            "  description = \"Per-type maps of module arguments keyed by resource name (for_each rendering)\"\n"
+            "  type        = any\n"
+            "  default     = {}\n"
+            "}\n"
+        )
 
     with open(os.path.join(run_dir, "main.tf"), "w", encoding="utf-8") as f:
         f.write(required)
     with open(os.path.join(run_dir, "variables.tf"), "w", encoding="utf-8") as f:
         f.write(variables)
 
-def build_module_blocks(run_dir: str, project_root: str, data: dict) -> str:
-    resources = data.get("resources", {}) or {}
-    blocks: List[str] = []
-    # Track modules created to wire dependencies
-    subnet_name_to_module: dict = {}
-    vpc_connector_name_to_module: dict = {}
-
-    def mod_source(name: str) -> str:
-        return rel(run_dir, os.path.join(project_root, "modules", name))
-
-    # Storage buckets
-    for i, b in enumerate(resources.get("storage_buckets", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"storage_bucket_{i}\" {{",
-                f"  source  = \"{mod_source('storage_bucket')}\"",
-                f"  project_id = var.project_id",
-                f"  name        = \"{b['name']}\"",
-                f"  location    = \"{b.get('location', 'US')}\"",
-                f"  uniform_bucket_level_access = {str(b.get('uniform_bucket_level_access', True)).lower()}",
-                f"  enable_versioning = {str(b.get('enable_versioning', False)).lower()}",
-                f"  force_destroy = {str(b.get('force_destroy', False)).lower()}",
-                f"  storage_class = {json.dumps(b.get('storage_class'))}",
-                f"  public_access_prevention = {json.dumps(b.get('public_access_prevention'))}",
-                f"  default_kms_key_name = {json.dumps(b.get('default_kms_key_name'))}",
-                f"  logging = {json.dumps(b.get('logging'))}",
-                f"  cors = {json.dumps(b.get('cors', []))}",
-                f"  lifecycle_rules = {json.dumps(b.get('lifecycle_rules', []))}",
-                f"  retention_policy = {json.dumps(b.get('retention_policy'))}",
-                f"  labels = {json.dumps(b.get('labels', {}))}",
-                f"}}\n",
-            ])
-        )
-
-    # VPC (support single object or list under 'vpc' or 'vpcs')
-    vpc_items: List[dict] = []
-    if "vpc" in resources:
-        if isinstance(resources["vpc"], list):
-            vpc_items.extend([v for v in resources["vpc"] if isinstance(v, dict)])
-        elif isinstance(resources["vpc"], dict):
-            vpc_items.append(resources["vpc"]) 
-    if isinstance(resources.get("vpcs"), list):
-        vpc_items.extend([v for v in resources["vpcs"] if isinstance(v, dict)])
-
-    for i, vpc in enumerate(vpc_items, start=1):
-        module_name = "vpc" if i == 1 else f"vpc_{i}"
-        blocks.append(
-            "\n".join([
-                f"module \"{module_name}\" {{",
-                f"  source  = \"{mod_source('vpc')}\"",
-                f"  project_id   = var.project_id",
-                f"  name         = \"{vpc['name']}\"",
-                f"  routing_mode = \"{vpc.get('routing_mode', 'GLOBAL')}\"",
-                f"  description  = {json.dumps(vpc.get('description'))}",
-                f"  mtu          = {json.dumps(vpc.get('mtu'))}",
-                f"  auto_create_subnetworks = {str(vpc.get('auto_create_subnetworks', False)).lower()}",
-                f"  bgp_best_path_selection_mode = {json.dumps(vpc.get('bgp_best_path_selection_mode'))}",
-                f"  bgp_always_compare_med = {json.dumps(vpc.get('bgp_always_compare_med'))}",
-                f"  bgp_inter_region_cost = {json.dumps(vpc.get('bgp_inter_region_cost'))}",
-                f"  enable_ula_internal_ipv6 = {str(vpc.get('enable_ula_internal_ipv6', False)).lower()}",
-                f"  internal_ipv6_range = {json.dumps(vpc.get('internal_ipv6_range'))}",
-                f"  network_firewall_policy_enforcement_order = {json.dumps(vpc.get('network_firewall_policy_enforcement_order'))}",
-                f"  network_profile = {json.dumps(vpc.get('network_profile'))}",
-                f"  delete_default_routes_on_create = {str(vpc.get('delete_default_routes_on_create', False)).lower()}",
-                f"  resource_manager_tags = {json.dumps(vpc.get('resource_manager_tags', {}))}",
-                f"}}\n",
-            ])
-        )
-
-    # Subnets
-    for i, sn in enumerate(resources.get("subnets", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"subnet_{i}\" {{",
-                f"  source  = \"{mod_source('subnet')}\"",
-                f"  project_id     = var.project_id",
-                f"  name           = \"{sn['name']}\"",
-                f"  region         = \"{sn['region']}\"",
-                f"  ip_cidr_range  = \"{sn['ip_cidr_range']}\"",
-                f"  network        = \"{sn['network']}\"",
-                f"  private_ip_google_access = {str(sn.get('private_ip_google_access', True)).lower()}",
-                f"  purpose        = {json.dumps(sn.get('purpose'))}",
-                f"  description    = {json.dumps(sn.get('description'))}",
-                f"  reserved_internal_range = {json.dumps(sn.get('reserved_internal_range'))}",
-                f"  role           = {json.dumps(sn.get('role'))}",
-                f"  private_ipv6_google_access = {json.dumps(sn.get('private_ipv6_google_access'))}",
-                f"  stack_type     = \"{sn.get('stack_type', 'IPV4_ONLY')}\"",
-                f"  ipv6_access_type = {json.dumps(sn.get('ipv6_access_type'))}",
-                f"  external_ipv6_prefix = {json.dumps(sn.get('external_ipv6_prefix'))}",
-                f"  ip_collection  = {json.dumps(sn.get('ip_collection'))}",
-                f"  allow_subnet_cidr_routes_overlap = {str(sn.get('allow_subnet_cidr_routes_overlap', False)).lower()}",
-                f"  send_secondary_ip_range_if_empty = {str(sn.get('send_secondary_ip_range_if_empty', False)).lower()}",
-                f"  resource_manager_tags = {json.dumps(sn.get('resource_manager_tags', {}))}",
-                f"  secondary_ip_ranges = {json.dumps(sn.get('secondary_ip_ranges', []))}",
-                f"  secondary_ip_range = {json.dumps(sn.get('secondary_ip_range', []))}",
-                f"  log_config     = {json.dumps(sn.get('log_config'))}",
-                f"}}\n",
-            ])
-        )
-        # map subnet name -> module address
-        subnet_name_to_module[sn['name']] = f"module.subnet_{i}"
-
-    # Firewall rules
-    for i, fw in enumerate(resources.get("firewall_rules", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"firewall_{i}\" {{",
-                f"  source  = \"{mod_source('firewall')}\"",
-                f"  project_id = var.project_id",
-                f"  name       = \"{fw['name']}\"",
-                f"  network    = \"{fw['network']}\"",
-                f"  direction  = \"{fw.get('direction', 'INGRESS')}\"",
-                f"  priority   = {int(fw.get('priority', 1000))}",
-                f"  protocol   = \"{fw.get('protocol', 'tcp')}\"",
-                f"  ports      = {json.dumps(fw.get('ports', ['22']))}",
-                f"  source_ranges = {json.dumps(fw.get('source_ranges', ['0.0.0.0/0']))}",
-                f"  source_tags = {json.dumps(fw.get('source_tags', []))}",
-                f"  source_service_accounts = {json.dumps(fw.get('source_service_accounts', []))}",
-                f"  target_tags   = {json.dumps(fw.get('target_tags', []))}",
-                f"  target_service_accounts = {json.dumps(fw.get('target_service_accounts', []))}",
-                f"  destination_ranges      = {json.dumps(fw.get('destination_ranges', []))}",
-                f"  disabled = {str(fw.get('disabled', False)).lower()}",
-                f"  description = {json.dumps(fw.get('description'))}",
-                f"  enable_logging = {str(fw.get('enable_logging', False)).lower()}",
-                f"  log_config = {json.dumps(fw.get('log_config'))}",
-                f"  allows = {json.dumps(fw.get('allows', []))}",
-                f"  denies = {json.dumps(fw.get('denies', []))}",
-                f"}}\n",
-            ])
-        )
-
-    # Service accounts
-    for i, sa in enumerate(resources.get("service_accounts", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"service_account_{i}\" {{",
-                f"  source  = \"{mod_source('service_account')}\"",
-                f"  project_id   = var.project_id",
-                f"  account_id   = \"{sa['account_id']}\"",
-                f"  display_name = {json.dumps(sa.get('display_name'))}",
-                f"  description  = {json.dumps(sa.get('description'))}",
-                f"  disabled     = {str(sa.get('disabled', False)).lower()}",
-                f"  create_ignore_already_exists = {str(sa.get('create_ignore_already_exists', False)).lower()}",
-                f"  roles        = {json.dumps(sa.get('roles', []))}",
-                f"  create_key   = {str(sa.get('create_key', False)).lower()}",
-                f"  key_algorithm = {json.dumps(sa.get('key_algorithm'))}",
-                f"  public_key_type = {json.dumps(sa.get('public_key_type'))}",
-                f"  private_key_type = {json.dumps(sa.get('private_key_type'))}",
-                f"  key_file_path = {json.dumps(sa.get('key_file_path'))}",
-                f"}}\n",
-            ])
-        )
-
-    # IAM
-    for i, ib in enumerate(resources.get("iam", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"iam_{i}\" {{",
-                f"  source  = \"{mod_source('iam')}\"",
-                f"  project_id = var.project_id",
-                f"  iam_type = \"{ib.get('iam_type', 'member')}\"",
-                f"  role    = {json.dumps(ib.get('role'))}",
-                f"  member  = {json.dumps(ib.get('member'))}",
-                f"  members = {json.dumps(ib.get('members', []))}",
-                f"  policy_data = {json.dumps(ib.get('policy_data'))}",
-                f"  service = {json.dumps(ib.get('service'))}",
-                f"  audit_log_configs = {json.dumps(ib.get('audit_log_configs', []))}",
-                f"  condition = {json.dumps(ib.get('condition'))}",
-                f"}}\n",
-            ])
-        )
-
-    # Pub/Sub topics
-    for i, pt in enumerate(resources.get("pubsub_topics", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"pubsub_topic_{i}\" {{",
-                f"  source  = \"{mod_source('pubsub')}\"",
-                f"  project_id = var.project_id",
-                f"  name    = \"{pt['name']}\"",
-                f"  labels  = {json.dumps(pt.get('labels', {}))}",
-                f"  subscriptions = {json.dumps(pt.get('subscriptions', []))}",
-                f"}}\n",
-            ])
-        )
-
-    # Cloud Run
-    for i, cr in enumerate(resources.get("cloud_run_services", []) or [], start=1):
-        lines = [
-            f"module \"cloud_run_{i}\" {{",
-            f"  source   = \"{mod_source('cloud_run')}\"",
-            f"  project_id = var.project_id",
-            f"  name     = \"{cr['name']}\"",
-            f"  location = \"{cr.get('location', 'us-central1')}\"",
-            f"  image    = \"{cr['image']}\"",
-        ]
-        if 'allow_unauthenticated' in cr:
-            lines.append(f"  allow_unauthenticated = {str(bool(cr['allow_unauthenticated'])).lower()}")
-        if 'vpc_connector' in cr and cr['vpc_connector']:
-            lines.append(f"  vpc_connector = \"{cr['vpc_connector']}\"")
-        if 'egress' in cr and cr['egress']:
-            lines.append(f"  egress = \"{cr['egress']}\"")
-        # depends_on wiring to ensure connector exists before Cloud Run
-        dep = None
-        vc_name = cr.get('vpc_connector')
-        if vc_name:
-            # capture module name if it will be created below
-            # will add after connector loop
-            dep = vc_name
-        lines.append("}\n")
-        blocks.append("\n".join(lines))
-
-    # Cloud SQL
-    for i, cs in enumerate(resources.get("cloud_sql_instances", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"cloud_sql_{i}\" {{",
-                f"  source   = \"{mod_source('cloud_sql')}\"",
-                f"  project_id = var.project_id",
-                f"  name             = \"{cs['name']}\"",
-                f"  database_version = \"{cs.get('database_version', 'POSTGRES_14')}\"",
-                f"  region           = \"{cs.get('region', 'us-central1')}\"",
-                f"  tier             = \"{cs.get('tier', 'db-f1-micro')}\"",
-                f"  deletion_protection = {str(cs.get('deletion_protection', False)).lower()}",
-                f"  availability_type = {json.dumps(cs.get('availability_type'))}",
-                f"  disk_size = {json.dumps(cs.get('disk_size'))}",
-                f"  disk_type = {json.dumps(cs.get('disk_type'))}",
-                f"  ipv4_enabled = {str(cs.get('ipv4_enabled', False)).lower()}",
-                f"  private_network = {json.dumps(cs.get('private_network'))}",
-                f"  authorized_networks = {json.dumps(cs.get('authorized_networks', []))}",
-                f"  backup_configuration = {json.dumps(cs.get('backup_configuration'))}",
-                f"  maintenance_window = {json.dumps(cs.get('maintenance_window'))}",
-                f"  database_flags = {json.dumps(cs.get('database_flags', []))}",
-                f"  insights_config = {json.dumps(cs.get('insights_config'))}",
-                f"  kms_key_name = {json.dumps(cs.get('kms_key_name'))}",
-                f"}}\n",
-            ])
-        )
-
-    # Artifact Registry
-    for i, ar in enumerate(resources.get("artifact_repos", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"artifact_registry_{i}\" {{",
-                f"  source   = \"{mod_source('artifact_registry')}\"",
-                f"  project_id = var.project_id",
-                f"  name      = \"{ar['name']}\"",
-                f"  location  = \"{ar.get('location', 'us')}\"",
-                f"  format    = \"{ar.get('format', 'DOCKER')}\"",
-                f"  description = {json.dumps(ar.get('description'))}",
-                f"}}\n",
-            ])
-        )
-
-    # Secret Manager
-    for i, sm in enumerate(resources.get("secrets", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"secret_{i}\" {{",
-                f"  source   = \"{mod_source('secret_manager')}\"",
-                f"  project_id = var.project_id",
-                f"  name    = \"{sm['name']}\"",
-                f"  value   = {json.dumps(sm.get('value', ''))}",
-                f"  replication = {json.dumps(sm.get('replication'))}",
-                f"  additional_versions = {json.dumps(sm.get('additional_versions', []))}",
-                f"}}\n",
-            ])
-        )
-
-    # Cloud DNS
-    for i, dz in enumerate(resources.get("dns_zones", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"dns_zone_{i}\" {{",
-                f"  source   = \"{mod_source('cloud_dns')}\"",
-                f"  project_id = var.project_id",
-                f"  name     = \"{dz['name']}\"",
-                f"  dns_name = \"{dz['dns_name']}\"",
-                f"  description = {json.dumps(dz.get('description'))}",
-                f"  record_sets = {json.dumps(dz.get('record_sets', []))}",
-                f"}}\n",
-            ])
-        )
-
-    # Static IPs (global/regional)
-    for i, ip in enumerate(resources.get("static_ips", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"static_ip_{i}\" {{",
-                f"  source   = \"{mod_source('static_ip')}\"",
-                f"  project_id  = var.project_id",
-                f"  name        = \"{ip['name']}\"",
-                f"  address_type = {json.dumps(ip.get('address_type', 'EXTERNAL'))}",
-                f"  region       = {json.dumps(ip.get('region'))}",
-                f"  network_tier = {json.dumps(ip.get('network_tier'))}",
-                f"  subnetwork   = {json.dumps(ip.get('subnetwork'))}",
-                f"  purpose      = {json.dumps(ip.get('purpose'))}",
-                f"  address      = {json.dumps(ip.get('address'))}",
-                f"  description  = {json.dumps(ip.get('description'))}",
-                f"}}\n",
-            ])
-        )
-
-    # Compute instances (VMs)
-    for i, vm in enumerate(resources.get("compute_instances", []) or [], start=1):
-        depends_lines: List[str] = []
-        vm_subnet = vm.get('subnetwork')
-        if isinstance(vm_subnet, str) and vm_subnet in subnet_name_to_module:
-            # ensure VM waits for the subnet module
-            depends_lines.append(f"  depends_on = [ {subnet_name_to_module[vm_subnet]} ]")
-
-        block_lines = [
-            f"module \"compute_instance_{i}\" {{",
-            f"  source   = \"{mod_source('compute_instance')}\"",
-            f"  project_id   = var.project_id",
-            f"  name         = \"{vm['name']}\"",
-            f"  zone         = \"{vm.get('zone', 'us-central1-a')}\"",
-            f"  machine_type = \"{vm.get('machine_type', 'e2-micro')}\"",
-            f"  image        = \"{vm.get('image', 'debian-cloud/debian-11')}\"",
-            f"  description   = {json.dumps(vm.get('description'))}",
-            f"  labels        = {json.dumps(vm.get('labels', {}))}",
-            f"  metadata      = {json.dumps(vm.get('metadata', {}))}",
-            f"  metadata_startup_script = {json.dumps(vm.get('metadata_startup_script'))}",
-            f"  subnetwork    = {json.dumps(vm.get('subnetwork'))}",
-            f"  network       = {json.dumps(vm.get('network'))}",
-            f"  network_ip    = {json.dumps(vm.get('network_ip'))}",
-            f"  assign_external_ip   = {str(vm.get('assign_external_ip', vm.get('create_public_ip', False))).lower()}",
-            f"  external_network_tier = {json.dumps(vm.get('external_network_tier'))}",
-            f"  allow_stopping_for_update = {str(vm.get('allow_stopping_for_update', True)).lower()}",
-            f"  can_ip_forward  = {str(vm.get('can_ip_forward', False)).lower()}",
-            f"  deletion_protection = {str(vm.get('deletion_protection', False)).lower()}",
-            f"  hostname      = {json.dumps(vm.get('hostname'))}",
-            f"  min_cpu_platform = {json.dumps(vm.get('min_cpu_platform'))}",
-            f"  scheduling_preemptible = {str(vm.get('scheduling_preemptible', False)).lower()}",
-            f"  scheduling_automatic_restart = {str(vm.get('scheduling_automatic_restart', True)).lower()}",
-            f"  scheduling_on_host_maintenance = {json.dumps(vm.get('scheduling_on_host_maintenance'))}",
-            f"  scheduling_provisioning_model  = {json.dumps(vm.get('scheduling_provisioning_model'))}",
-            f"  enable_display = {str(vm.get('enable_display', False)).lower()}",
-            f"  enable_shielded_vm = {str(vm.get('enable_shielded_vm', False)).lower()}",
-            f"  shielded_secure_boot = {str(vm.get('shielded_secure_boot', False)).lower()}",
-            f"  shielded_vtpm = {str(vm.get('shielded_vtpm', True)).lower()}",
-            f"  shielded_integrity_monitoring = {str(vm.get('shielded_integrity_monitoring', True)).lower()}",
-            f"  enable_confidential_compute = {str(vm.get('enable_confidential_compute', False)).lower()}",
-            f"  confidential_instance_type  = {json.dumps(vm.get('confidential_instance_type'))}",
-            f"  guest_accelerators = {json.dumps(vm.get('guest_accelerators', []))}",
-            f"  boot_disk_size_gb = {json.dumps(vm.get('boot_disk_size_gb'))}",
-            f"  boot_disk_type    = {json.dumps(vm.get('boot_disk_type'))}",
-            f"  boot_disk_auto_delete = {str(vm.get('boot_disk_auto_delete', True)).lower()}",
-            f"  boot_disk_labels  = {json.dumps(vm.get('boot_disk_labels', {}))}",
-            f"  service_account_email  = {json.dumps(vm.get('service_account_email'))}",
-            f"  service_account_scopes = {json.dumps(vm.get('service_account_scopes', ["https://www.googleapis.com/auth/cloud-platform"]))}",
-            f"  additional_disks = {json.dumps(vm.get('additional_disks', []))}",
-            f"  advanced_machine_features = {json.dumps(vm.get('advanced_machine_features', {}))}",
-            f"  tags = {json.dumps(vm.get('tags', []))}",
-        ]
-        block_lines.extend(depends_lines)
-        block_lines.append("}\n")
-        blocks.append("\n".join(block_lines))
-
-    # Standalone persistent disks
-    for i, dk in enumerate(resources.get("disks", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"disk_{i}\" {{",
-                f"  source   = \"{mod_source('compute_disk')}\"",
-                f"  project_id = var.project_id",
-                f"  name     = \"{dk['name']}\"",
-                f"  zone     = \"{dk.get('zone', 'us-central1-a')}\"",
-                f"  size_gb  = {int(dk.get('size_gb', 10))}",
-                f"  type     = {json.dumps(dk.get('type', 'pd-standard'))}",
-                f"  image    = {json.dumps(dk.get('image'))}",
-                f"  snapshot = {json.dumps(dk.get('snapshot'))}",
-                f"  labels   = {json.dumps(dk.get('labels', {}))}",
-                f"  kms_key_self_link = {json.dumps(dk.get('kms_key_self_link'))}",
-                f"}}\n",
-            ])
-        )
-
-    # BigQuery datasets
-    for i, ds in enumerate(resources.get("bigquery_datasets", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"bigquery_dataset_{i}\" {{",
-                f"  source    = \"{mod_source('bigquery_dataset')}\"",
-                f"  project_id = var.project_id",
-                f"  dataset_id = \"{ds['dataset_id']}\"",
-                f"  location   = \"{ds.get('location', 'US')}\"",
-                f"  labels     = {json.dumps(ds.get('labels', {}))}",
-                f"}}\n",
-            ])
-        )
-
-    # Cloud Functions (Gen2)
-    for i, fn in enumerate(resources.get("cloud_functions", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"cloud_function_{i}\" {{",
-                f"  source       = \"{mod_source('cloud_functions')}\"",
-                f"  project_id   = var.project_id",
-                f"  name         = \"{fn['name']}\"",
-                f"  location     = \"{fn.get('location', 'us-central1')}\"",
-                f"  description  = {json.dumps(fn.get('description'))}",
-                f"  runtime      = \"{fn['runtime']}\"",
-                f"  entry_point  = \"{fn['entry_point']}\"",
-                f"  source_bucket = \"{fn['source_bucket']}\"",
-                f"  source_object = \"{fn['source_object']}\"",
-                f"  memory       = \"{fn.get('memory', '256M')}\"",
-                f"  timeout_seconds = {int(fn.get('timeout_seconds', 60))}",
-                f"  ingress_settings = \"{fn.get('ingress_settings', 'ALLOW_ALL')}\"",
-                f"  max_instance_count = {int(fn.get('max_instance_count', 1))}",
-                f"}}\n",
-            ])
-        )
-
-    # GKE
-    if gke := resources.get("gke"):
-        blocks.append(
-            "\n".join([
-                f"module \"gke\" {{",
-                f"  source        = \"{mod_source('gke')}\"",
-                f"  project_id    = var.project_id",
-                f"  name          = \"{gke['name']}\"",
-                f"  location      = \"{gke.get('location', 'us-central1')}\"",
-                f"  node_pool_name = \"{gke.get('node_pool_name', 'default-pool')}\"",
-                f"  node_count    = {int(gke.get('node_count', 1))}",
-                f"  machine_type  = \"{gke.get('machine_type', 'e2-standard-2')}\"",
-                f"  labels        = {json.dumps(gke.get('labels', {}))}",
-                f"  tags          = {json.dumps(gke.get('tags', []))}",
-                f"  network       = {json.dumps(gke.get('network'))}",
-                f"  subnetwork    = {json.dumps(gke.get('subnetwork'))}",
-                f"  cluster_secondary_range_name  = {json.dumps(gke.get('cluster_secondary_range_name'))}",
-                f"  services_secondary_range_name = {json.dumps(gke.get('services_secondary_range_name'))}",
-                f"  enable_private_nodes = {str(gke.get('enable_private_nodes', False)).lower()}",
-                f"  master_ipv4_cidr_block = {json.dumps(gke.get('master_ipv4_cidr_block'))}",
-                f"  enable_network_policy = {str(gke.get('enable_network_policy', False)).lower()}",
-                f"  node_auto_scaling = {json.dumps(gke.get('node_auto_scaling'))}",
-                f"  node_labels = {json.dumps(gke.get('node_labels', {}))}",
-                f"  node_taints = {json.dumps(gke.get('node_taints', []))}",
-                f"}}\n",
-            ])
-        )
-
-    # Cloud Router
-    if cr := resources.get("cloud_router"):
-        blocks.append(
-            "\n".join([
-                f"module \"cloud_router\" {{",
-                f"  source    = \"{mod_source('cloud_router')}\"",
-                f"  project_id = var.project_id",
-                f"  name      = \"{cr['name']}\"",
-                f"  region    = \"{cr['region']}\"",
-                f"  network   = \"{cr['network']}\"",
-                f"  asn       = {json.dumps(cr.get('asn'))}",
-                f"  bgp_advertised_ip_ranges = {json.dumps(cr.get('bgp_advertised_ip_ranges', []))}",
-                f"  interfaces = {json.dumps(cr.get('interfaces', []))}",
-                f"  bgp_peers  = {json.dumps(cr.get('bgp_peers', []))}",
-                f"}}\n",
-            ])
-        )
-
-    # Cloud NAT
-    if nat := resources.get("cloud_nat"):
-        blocks.append(
-            "\n".join([
-                f"module \"cloud_nat\" {{",
-                f"  source    = \"{mod_source('cloud_nat')}\"",
-                f"  project_id = var.project_id",
-                f"  name      = \"{nat['name']}\"",
-                f"  region    = \"{nat['region']}\"",
-                f"  router    = \"{nat['router']}\"",
-                f"  nat_ip_allocation = \"{nat.get('nat_ip_allocation', 'AUTO_ONLY')}\"",
-                f"  source_subnetwork_ip_ranges_to_nat = \"{nat.get('source_subnetwork_ip_ranges_to_nat', 'ALL_SUBNETWORKS_ALL_IP_RANGES')}\"",
-                f"}}\n",
-            ])
-        )
-
-    # Memorystore Redis
-    for i, r in enumerate(resources.get("redis_instances", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"redis_{i}\" {{",
-                f"  source    = \"{mod_source('memorystore_redis')}\"",
-                f"  project_id = var.project_id",
-                f"  name       = \"{r['name']}\"",
-                f"  region     = \"{r.get('region', 'us-central1')}\"",
-                f"  tier       = \"{r.get('tier', 'BASIC')}\"",
-                f"  memory_size_gb = {int(r.get('memory_size_gb', 1))}",
-                f"  redis_version  = \"{r.get('redis_version', 'REDIS_6_X')}\"",
-                f"  display_name   = {json.dumps(r.get('display_name'))}",
-                f"  connect_mode   = \"{r.get('connect_mode', 'DIRECT_PEERING')}\"",
-                f"  authorized_network = {json.dumps(r.get('authorized_network'))}",
-                f"  maintenance_policy = {json.dumps(r.get('maintenance_policy'))}",
-                f"  persistence_config = {json.dumps(r.get('persistence_config'))}",
-                f"  labels = {json.dumps(r.get('labels', {}))}",
-                f"}}\n",
-            ])
-        )
+def read_state_modules(run_dir: str) -> dict:
+    """Return {module instance address: [resource attributes]} from the run dir's local state."""
+    try:
+        with open(os.path.join(run_dir, "terraform.tfstate"), "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    modules: dict = {}
+    for res in state.get("resources", []) or []:
+        address = res.get("module")
+        if not address or res.get("mode") != "managed":
+            continue
+        for inst in res.get("instances", []) or []:
+            modules.setdefault(address, []).append(inst.get("attributes") or {})
+    return modules
+
+def state_identities(attributes: List[dict]) -> set:
+    """Names recorded in state for a module's resources (short ids or full resource paths)."""
+    fields = ("name", "account_id", "dataset_id", "secret_id", "repository_id")
+    return {str(a[f]) for a in attributes for f in fields if a.get(f)}
+
+def iam_identity(args: dict) -> tuple:
+    if args["iam_type"] == "member":
+        return ("member", args["role"], args["member"], condition_label(args["condition"]))
+    if args["iam_type"] == "binding":
+        return ("binding", args["role"], frozenset(args["members"]), condition_label(args["condition"]))
+    if args["iam_type"] == "audit_config":
+        return ("audit_config", args["service"])
+    return ("policy",)
+
+def state_iam_identities(attributes: List[dict]) -> set:
+    """iam_identity() of the IAM resources recorded in state (member, binding, audit config or policy)."""
+    identities = set()
+    for a in attributes:
+        if a.get("member"):
+            identities.add(("member", a.get("role"), a["member"], condition_label(a.get("condition"))))
+        elif a.get("members"):
+            identities.add(("binding", a.get("role"), frozenset(a["members"]), condition_label(a.get("condition"))))
+        elif a.get("service"):
+            identities.add(("audit_config", a["service"]))
+        elif a.get("policy_data"):
+            identities.add(("policy",))
+    return identities
+
+def state_holds(spec: dict, args: dict, attributes: List[dict]) -> bool:
+    """Whether a module's resources in state are this item's, judged by what state recorded about them."""
+    if spec["key"] == "iam":
+        return iam_identity(args) in state_iam_identities(attributes)
+    identity = args.get("name") or args.get("account_id") or args.get("dataset_id")
+    names = state_identities(attributes)
+    return bool(identity) and any(n == identity or n.endswith("/" + identity) for n in names)
+
+def build_moved_blocks(run_dir: str, data: dict, for_each: bool) -> str:
+    """Render `moved` blocks that migrate existing state to the current module addresses.
+
+    A module of a resource type that is in state but no longer rendered moves to
+    the item whose identity its resources carry (name, account_id or dataset_id;
+    role, member and condition for IAM). That covers index-based names from older
+    renders (module.subnet_1, module.vpc), per-item and for_each addresses and
+    older key formats. Only state is consulted, so renders that were never applied
+    (declined or plan-only runs) cannot make the mapping stale.
+    """
+    state_modules = read_state_modules(run_dir)
+    if not state_modules:
+        return ""
 
-    # Serverless VPC connectors
-    for i, c in enumerate(resources.get("serverless_vpc_connectors", []) or [], start=1):
-        blocks.append(
-            "\n".join([
-                f"module \"serverless_vpc_connector_{i}\" {{",
-                f"  source    = \"{mod_source('serverless_vpc_connector')}\"",
-                f"  project_id = var.project_id",
-                f"  name       = \"{c['name']}\"",
-                f"  region     = \"{c['region']}\"",
-                f"  network    = \"{c['network']}\"",
-                f"  ip_cidr_range = \"{c['ip_cidr_range']}\"",
-                f"}}\n",
-            ])
-        )
-        vpc_connector_name_to_module[c['name']] = f"module.serverless_vpc_connector_{i}"
-
-    # After defining connectors, append depends_on to Cloud Run blocks that reference one
-    if resources.get("cloud_run_services"):
-        updated_blocks: List[str] = []
-        for block in blocks:
-            if block.startswith("module \"cloud_run_") and "vpc_connector = \"" in block:
-                # extract connector name
-                import re
-                m = re.search(r"vpc_connector = \"([^\"]+)\"", block)
-                if m:
-                    name = m.group(1)
-                    if name in vpc_connector_name_to_module:
-                        # inject depends_on before closing brace
-                        block = block.replace("}\n", f"  depends_on = [ {vpc_connector_name_to_module[name]} ]\n}}\n")
-            updated_blocks.append(block)
-        blocks = updated_blocks
-
-    return "\n".join(blocks)
-
-def run_terraform_in_dir(run_dir: str, tfvars_path: str, project_id: str, has_project_module: bool) -> None:
-    cwd_before = os.getcwd()
+    resources = data.get("resources", {}) or {}
+    moved: List[tuple] = []
+    for spec in MODULE_TYPES:
+        items = keyed_items(resources, spec)
+        targets = {module_address(spec, key, for_each) for key, _ in items}
+        owned = re.compile(rf"^module\.{re.escape(spec['prefix'])}(_|\[|$)")
+        orphans = sorted(address for address in state_modules if owned.match(address) and address not in targets)
+        if not orphans:
+            continue
+        for key, args in items:
+            target = module_address(spec, key, for_each)
+            if target in state_modules:
+                continue
+            # Switching render modes keeps the key, so that address needs no identity check
+            same_key = module_address(spec, key, not for_each)
+            matches = [same_key] if same_key in orphans else [a for a in orphans if state_holds(spec, args, state_modules[a])]
+            if not matches:
+                continue
+            moved.append((matches[0], target))
+            orphans.remove(matches[0])
+
+    return "\n".join(f"moved {{\n  from = {src}\n  to   = {dst}\n}}\n" for src, dst in moved)
+
+JOURNAL_FILE = "deploy-journal.json"
+
+def deploy_config_hash(data: dict, for_each: bool, adoption_manifest) -> str:
+    """Hash of everything that determines what a deploy applies: the config, render flags and the renderer."""
+    payload = json.dumps({"config": data, "for_each": for_each, "adopt": adoption_manifest, "renderer": renderer_digest()},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def load_journal(run_dir: str, config_hash: str, resume: bool) -> dict:
+    """Return the run dir's deploy journal if resuming and it was written for config_hash, else a fresh one."""
+    fresh = {"config_hash": config_hash, "phases": {}}
+    if not resume:
+        return fresh
     try:
-        os.chdir(run_dir)
-        print(f"[INFO] Running Terraform in: {run_dir}")
-        subprocess.run(["terraform", "init"], check=True)
-        # Phase 1: plan project/APIs if module present
-        if has_project_module:
-            print("[INFO] Phase 1: Plan project and APIs (-target=module.project)")
-            subprocess.run([
-                "terraform", "plan",
-                "-target=module.project",
-                "-var-file", tfvars_path,
-            ], check=True)
-        else:
-            print("[INFO] Phase 1: Project exists; skipping targeted plan.")
-        # Phase 2: full plan for remaining resources
-        print("[INFO] Phase 2: Full plan for remaining resources")
-        subprocess.run([
-            "terraform", "plan",
-            "-var-file", tfvars_path,
-        ], check=True)
-
-        # Ask whether to apply for this project
-        # Skip prompt if SKIP_APPLY_PROMPT environment variable is set
-        if os.environ.get("SKIP_APPLY_PROMPT"):
-            auto_answer = os.environ.get("AUTO_APPROVE_ANSWER", "no")
-            print(f"[INFO] Skipping apply prompt (SKIP_APPLY_PROMPT=true); auto-answering '{auto_answer}'.")
-            answer = auto_answer
-        else:
-            answer = input(f"Apply changes for project '{project_id}'? (yes/no): ")
-        
-        if answer.strip().lower() in ("yes", "y"):
-            print("[INFO] Proceeding to apply...")
-            # Phase 1 apply: project and APIs (only if module present)
-            if has_project_module:
+        with open(os.path.join(run_dir, JOURNAL_FILE), "r", encoding="utf-8") as f:
+            journal = json.load(f)
+    except (OSError, ValueError):
+        print("[INFO] Resume: no journal found; running all phases")
+        return fresh
+    if journal.get("config_hash") != config_hash:
+        print("[INFO] Resume: config or renderer changed since the journal was written; running all phases")
+        return fresh
+    done = ", ".join(journal.get("phases", {})) or "none"
+    print(f"[INFO] Resume: completed phases for this config: {done}")
+    return journal
+
+def mark_phase(run_dir: str, journal: dict, phase: str, **extra) -> None:
+    journal["phases"][phase] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    journal.update(extra)
+    path = os.path.join(run_dir, JOURNAL_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(journal, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def run_terraform_in_dir(run_dir: str, tfvars_path: str, project_id: str, has_project_module: bool,
+                         auto_answer: Optional[str] = None, output: Optional[IO[str]] = None,
+                         journal: Optional[dict] = None) -> None:
+    """Init, plan and optionally apply in run_dir.
+
+    auto_answer ("yes"/"no") replaces the interactive apply prompt; output, when
+    given, receives both our log lines and Terraform's output instead of stdout.
+    Runs with cwd=run_dir rather than chdir so several projects can run concurrently.
+    With a journal (see load_journal), each completed phase is recorded and phases
+    the journal already lists are skipped.
+    """
+    out = output or sys.stdout
+
+    def log(message: str) -> None:
+        print(message, file=out, flush=True)
+
+    def done(phase: str) -> bool:
+        if journal is None or phase not in journal["phases"]:
+            return False
+        if phase == "init" and not os.path.isdir(os.path.join(run_dir, ".terraform")):
+            return False
+        log(f"[INFO] Resume: {phase} already completed at {journal['phases'][phase]}; skipping")
+        return True
+
+    def completed(phase: str, **extra) -> None:
+        if journal is not None:
+            mark_phase(run_dir, journal, phase, **extra)
+
+    def terraform(args: List[str], phase: str) -> None:
+        with telemetry.phase(phase):
+            if output is not None:
+                telemetry.run([toolchain.command("terraform"), *args], cwd=run_dir, check=True, stdout=output, stderr=subprocess.STDOUT)
+            else:
+                telemetry.run([toolchain.command("terraform"), *args], cwd=run_dir, check=True)
+
+    log(f"[INFO] Running Terraform in: {run_dir}")
+    if journal is not None and "apply" in journal["phases"]:
+        log(f"[INFO] Resume: apply already completed at {journal['phases']['apply']} for this config; nothing to do.")
+        return
+    if not done("init"):
+        terraform(["init", "-input=false"] if auto_answer is not None else ["init"], "init")
+        completed("init")
+    # Phase 1: plan project/APIs if module present
+    if has_project_module:
+        if not (done("apply_project") or done("plan_project")):
+            log("[INFO] Phase 1: Plan project and APIs (-target=module.project)")
+            terraform(["plan", "-target=module.project", "-var-file", tfvars_path], "plan_project")
+            completed("plan_project")
+    else:
+        log("[INFO] Phase 1: Project exists; skipping targeted plan.")
+    # Phase 2: full plan for remaining resources
+    if not done("plan"):
+        log("[INFO] Phase 2: Full plan for remaining resources")
+        terraform(["plan", "-var-file", tfvars_path], "plan")
+        completed("plan")
+
+    # Ask whether to apply for this project
+    # Skip prompt if SKIP_APPLY_PROMPT environment variable is set
+    if auto_answer is not None:
+        answer = auto_answer
+    elif os.environ.get("SKIP_APPLY_PROMPT"):
+        answer = os.environ.get("AUTO_APPROVE_ANSWER", "no")
+        log(f"[INFO] Skipping apply prompt (SKIP_APPLY_PROMPT=true); auto-answering '{answer}'.")
+    else:
+        answer = input(f"Apply changes for project '{project_id}'? (yes/no): ")
+
+    if answer.strip().lower() in ("yes", "y"):
+        log("[INFO] Proceeding to apply...")
+        # Phase 1 apply: project and APIs (only if module present)
+        if has_project_module and not done("apply_project"):
+            try:
+                terraform(["apply", "-target=module.project", "-var-file", tfvars_path, "-auto-approve"], "apply_project")
+                completed("apply_project")
+            except subprocess.CalledProcessError:
+                telemetry.retry("apply_project")
+                log("[WARN] Targeted apply for project module failed (likely exists). Switching to existing-project mode and continuing.")
+                # Rewrite module block to force create_project=false, then re-plan
                 try:
-                    subprocess.run([
-                        "terraform", "apply",
-                        "-target=module.project",
-                        "-var-file", tfvars_path,
-                        "-auto-approve",
-                    ], check=True)
-                except subprocess.CalledProcessError as e:
-                    print("[WARN] Targeted apply for project module failed (likely exists). Switching to existing-project mode and continuing.")
-                    # Rewrite module block to force create_project=false, then re-plan
-                    try:
-                        main_tf_path = os.path.join(run_dir, "main.tf")
-                        with open(main_tf_path, "r", encoding="utf-8") as mf:
-                            content = mf.read()
-                        if "create_project" in content:
-                            content = content.replace("create_project  = true", "create_project  = false")
-                        else:
-                            content = content.replace("apis            = var.apis\n}", "apis            = var.apis\n  create_project  = false\n}")
-                        with open(main_tf_path, "w", encoding="utf-8") as mf:
-                            mf.write(content)
-                        # Re-plan after switching mode
-                        subprocess.run(["terraform", "plan", "-var-file", tfvars_path], check=True)
-                    except Exception as ee:
-                        print(f"[WARN] Could not rewrite main.tf to disable project creation: {ee}")
-            # Phase 2 apply: remaining resources
-            subprocess.run([
-                "terraform", "apply",
-                "-var-file", tfvars_path,
-                "-auto-approve",
-            ], check=True)
-        else:
-            print(f"[INFO] Skipped apply for project '{project_id}'.")
-    finally:
-        os.chdir(cwd_before)
+                    main_tf_path = os.path.join(run_dir, "main.tf")
+                    with open(main_tf_path, "r", encoding="utf-8") as mf:
+                        content = mf.read()
+                    if "create_project" in content:
+                        content = content.replace("create_project  = true", "create_project  = false")
+                    else:
+                        content = content.replace("apis            = var.apis\n}", "apis            = var.apis\n  create_project  = false\n}")
+                    with open(main_tf_path, "w", encoding="utf-8") as mf:
+                        mf.write(content)
+                    # Re-plan after switching mode
+                    terraform(["plan", "-var-file", tfvars_path], "plan")
+                    # A resumed run must render without the project module, matching this main.tf
+                    completed("apply_project", project_exists=True)
+                except Exception as ee:
+                    log(f"[WARN] Could not rewrite main.tf to disable project creation: {ee}")
+        # Phase 2 apply: remaining resources
+        terraform(["apply", "-var-file", tfvars_path, "-auto-approve"], "apply")
+        completed("apply")
+    else:
+        log(f"[INFO] Skipped apply for project '{project_id}'.")
+
+def project_exists_in_gcloud(project_id: str) -> bool:
+    """Return True if gcloud lists project_id; False if not found or gcloud is unavailable."""
+    try:
+        with telemetry.phase("gcloud_probe"):
+            result = telemetry.run([
+                toolchain.command("gcloud"), "projects", "list",
+                f"--filter=projectId={project_id}",
+                "--format=value(projectId)"
+            ], check=True, capture_output=True, text=True)
+        if result.stdout.strip() == project_id:
+            print(f"[INFO] Project '{project_id}' already exists; will not include project module.")
+            return True
+        print(f"[INFO] Project '{project_id}' not found in gcloud list; will include project module to create it.")
+    except Exception as e:
+        print(f"[WARN] Could not determine project existence via gcloud ({e}); assuming not exists.")
+    return False
 
 def normalize_inputs(argv: List[str]) -> List[str]:
     """Return a list of YAML file paths from argv (can include directories)."""
@@ -714,16 +371,210 @@ def normalize_inputs(argv: List[str]) -> List[str]:
             unique.append(p)
     return unique
 
+def iam_import_targets(a: dict, p: str) -> List[tuple]:
+    # Conditional member/binding ids end with the condition title
+    title = a["condition"].get("title") if isinstance(a.get("condition"), dict) else None
+    suffix = f" {title}" if title else ""
+    if a["iam_type"] == "member":
+        return [("google_project_iam_member.member[0]", f"{p} {a['role']} {a['member']}{suffix}")]
+    if a["iam_type"] == "binding":
+        return [("google_project_iam_binding.binding[0]", f"{p} {a['role']}{suffix}")]
+    if a["iam_type"] == "audit_config":
+        return [("google_project_iam_audit_config.audit_config[0]", f"{p} {a['service']}")]
+    return [("google_project_iam_policy.policy[0]", p)]
+
+def static_ip_import_targets(a: dict, p: str) -> List[tuple]:
+    if a["region"]:
+        return [("google_compute_address.ip_regional[0]", f"projects/{p}/regions/{a['region']}/addresses/{a['name']}")]
+    return [("google_compute_global_address.ip_global[0]", f"projects/{p}/global/addresses/{a['name']}")]
+
+# Primary resources inside each module with their import IDs: (args, project_id) -> [(address in module, id)].
+# Secondary resources (secret versions, role grants, record sets) are left for Terraform to create.
+IMPORT_TARGETS = {
+    "storage_buckets": lambda a, p: [("google_storage_bucket.bucket", f"{p}/{a['name']}")],
+    "vpcs": lambda a, p: [("google_compute_network.vpc", f"projects/{p}/global/networks/{a['name']}")],
+    "subnets": lambda a, p: [("google_compute_subnetwork.subnet", f"projects/{p}/regions/{a['region']}/subnetworks/{a['name']}")],
+    "firewall_rules": lambda a, p: [("google_compute_firewall.rules", f"projects/{p}/global/firewalls/{a['name']}")],
+    "service_accounts": lambda a, p: [("google_service_account.sa", f"projects/{p}/serviceAccounts/{a['account_id']}@{p}.iam.gserviceaccount.com")],
+    "iam": iam_import_targets,
+    "pubsub_topics": lambda a, p: [("google_pubsub_topic.topic", f"projects/{p}/topics/{a['name']}")],
+    "cloud_run_services": lambda a, p: [("google_cloud_run_service.service", f"locations/{a['location']}/namespaces/{p}/services/{a['name']}")],
+    "cloud_sql_instances": lambda a, p: [("google_sql_database_instance.instance", f"projects/{p}/instances/{a['name']}")],
+    "artifact_repos": lambda a, p: [("google_artifact_registry_repository.repo", f"projects/{p}/locations/{a['location']}/repositories/{a['name']}")],
+    "secrets": lambda a, p: [("google_secret_manager_secret.secret", f"projects/{p}/secrets/{a['name']}")],
+    "dns_zones": lambda a, p: [("google_dns_managed_zone.zone", f"projects/{p}/managedZones/{a['name']}")],
+    "static_ips": static_ip_import_targets,
+    "compute_instances": lambda a, p: [("google_compute_instance.vm", f"projects/{p}/zones/{a['zone']}/instances/{a['name']}")],
+    "disks": lambda a, p: [("google_compute_disk.disk", f"projects/{p}/zones/{a['zone']}/disks/{a['name']}")],
+    "bigquery_datasets": lambda a, p: [("google_bigquery_dataset.dataset", f"projects/{p}/datasets/{a['dataset_id']}")],
+    "cloud_functions": lambda a, p: [("google_cloudfunctions2_function.function", f"projects/{p}/locations/{a['location']}/functions/{a['name']}")],
+    "gke_clusters": lambda a, p: [
+        ("google_container_cluster.cluster", f"projects/{p}/locations/{a['location']}/clusters/{a['name']}"),
+        ("google_container_node_pool.pool", f"projects/{p}/locations/{a['location']}/clusters/{a['name']}/nodePools/{a['node_pool_name']}"),
+    ],
+    "cloud_routers": lambda a, p: [("google_compute_router.router", f"projects/{p}/regions/{a['region']}/routers/{a['name']}")],
+    "cloud_nats": lambda a, p: [("google_compute_router_nat.nat", f"projects/{p}/regions/{a['region']}/routers/{a['router']}/{a['name']}")],
+    "redis_instances": lambda a, p: [("google_redis_instance.redis", f"projects/{p}/locations/{a['region']}/instances/{a['name']}")],
+    "serverless_vpc_connectors": lambda a, p: [("google_vpc_access_connector.connector", f"projects/{p}/locations/{a['region']}/connectors/{a['name']}")],
+}
+
+def load_adoption_manifest(path: str) -> dict:
+    """Load the existing-resources manifest: {resources key: [item keys] or "*"}.
+
+    Keys are the YAML list names (storage_buckets, firewall_rules, iam, gke_clusters, ...;
+    the single-object keys vpc, gke, cloud_router and cloud_nat are accepted too). Items are matched by name, account_id,
+    dataset_id, or '<iam_type>:<role>:<member>' for IAM.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = yaml.safe_load(f) or {}
+    if manifest == "*":
+        return {spec["key"]: "*" for spec in MODULE_TYPES}
+    if not isinstance(manifest, dict):
+        raise ValueError(f"Adoption manifest must be a mapping of resource type -> names: {path}")
+    for spec in MODULE_TYPES:
+        if spec.get("single_key") in manifest:
+            manifest.setdefault(spec["key"], manifest.pop(spec["single_key"]))
+    known = {spec["key"] for spec in MODULE_TYPES}
+    unknown = sorted(set(manifest) - known)
+    if unknown:
+        raise ValueError(f"Unknown resource type(s) in adoption manifest: {', '.join(unknown)}")
+    return manifest
+
+def build_import_blocks(data: dict, existing: dict, for_each: bool) -> tuple:
+    """Return (import blocks HCL, report) for every rendered item listed in `existing`.
+
+    The report maps each resource type to {"import": [...], "create": [...],
+    "not_in_yaml": [...]} so callers can show what was matched.
+    """
+    resources = data.get("resources", {}) or {}
+    project_id = data["project_id"]
+    blocks: List[str] = []
+    report: dict = {}
+    for spec in MODULE_TYPES:
+        wanted = existing.get(spec["key"]) or []
+        items = keyed_items(resources, spec)
+        if not items and not wanted:
+            continue
+        wanted_keys = {key for key, _ in items} if wanted == "*" else {str(k) for k in wanted}
+        entry = {"import": [], "create": [], "not_in_yaml": []}
+        for key, args in items:
+            if key not in wanted_keys:
+                entry["create"].append(key)
+                continue
+            entry["import"].append(key)
+            address = module_address(spec, key, for_each)
+            for resource_addr, import_id in IMPORT_TARGETS[spec["key"]](args, project_id):
+                blocks.append(f"import {{\n  to = {address}.{resource_addr}\n  id = {json.dumps(import_id)}\n}}\n")
+        entry["not_in_yaml"] = sorted(wanted_keys - {key for key, _ in items})
+        report[spec["key"]] = entry
+    return "\n".join(blocks), report
+
+def print_adoption_report(report: dict) -> None:
+    print("[INFO] Adoption report:")
+    print(f"       {'resource type':<28} {'import':>7} {'create':>7} {'unmatched':>10}")
+    for type_key, entry in report.items():
+        print(f"       {type_key:<28} {len(entry['import']):>7} {len(entry['create']):>7} {len(entry['not_in_yaml']):>10}")
+    for type_key, entry in report.items():
+        for key in entry["not_in_yaml"]:
+            print(f"[WARN]   {type_key} '{key}' is listed as existing but not defined in the YAML; ignoring")
+
+def render_run_dir(run_dir: str, project_root: str, data: dict, project_exists: bool, for_each: bool = False) -> str:
+    """Write main.tf, variables.tf and terraform.tfvars.json for one project. Returns the tfvars path."""
+    module_source_rel = rel(run_dir, os.path.join(project_root, "modules", "project"))
+    write_minimal_root_tf(run_dir, module_source_rel, include_project_module=not project_exists, create_project=not project_exists, for_each=for_each)
+
+    # Append resource modules based on YAML
+    modules_hcl = build_module_blocks(run_dir, project_root, data, for_each=for_each)
+    if modules_hcl.strip():
+        with open(os.path.join(run_dir, "main.tf"), "a", encoding="utf-8") as f:
+            f.write("\n\n# Additional resources from YAML\n")
+            f.write(modules_hcl)
+
+    # Migrate existing state to the current addresses
+    moved_hcl = build_moved_blocks(run_dir, data, for_each)
+    moved_path = os.path.join(run_dir, "moved.tf")
+    if moved_hcl:
+        with open(moved_path, "w", encoding="utf-8") as f:
+            f.write("# Generated by deploy.py: state address migrations\n")
+            f.write(moved_hcl)
+        print(f"[INFO] Wrote {moved_hcl.count('moved {')} moved block(s) -> {moved_path}")
+    elif os.path.exists(moved_path):
+        os.remove(moved_path)
+
+    # Write tfvars.json into run_dir
+    tfvars = dict(data)
+    if for_each:
+        tfvars["module_items"] = build_module_items(data)
+    tfvars_path = os.path.join(run_dir, "terraform.tfvars.json")
+    write_tfvars_json(tfvars, tfvars_path)
+    return tfvars_path
+
+def deploy_project(args: argparse.Namespace, yaml_file: str, data: dict, run_dir: str, project_root: str,
+                   adoption_manifest: Optional[dict]) -> None:
+    project_id = data["project_id"]
+    resources = data.get("resources") or {}
+    telemetry.set_attributes({"config.path": yaml_file, "render.for_each": args.for_each, "adopt": adoption_manifest is not None})
+    counts = {spec["key"]: len(type_items(resources, spec)) for spec in MODULE_TYPES}
+    telemetry.resource_counts(project_id, {k: n for k, n in counts.items() if n})
+
+    journal = load_journal(run_dir, deploy_config_hash(data, args.for_each, adoption_manifest), args.resume)
+    # Detect if project exists to decide whether to include project module
+    if "gcloud_probe" in journal["phases"]:
+        project_exists = bool(journal.get("project_exists"))
+        print(f"[INFO] Resume: using recorded project existence ({project_exists}); skipping gcloud probe")
+    else:
+        project_exists = project_exists_in_gcloud(project_id)
+        mark_phase(run_dir, journal, "gcloud_probe", project_exists=project_exists)
+
+    try:
+        with telemetry.phase("render"):
+            tfvars_path = render_run_dir(run_dir, project_root, data, project_exists, for_each=args.for_each)
+        if adoption_manifest is not None:
+            imports_hcl, report = build_import_blocks(data, adoption_manifest, args.for_each)
+            with open(os.path.join(run_dir, "imports.tf"), "w", encoding="utf-8") as f:
+                f.write("# Generated by deploy.py --adopt: existing resources to import\n")
+                f.write(imports_hcl)
+            with open(os.path.join(run_dir, "adoption-report.json"), "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"[INFO] Wrote {imports_hcl.count('import {')} import block(s) -> {os.path.join(run_dir, 'imports.tf')}")
+            print_adoption_report(report)
+            print(f"[INFO] Per-item details -> {os.path.join(run_dir, 'adoption-report.json')}")
+    except KeyError as e:
+        print(f"[ERROR] Required field {e} missing from a resource in {yaml_file}")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"[ERROR] Could not render {yaml_file}: {e}")
+        sys.exit(1)
+
+    telemetry.set_attributes({"project.exists": project_exists})
+    # Execute terraform plan, then optionally apply for this run
+    run_terraform_in_dir(run_dir, tfvars_path, project_id, has_project_module=not project_exists, journal=journal)
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Render YAML configs into .tf-runs/<project_id> and run Terraform.")
+    parser.add_argument("paths", nargs="*", help="YAML files or directories (default: configs/example-project.yaml)")
+    parser.add_argument("--for-each", action="store_true",
+                        help="Emit one for_each module call per resource type instead of one module per item")
+    parser.add_argument("--adopt", metavar="MANIFEST",
+                        help="YAML/JSON listing resources that already exist in GCP; generates import blocks so one plan/apply adopts them")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip phases the run dir's deploy journal records as completed for the same config")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write a CPU profile, peak memory and subprocess timings per project to .tf-runs/<project_id>/profile/")
+    return parser.parse_args(argv)
+
 def main():
+    args = parse_args(sys.argv[1:])
+    telemetry.start("deploy")
     # Determine input YAML files
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
 
     input_paths: List[str]
-    if len(sys.argv) <= 1:
+    if not args.paths:
         input_paths = [os.path.join(project_root, "configs", "example-project.yaml")]
     else:
-        input_paths = normalize_inputs(sys.argv[1:])
+        input_paths = normalize_inputs(args.paths)
 
     # Validate inputs
     yaml_files: List[str] = []
@@ -742,12 +593,24 @@ def main():
         print("[ERROR] No YAML files provided.")
         sys.exit(1)
 
+    adoption_manifest = None
+    if args.adopt:
+        try:
+            adoption_manifest = load_adoption_manifest(args.adopt)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            print(f"[ERROR] Could not load adoption manifest: {e}")
+            sys.exit(1)
+        if toolchain.has_capability("terraform", "import_blocks") is False:
+            print(f"[ERROR] --adopt needs Terraform >= 1.5 for import blocks; found {toolchain.resolve('terraform')['version']}")
+            sys.exit(1)
+
     runs_root = os.path.join(project_root, ".tf-runs")
     os.makedirs(runs_root, exist_ok=True)
 
     for idx, yaml_file in enumerate(yaml_files, start=1):
         print(f"\n=== Processing: {yaml_file} ===")
-        data = yaml_to_dict(yaml_file)
+        with telemetry.phase("load_yaml"):
+            data = yaml_to_dict(yaml_file)
         if not isinstance(data, dict):
             print(f"[ERROR] YAML file is empty or invalid: {yaml_file}")
             sys.exit(1)
@@ -760,38 +623,9 @@ def main():
         run_dir = os.path.join(runs_root, project_id)
         os.makedirs(run_dir, exist_ok=True)
 
-        # Detect if project exists to decide whether to include project module
-        module_source_rel = rel(run_dir, os.path.join(project_root, "modules", "project"))
-        project_exists = False
-        try:
-            result = subprocess.run([
-                "gcloud", "projects", "list",
-                f"--filter=projectId={project_id}",
-                "--format=value(projectId)"
-            ], check=True, capture_output=True, text=True)
-            if result.stdout.strip() == project_id:
-                project_exists = True
-                print(f"[INFO] Project '{project_id}' already exists; will not include project module.")
-            else:
-                print(f"[INFO] Project '{project_id}' not found in gcloud list; will include project module to create it.")
-        except Exception as e:
-            print(f"[WARN] Could not determine project existence via gcloud ({e}); assuming not exists.")
-
-        write_minimal_root_tf(run_dir, module_source_rel, include_project_module=not project_exists, create_project=not project_exists)
-
-        # Append resource modules based on YAML
-        modules_hcl = build_module_blocks(run_dir, project_root, data)
-        if modules_hcl.strip():
-            with open(os.path.join(run_dir, "main.tf"), "a", encoding="utf-8") as f:
-                f.write("\n\n# Additional resources from YAML\n")
-                f.write(modules_hcl)
-
-        # Write tfvars.json into run_dir
-        tfvars_path = os.path.join(run_dir, "terraform.tfvars.json")
-        write_tfvars_json(data, tfvars_path)
-
-        # Execute terraform plan, then optionally apply for this run
-        run_terraform_in_dir(run_dir, tfvars_path, project_id, has_project_module=not project_exists)
+        profiler = Profiler("deploy", project_root, project_id) if args.profile else contextlib.nullcontext()
+        with telemetry.project(project_id), profiler:
+            deploy_project(args, yaml_file, data, run_dir, project_root, adoption_manifest)
 
 if __name__ == "__main__":
     main()
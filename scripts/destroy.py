@@ -1,44 +1,102 @@
+import argparse
+import codecs
+import contextlib
+import json
+import math
+import re
 import subprocess
 import os
 import sys
+import threading
+import time
 import yaml
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import IO, Dict, List, Optional, Set, Tuple
 import shutil
 
-USAGE = (
-    "Usage:\n"
-    "  python scripts/destroy.py [--force] <yaml1.yaml> [yaml2.yaml ...]\n"
-    "  python scripts/destroy.py [--force] --project <project_id> [--project <project_id> ...]\n"
-    "Notes: Targets can be one or more YAML files and/or --project ids.\n"
+import telemetry
+import toolchain
+from profiling import Profiler
+
+EPILOG = (
+    "Without --action or --manifest, each project prompts for m (modules), p (project) or e (exit)\n"
+    "and projects are destroyed one after another, each approved once after its destroy waves are\n"
+    "listed (not asked with --force). With either, nothing is asked beyond the\n"
+    "initial confirmation (none with --force), projects are destroyed --jobs at a time, and each\n"
+    "project's output goes to .tf-runs/.destroy-logs/<project_id>-<timestamp>.log.\n"
+    "\n"
+    "Manifest (YAML or JSON): a list of project ids or {project_id, action} entries, or a\n"
+    "mapping of project id to action. Actions: modules (m) or project (p).\n"
 )
+ACTIONS = {"m": "modules", "modules": "modules", "p": "project", "project": "project"}
+
+STATE_FILE = "terraform.tfstate"
+# A state file written this recently (by deploy or a previous destroy) is trusted as-is for the
+# targeted phases, which then skip the refresh; the full destroy always refreshes.
+STATE_FRESH_SECONDS = 15 * 60
+
+# GCP ordering that state does not always record (resources wired by name or id strings rather
+# than references): every resource of a key type is destroyed before the listed types.
+DESTROY_BEFORE: Dict[str, Tuple[str, ...]] = {
+    "google_compute_instance": ("google_compute_subnetwork", "google_compute_network", "google_compute_disk",
+                                "google_compute_address", "google_service_account"),
+    "google_container_node_pool": ("google_container_cluster", "google_service_account"),
+    "google_container_cluster": ("google_compute_subnetwork", "google_compute_network", "google_service_account"),
+    "google_vpc_access_connector": ("google_compute_subnetwork", "google_compute_network"),
+    "google_compute_router_nat": ("google_compute_router", "google_compute_address"),
+    "google_compute_router_peer": ("google_compute_router_interface", "google_compute_router"),
+    "google_compute_router_interface": ("google_compute_router",),
+    "google_compute_router": ("google_compute_network",),
+    "google_compute_forwarding_rule": ("google_compute_address", "google_compute_subnetwork", "google_compute_network"),
+    "google_compute_firewall": ("google_compute_network",),
+    "google_compute_global_address": ("google_compute_network",),
+    "google_redis_instance": ("google_compute_network",),
+    "google_sql_database_instance": ("google_compute_network",),
+    "google_compute_subnetwork": ("google_compute_network",),
+}
+# Destroyed after everything else in the project, in this order (APIs before the project itself)
+DESTROY_LAST = ("google_project_service", "google_project")
+WAVE_RETRIES = 2
+WAVE_RETRY_DELAY = 10
+
+# Deletion verification: projects per `gcloud projects list` call, per-project backoff, and how
+# long to wait for DELETE_REQUESTED before giving up (the run dir is then kept)
+VERIFY_BATCH = 50
+VERIFY_INITIAL_DELAY = 2
+VERIFY_MAX_DELAY = 30
+VERIFY_TIMEOUT = 10 * 60
+VERIFY_COALESCE = 1.0  # projects due within this many seconds share the next poll
+
+# State attribute values that make `terraform destroy` fail, per resource type
+PROTECTION_CHECKS: Dict[str, Tuple[Tuple[str, object, str], ...]] = {
+    "google_compute_instance": (("deletion_protection", True, "destroy fails until it is set to false and applied"),),
+    "google_sql_database_instance": (("deletion_protection", True, "destroy fails until it is set to false and applied"),),
+    "google_container_cluster": (("deletion_protection", True, "destroy fails until it is set to false and applied"),),
+    "google_bigquery_table": (("deletion_protection", True, "destroy fails until it is set to false and applied"),),
+    "google_storage_bucket": (("force_destroy", False, "destroy fails if the bucket still has objects"),),
+    "google_bigquery_dataset": (("delete_contents_on_destroy", False, "destroy fails if the dataset still has tables"),),
+    "google_project": (("deletion_policy", "PREVENT", "the project cannot be deleted"),),
+}
+
+# Per-resource-type destroy durations from previous runs, used by --preview
+HISTORY_FILE = os.path.join(".tf-runs", ".destroy-history.json")
+HISTORY_ALPHA = 0.3  # weight of the newest sample in the moving average
+WAVE_OVERHEAD = "(wave overhead)"  # history key: wave wall time beyond its slowest resource
+DEFAULT_DESTROY_SECONDS = 30  # estimate for types with no history yet
+TERRAFORM_PARALLELISM = 10  # Terraform's default -parallelism
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+INDEX_KEY = re.compile(r"\[[^\]]*\]")  # [0] / ["key"] in count and for_each addresses
+DESTRUCTION_COMPLETE = re.compile(r"^(\S+): Destruction complete after (?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?")
+_history_lock = threading.Lock()
 
 def resolve_gcloud_bin() -> str:
     """Return path to gcloud binary or empty string if not found.
 
-    Resolution order:
-      1) GCLOUD_BIN env var (explicit path)
-      2) PATH (shutil.which)
-      3) Common Windows installs
+    Resolution (GCLOUD_BIN, then PATH, then common Windows installs) and the
+    version probe are shared with deploy.py and the GUI via toolchain.resolve.
     """
-    # 1) Env var
-    gcb = os.environ.get("GCLOUD_BIN", "").strip().strip('"')
-    if gcb and os.path.exists(gcb):
-        return gcb
-    # 2) PATH
-    found = shutil.which("gcloud")
-    if found:
-        return found
-    # 3) Common Windows paths
-    candidates = [
-        r"C:\\Program Files\\Google\\Cloud SDK\\google-cloud-sdk\\bin\\gcloud.cmd",
-        r"C:\\Program Files\\Google\\Cloud SDK\\google-cloud-sdk\\bin\\gcloud.exe",
-        r"C:\\Program Files (x86)\\Google\\Cloud SDK\\google-cloud-sdk\\bin\\gcloud.cmd",
-        r"C:\\Program Files (x86)\\Google\\Cloud SDK\\google-cloud-sdk\\bin\\gcloud.exe",
-    ]
-    for c in candidates:
-        if os.path.exists(c):
-            return c
-    return ""
+    return toolchain.resolve("gcloud")["path"]
 
 def yaml_to_dict(yaml_file: str) -> dict:
     with open(yaml_file, "r") as f:
@@ -51,48 +109,291 @@ def get_project_id_from_yaml(yaml_path: str) -> str:
         raise ValueError(f"project_id missing in YAML: {yaml_path}")
     return pid
 
-def parse_args(argv: List[str]) -> Tuple[bool, List[str]]:
-    auto_approve = False
-    project_ids: List[str] = []
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Destroy deployed resources (Terraform destroy) or entire GCP projects.",
+        epilog=EPILOG, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("configs", nargs="*", metavar="yaml", help="Project YAML configs to destroy")
+    parser.add_argument("--project", action="append", default=[], metavar="PROJECT_ID",
+                        help="Project id to destroy (repeatable)")
+    parser.add_argument("--force", action="store_true",
+                        help="Skip confirmations and auto-approve Terraform (otherwise each project is approved once, after its destroy waves are listed)")
+    parser.add_argument("--action", choices=sorted(ACTIONS),
+                        help="Action for every target without a manifest entry; disables the per-project prompt")
+    parser.add_argument("--manifest", help="YAML/JSON file listing projects and their actions")
+    parser.add_argument("--jobs", type=int, default=4, help="Projects destroyed concurrently in non-interactive mode (default 4)")
+    parser.add_argument("--preview", action="store_true",
+                        help="Show destroy waves, blockers and time estimates from local state only; destroys nothing")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write CPU/memory/subprocess profiles to .tf-runs/<project_id>/profile/ (runs one project at a time)")
+    return parser.parse_args(argv)
 
-    i = 0
-    while i < len(argv):
-        arg = argv[i]
-        if arg == "--force":
-            auto_approve = True
-            i += 1
-            continue
-        if arg.startswith("--project="):
-            project_ids.append(arg.split("=", 1)[1])
-            i += 1
-            continue
-        if arg == "--project":
-            if i + 1 >= len(argv):
-                raise ValueError("--project requires a value")
-            project_ids.append(argv[i + 1])
-            i += 2
+def load_manifest(path: str) -> List[Tuple[str, Optional[str]]]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or []  # JSON is valid YAML
+    if isinstance(data, dict):
+        data = [{"project_id": pid, "action": action} for pid, action in data.items()]
+    entries: List[Tuple[str, Optional[str]]] = []
+    for n, entry in enumerate(data, start=1):
+        if isinstance(entry, str):
+            entry = {"project_id": entry}
+        pid = (entry or {}).get("project_id")
+        action = entry.get("action") if pid else None
+        if not pid:
+            raise ValueError(f"{path}: entry {n} has no project_id")
+        if action is not None and str(action).lower() not in ACTIONS:
+            raise ValueError(f"{path}: entry {n} ({pid}) has unknown action '{action}'")
+        entries.append((pid, ACTIONS[str(action).lower()] if action is not None else None))
+    return entries
+
+def resolve_targets(args: argparse.Namespace) -> List[Tuple[str, Optional[str]]]:
+    """(project_id, action) per target, deduplicated in order; action is None when it should be asked."""
+    targets: List[Tuple[str, Optional[str]]] = []
+    for path in args.configs:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"YAML not found: {path}")
+        targets.append((get_project_id_from_yaml(path), None))
+    targets.extend((pid, None) for pid in args.project)
+    if args.manifest:
+        targets.extend(load_manifest(args.manifest))
+    if not targets:
+        raise ValueError("No targets provided. Pass YAML files, --project ids or --manifest.")
+
+    default = ACTIONS[args.action] if args.action else ("modules" if args.manifest else None)
+    # Deduplicate while preserving order; an explicit manifest action wins over the default
+    unique: Dict[str, Optional[str]] = {}
+    for pid, action in targets:
+        if unique.get(pid) is None:
+            unique[pid] = action
+    return [(pid, action or default) for pid, action in unique.items()]
+
+def instance_address(resource: dict, index_key=None) -> str:
+    """Address as `terraform state list` prints it, e.g. module.project.google_compute_instance.vm["web"]."""
+    address = f"{resource['module']}." if resource.get("module") else ""
+    if resource.get("mode") == "data":
+        address += "data."
+    address += f"{resource['type']}.{resource['name']}"
+    if index_key is None:
+        return address
+    return f"{address}[{index_key}]" if isinstance(index_key, int) else f"{address}[{json.dumps(index_key)}]"
+
+def load_state_snapshot(run_dir: str, offline: bool = False) -> Dict:
+    """Read the run dir's state once and return its managed resource instances.
+
+    Returns {"resources": [{"address", "type", "base", "dependencies", "protection"}], "serial",
+    "source", "fresh", "age_seconds"}. The local backend's terraform.tfstate is parsed directly;
+    `terraform state pull` is only used when the file is missing or unreadable, and never with
+    offline=True. dependencies are resource addresses without instance keys, as Terraform
+    records them; protection lists PROTECTION_CHECKS hits.
+    """
+    path = os.path.join(run_dir, STATE_FILE)
+    raw, age, source = None, None, "file"
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            age = time.time() - os.path.getmtime(path)
+        except (OSError, ValueError):
+            raw = None
+    if raw is None and offline:
+        raise FileNotFoundError(f"No readable {STATE_FILE} in {run_dir}")
+    if raw is None:
+        source = "state pull"
+        out = telemetry.run([toolchain.command("terraform"), "state", "pull"],
+                            cwd=run_dir, check=True, capture_output=True, text=True).stdout
+        raw = json.loads(out) if out.strip() else {}
+
+    resources = []
+    for resource in raw.get("resources", []):
+        if resource.get("mode") != "managed":
             continue
-        if arg.endswith((".yaml", ".yml")):
-            if not os.path.exists(arg):
-                raise FileNotFoundError(f"YAML not found: {arg}")
-            project_ids.append(get_project_id_from_yaml(arg))
-            i += 1
+        base = instance_address(resource)
+        checks = PROTECTION_CHECKS.get(resource["type"], ())
+        for instance in resource.get("instances", []):
+            attributes = instance.get("attributes") or {}
+            resources.append({
+                "address": instance_address(resource, instance.get("index_key")),
+                "type": resource["type"],
+                "base": base,
+                "dependencies": sorted(set(instance.get("dependencies", []))),
+                "protection": [f"{attr} = {json.dumps(value)}: {note}"
+                               for attr, value, note in checks if attributes.get(attr) == value],
+            })
+    return {
+        "resources": resources,
+        "serial": raw.get("serial"),
+        "source": source,
+        "fresh": age is not None and age < STATE_FRESH_SECONDS,
+        "age_seconds": age,
+    }
+
+def history_path() -> str:
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), HISTORY_FILE)
+
+def load_history() -> Dict[str, dict]:
+    try:
+        with open(history_path(), "r", encoding="utf-8") as f:
+            return json.load(f).get("types", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+def record_history(samples: Dict[str, List[float]]) -> None:
+    """Fold this run's per-type destroy durations (seconds) into the moving averages."""
+    if not samples:
+        return
+    with _history_lock:
+        types = load_history()
+        for resource_type, durations in samples.items():
+            entry = types.setdefault(resource_type, {"samples": 0, "mean_seconds": durations[0], "max_seconds": 0.0})
+            for seconds in durations:
+                entry["mean_seconds"] = round((1 - HISTORY_ALPHA) * entry["mean_seconds"] + HISTORY_ALPHA * seconds, 2)
+                entry["max_seconds"] = max(entry["max_seconds"], seconds)
+                entry["samples"] += 1
+        path = history_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"types": types}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARN] Could not write destroy history: {e}")
+
+def parse_destruction_times(text: str, type_of: Dict[str, str]) -> Dict[str, List[float]]:
+    """resource type -> seconds, from Terraform's "<address>: Destruction complete after 1m5s" lines."""
+    samples: Dict[str, List[float]] = {}
+    for line in ANSI_ESCAPE.sub("", text).splitlines():
+        match = DESTRUCTION_COMPLETE.match(line.strip())
+        if not match:
             continue
-        raise ValueError(f"Unrecognized argument: {arg}\n\n{USAGE}")
+        address = match.group(1)
+        hours, minutes, seconds = (int(g or 0) for g in match.groups()[1:])
+        resource_type = type_of.get(address)
+        if not resource_type:
+            # module.x["k"].google_foo.bar -> google_foo; index keys may themselves contain dots
+            parts = INDEX_KEY.sub("", address).split(".")
+            if len(parts) < 2 or parts[-2] == "module":
+                continue  # not a resource address
+            resource_type = parts[-2]
+        samples.setdefault(resource_type, []).append(hours * 3600 + minutes * 60 + seconds)
+    return samples
+
+def destroy_graph(snapshot: Dict) -> Dict[str, Set[str]]:
+    """address -> addresses that must be destroyed before it (its dependents).
 
-    if not project_ids:
-        raise ValueError(f"No targets provided.\n\n{USAGE}")
+    Combines the dependencies recorded in state with DESTROY_BEFORE and DESTROY_LAST.
+    """
+    by_base: Dict[str, List[str]] = {}
+    by_type: Dict[str, List[str]] = {}
+    for r in snapshot["resources"]:
+        by_base.setdefault(r["base"], []).append(r["address"])
+        by_type.setdefault(r["type"], []).append(r["address"])
+    blocked_by: Dict[str, Set[str]] = {r["address"]: set() for r in snapshot["resources"]}
+    for r in snapshot["resources"]:
+        for dep in r["dependencies"]:
+            for address in by_base.get(dep, []):
+                blocked_by[address].add(r["address"])
+        for later_type in DESTROY_BEFORE.get(r["type"], ()):
+            for address in by_type.get(later_type, []):
+                blocked_by[address].add(r["address"])
+        if r["type"] not in DESTROY_LAST:
+            for last_type in DESTROY_LAST:
+                for address in by_type.get(last_type, []):
+                    blocked_by[address].add(r["address"])
+    for earlier, later in zip(DESTROY_LAST, DESTROY_LAST[1:]):
+        for address in by_type.get(later, []):
+            blocked_by[address].update(by_type.get(earlier, []))
+    for address, dependents in blocked_by.items():
+        dependents.discard(address)
+    return blocked_by
+
+def plan_waves(snapshot: Dict) -> List[List[str]]:
+    """Topological destroy waves: nothing in a wave depends on anything in the same or a later wave.
 
-    # Deduplicate while preserving order
-    seen = set()
-    unique: List[str] = []
-    for pid in project_ids:
-        if pid not in seen:
-            seen.add(pid)
-            unique.append(pid)
-    return auto_approve, unique
+    A dependency cycle (which Terraform itself would reject) ends up as one final wave.
+    """
+    blocked_by = destroy_graph(snapshot)
+    remaining = {address: set(dependents) for address, dependents in blocked_by.items()}
+    waves: List[List[str]] = []
+    while remaining:
+        wave = sorted(address for address, dependents in remaining.items() if not dependents)
+        if not wave:
+            print(f"[WARN] Dependency cycle among {len(remaining)} resource(s); destroying them together")
+            wave = sorted(remaining)
+        for address in wave:
+            del remaining[address]
+        for dependents in remaining.values():
+            dependents.difference_update(wave)
+        waves.append(wave)
+    return waves
 
-def run_destroy_for_project(project_id: str, auto_approve: bool) -> None:
+def format_duration(seconds: float) -> str:
+    seconds = int(math.ceil(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+def preview_project(project_id: str, project_root: str, action: Optional[str]) -> bool:
+    """Print what a destroy of project_id would do, from its local state file alone.
+
+    No Terraform or GCP calls: lists the waves in order with per-resource estimates from
+    .tf-runs/.destroy-history.json and flags resources whose protection settings will make the
+    destroy fail. Returns False when there is no local state to preview.
+    """
+    run_dir = os.path.join(project_root, ".tf-runs", project_id)
+    try:
+        snapshot = load_state_snapshot(run_dir, offline=True)
+    except FileNotFoundError as e:
+        print(f"[ERROR] {project_id}: {e}. Preview needs the run dir's local state (deploy first).")
+        return False
+    history = load_history()
+    waves = plan_waves(snapshot)
+    by_address = {r["address"]: r for r in snapshot["resources"]}
+    overhead = history.get(WAVE_OVERHEAD, {}).get("mean_seconds", 0.0)
+
+    def estimate(resource_type: str) -> float:
+        return history[resource_type]["mean_seconds"] if resource_type in history else DEFAULT_DESTROY_SECONDS
+
+    age = format_duration(snapshot["age_seconds"]) if snapshot["age_seconds"] is not None else "?"
+    print(f"\n=== Destroy preview: {project_id} (state serial {snapshot['serial']}, "
+          f"{len(snapshot['resources'])} resource(s), {STATE_FILE} written {age} ago) ===")
+    total = 0.0
+    for n, wave in enumerate(waves, start=1):
+        times = [estimate(by_address[a]["type"]) for a in wave]
+        # Terraform runs up to TERRAFORM_PARALLELISM destroys at once within a wave
+        wave_seconds = max(max(times), sum(times) / TERRAFORM_PARALLELISM) + overhead
+        total += wave_seconds
+        print(f"Wave {n}/{len(waves)}  ~{format_duration(wave_seconds)}  {len(wave)} resource(s)")
+        for address, seconds in zip(wave, times):
+            flag = "  [BLOCKS]" if by_address[address]["protection"] else ""
+            print(f"    {'~' + format_duration(seconds):>7}  {address}{flag}")
+    if not waves:
+        print("State is empty; Terraform has nothing to destroy")
+    print("Then: untargeted terraform destroy as a sweep, only if anything is left in state")
+    if action == "project":
+        print("Then: billing unlink and gcloud projects delete, confirmed in the background before the run dir is removed")
+    elif action is None:
+        print("Project deletion only if 'p' is chosen at the prompt")
+
+    blockers = [(r["address"], note) for r in snapshot["resources"] for note in r["protection"]]
+    for address, note in blockers:
+        print(f"[WARN] {address}: {note}")
+    unknown = sorted({r["type"] for r in snapshot["resources"] if r["type"] not in history})
+    print(f"[INFO] Estimated Terraform time: ~{format_duration(total)}"
+          + (f" ({len(unknown)} type(s) without history counted at {DEFAULT_DESTROY_SECONDS}s each: {', '.join(unknown)})" if unknown else ""))
+    if blockers:
+        print(f"[WARN] {len(blockers)} resource(s) will block this destroy as configured")
+    return True
+
+def run_destroy_for_project(project_id: str, auto_approve: bool, output: Optional[IO[str]] = None) -> None:
+    """Destroy everything in .tf-runs/<project_id>'s state.
+
+    output, when given, receives our log lines and Terraform's output instead of stdout.
+    Runs Terraform with cwd=run_dir rather than chdir so several projects can run concurrently.
+    """
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
     run_dir = os.path.join(project_root, ".tf-runs", project_id)
@@ -103,97 +404,396 @@ def run_destroy_for_project(project_id: str, auto_approve: bool) -> None:
     if not os.path.exists(tfvars):
         raise FileNotFoundError(f"tfvars not found: {tfvars}. Deploy first.")
 
-    cwd_before = os.getcwd()
-    try:
-        os.chdir(run_dir)
-        print(f"[INFO] Destroying project '{project_id}' in: {run_dir}")
+    out = output or sys.stdout
 
-        def terraform_state_list() -> List[str]:
-            try:
-                out = subprocess.check_output(["terraform", "state", "list"], text=True)
-                return [line.strip() for line in out.splitlines() if line.strip()]
-            except subprocess.CalledProcessError:
-                return []
+    def log(message: str) -> None:
+        print(message, file=out, flush=True)
 
-        def destroy_targets(addresses: List[str]) -> None:
-            if not addresses:
-                return
-            cmd = ["terraform", "destroy", "-var-file", tfvars]
-            if auto_approve:
-                cmd.append("-auto-approve")
-            # add each target
-            for addr in addresses:
-                cmd.extend(["-target", addr])
-            print(f"[INFO] Running targeted destroy for {len(addresses)} address(es)...")
-            subprocess.run(cmd, check=True)
-
-        # Phase 0: make sure we're initialized (in case of fresh shell)
-        subprocess.run(["terraform", "init", "-input=false"], check=True)
-
-        # Phase 1: Destroy compute instances first (to free subnets/networks)
-        state_addrs = terraform_state_list()
-        vm_addrs = [a for a in state_addrs if ".google_compute_instance." in a]
-        if vm_addrs:
-            print(f"[INFO] Found {len(vm_addrs)} compute instance(s) to destroy first")
-            destroy_targets(vm_addrs)
+    def run(cmd: List[str]) -> None:
+        if output is not None:
+            telemetry.run(cmd, cwd=run_dir, check=True, stdout=output, stderr=subprocess.STDOUT)
         else:
-            print("[INFO] No compute instances found in state; skipping targeted VM destroy")
-
-        # Phase 2: Destroy other dependent items that commonly block networks
-        state_addrs = terraform_state_list()
-        blockers = []
-        for needle in (
-            ".google_compute_router.",
-            ".google_compute_router_nat.",
-            ".google_compute_firewall.",
-            ".google_compute_forwarding_rule.",
-            ".google_compute_address.",
-        ):
-            blockers.extend([a for a in state_addrs if needle in a])
-        if blockers:
-            print(f"[INFO] Destroying {len(blockers)} network-dependent resource(s) before full destroy")
-            destroy_targets(blockers)
-
-        # Phase 3: Full destroy, serialized to reduce race conditions
-        full_cmd = [
-            "terraform", "destroy",
-            "-var-file", tfvars,
-            "-parallelism=1",
-        ]
+            telemetry.run(cmd, cwd=run_dir, check=True)
+
+    transcript: List[str] = []
+
+    def run_recorded(cmd: List[str]) -> None:
+        """run(), with Terraform's output also kept in transcript for the per-type timings.
+
+        Output is copied in chunks rather than lines so the interactive approval prompt,
+        which has no trailing newline, still shows up.
+        """
+        read_fd, write_fd = os.pipe()
+
+        def pump() -> None:
+            with os.fdopen(read_fd, "rb") as pipe:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                while True:
+                    chunk = pipe.read1(65536)
+                    text = decoder.decode(chunk, final=not chunk)
+                    if text:
+                        out.write(text)
+                        out.flush()
+                        transcript.append(text)
+                    if not chunk:
+                        return
+
+        reader = threading.Thread(target=pump, daemon=True)
+        reader.start()
+        try:
+            telemetry.run(cmd, cwd=run_dir, check=True, stdout=write_fd, stderr=subprocess.STDOUT)
+        finally:
+            os.close(write_fd)
+            reader.join()
+
+    log(f"[INFO] Destroying project '{project_id}' in: {run_dir}")
+
+    def destroy_targets(addresses: List[str], refresh: bool) -> None:
+        cmd = [toolchain.command("terraform"), "destroy", "-var-file", tfvars]
+        if not refresh:
+            cmd.append("-refresh=false")
         if auto_approve:
-            full_cmd.append("-auto-approve")
-        print(f"[INFO] Running: {' '.join(full_cmd)}")
+            cmd.append("-auto-approve")
+        # add each target
+        for addr in addresses:
+            cmd.extend(["-target", addr])
+        telemetry.set_attributes({"destroy.targets": len(addresses)})
+        run_recorded(cmd)
+
+    def read_state() -> Dict:
         try:
-            subprocess.run(full_cmd, check=True)
-        except subprocess.CalledProcessError as e:
-            print("[WARN] Full destroy failed once. Waiting 10s and retrying once...")
+            return load_state_snapshot(run_dir)
+        except (subprocess.CalledProcessError, ValueError) as e:
+            log(f"[WARN] Could not read state ({e})")
+            return {"resources": [], "serial": None, "source": "none", "fresh": False}
+
+    # Phase 0: make sure we're initialized (in case of fresh shell)
+    with telemetry.phase("init"):
+        run([toolchain.command("terraform"), "init", "-input=false"])
+
+    # One state read plans every wave
+    with telemetry.phase("load_state"):
+        snapshot = read_state()
+        waves = plan_waves(snapshot)
+        telemetry.set_attributes({"state.resources": len(snapshot["resources"]), "state.source": snapshot["source"],
+                                  "destroy.waves": len(waves)})
+    refresh = not snapshot["fresh"]
+    log(f"[INFO] State snapshot: {len(snapshot['resources'])} resource(s) from {snapshot['source']}, "
+        f"{len(waves)} destroy wave(s)" + ("" if refresh else "; recent enough to skip refresh"))
+
+    if not auto_approve:
+        # One approval for the project; Terraform would otherwise prompt again for every wave and the sweep
+        for n, wave in enumerate(waves, start=1):
+            log(f"[INFO] Wave {n}: {', '.join(wave)}")
+        what = "everything in its state" if snapshot["source"] == "none" else f"these {len(snapshot['resources'])} resource(s)"
+        answer = input(f"Destroy {what} for '{project_id}'? (yes/no): ")
+        if answer.strip().lower() not in ("yes", "y"):
+            raise RuntimeError(f"Destroy of '{project_id}' cancelled")
+        auto_approve = True  # read by destroy_targets and the sweep below
+
+    # Per-type destroy times (and wave overhead) feed --preview's estimates, also for failed runs
+    type_of = {r["address"]: r["type"] for r in snapshot["resources"]}
+    overhead: List[float] = []
+    try:
+        # Phase 1: destroy wave by wave, each wave at Terraform's full parallelism. Resources that
+        # fail (API eventual consistency, slow detach) are retried on their own before moving on,
+        # since everything in the next wave waits on them.
+        for n, wave in enumerate(waves, start=1):
+            types = sorted({r["type"] for r in snapshot["resources"] if r["address"] in wave})
+            log(f"[INFO] Wave {n}/{len(waves)}: destroying {len(wave)} resource(s) ({', '.join(types)})")
+            with telemetry.phase("destroy_wave"):
+                telemetry.set_attributes({"destroy.wave": n})
+                mark, started = len(transcript), time.perf_counter()
+                try:
+                    destroy_targets(wave, refresh)
+                except subprocess.CalledProcessError:
+                    for attempt in range(1, WAVE_RETRIES + 1):
+                        left = {r["address"] for r in read_state()["resources"]}
+                        stragglers = [a for a in wave if a in left]
+                        if not stragglers:
+                            break
+                        log(f"[WARN] {len(stragglers)} resource(s) of wave {n} remain; retry {attempt}/{WAVE_RETRIES} in {WAVE_RETRY_DELAY}s")
+                        telemetry.retry("destroy_wave")
+                        time.sleep(WAVE_RETRY_DELAY)
+                        try:
+                            # Refresh so the retry sees what the failed attempt actually left behind
+                            destroy_targets(stragglers, refresh=True)
+                            break
+                        except subprocess.CalledProcessError:
+                            if attempt == WAVE_RETRIES:
+                                raise
+                else:
+                    slowest = max((t for ts in parse_destruction_times("".join(transcript[mark:]), type_of).values() for t in ts), default=0)
+                    overhead.append(max(0.0, time.perf_counter() - started - slowest))
+
+        # Phase 2: sweep anything the snapshot did not show (unreadable state, resources created
+        # since it was taken); skipped when state is now empty
+        if read_state()["resources"] or snapshot["source"] == "none":
+            full_cmd = [toolchain.command("terraform"), "destroy", "-var-file", tfvars]
+            if auto_approve:
+                full_cmd.append("-auto-approve")
+            log(f"[INFO] Running: {' '.join(full_cmd)}")
+            with telemetry.phase("destroy_full"):
+                try:
+                    run_recorded(full_cmd)
+                except subprocess.CalledProcessError:
+                    log(f"[WARN] Full destroy failed once. Waiting {WAVE_RETRY_DELAY}s and retrying once...")
+                    telemetry.retry("destroy_full")
+                    time.sleep(WAVE_RETRY_DELAY)
+                    run_recorded(full_cmd)
+    finally:
+        samples = parse_destruction_times("".join(transcript), type_of)
+        if overhead:
+            samples[WAVE_OVERHEAD] = overhead
+        record_history(samples)
+
+    log(f"[INFO] ✅ Destroy completed for {project_id}")
+
+class ProjectDeleter:
+    """Unlinks billing and deletes GCP projects in the background, then confirms the deletions in batches.
+
+    submit() returns at once, so the next project's Terraform destroy is not held up by gcloud.
+    Unlink/delete calls for different projects run concurrently (up to `jobs`). One verifier
+    thread polls the lifecycle state of every pending project with a single `gcloud projects list`
+    per batch, backing off per project. A run dir is removed only once its project is
+    DELETE_REQUESTED or no longer listed. close() waits for everything and returns the outcome
+    per project.
+    """
+
+    def __init__(self, project_root: str, jobs: int = 4):
+        self.project_root = project_root
+        self.pool = ThreadPoolExecutor(max_workers=max(1, jobs))
+        self.lock = threading.Condition()
+        self.pending: Dict[str, dict] = {}
+        self.results: Dict[str, str] = {}
+        self.log_paths: Dict[str, Optional[str]] = {}
+        self.outstanding = 0
+        threading.Thread(target=self.verify_loop, name="verify-deletion", daemon=True).start()
+
+    def log(self, pid: str, message: str) -> None:
+        print(message, flush=True)
+        path = self.log_paths.get(pid)
+        if path:
+            with open(path, "a", encoding="utf-8") as f:
+                print(message, file=f)
+
+    def submit(self, pid: str, log_path: Optional[str] = None) -> None:
+        with self.lock:
+            self.log_paths[pid] = log_path
+            self.outstanding += 1
+        self.pool.submit(self.delete, pid)
+
+    def finish(self, pid: str, outcome: str) -> None:
+        with self.lock:
+            if pid in self.results:
+                return
+            self.pending.pop(pid, None)
+            self.results[pid] = outcome
+            self.outstanding -= 1
+            self.lock.notify_all()
+
+    def delete(self, pid: str) -> None:
+        # Whatever goes wrong, the project must be finished or close() waits for it forever
+        try:
+            self.request_deletion(pid)
+        except Exception as e:
+            print(f"[ERROR] {pid}: project deletion failed: {e}", flush=True)
+            self.finish(pid, f"error: {e}")
+
+    def request_deletion(self, pid: str) -> None:
+        gcloud_bin = resolve_gcloud_bin()
+        if not gcloud_bin:
+            self.log(pid, f"[WARN] {pid}: gcloud not found. Set GCLOUD_BIN env var or add Cloud SDK to PATH.")
+            self.finish(pid, "gcloud not found")
+            return
+        self.log(pid, f"[INFO] {pid}: unlinking billing and deleting project via gcloud...")
+        with telemetry.phase("delete_project"):
+            for cmd, what in (([gcloud_bin, "beta", "billing", "projects", "unlink", pid], "unlink billing for"),
+                              ([gcloud_bin, "projects", "delete", pid, "--quiet"], "delete project")):
+                try:
+                    result = telemetry.run(cmd, capture_output=True, text=True)
+                    if result.returncode != 0:
+                        detail = (result.stderr or result.stdout or "").strip().splitlines()
+                        self.log(pid, f"[WARN] {pid}: could not {what} {pid}: {detail[-1] if detail else result.returncode}")
+                except Exception as e:
+                    self.log(pid, f"[WARN] {pid}: could not {what} {pid}: {e}")
+        # Verify even after a failed delete call: the project may already be gone
+        now = time.time()
+        with self.lock:
+            self.pending[pid] = {"next": now + VERIFY_INITIAL_DELAY, "delay": VERIFY_INITIAL_DELAY,
+                                 "deadline": now + VERIFY_TIMEOUT, "state": ""}
+            self.lock.notify_all()
+
+    def lifecycle_states(self, pids: List[str]) -> Optional[Dict[str, str]]:
+        """projectId -> lifecycleState for the listed pids that still exist; None if the call failed."""
+        with telemetry.phase("verify_deletion"):
+            result = telemetry.run([
+                toolchain.command("gcloud"), "projects", "list",
+                f"--filter=projectId:({' '.join(pids)})",
+                "--format=json(projectId,lifecycleState)",
+            ], capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        try:
+            return {p["projectId"]: p.get("lifecycleState", "") for p in json.loads(result.stdout or "[]")}
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def verify_loop(self) -> None:
+        while True:
+            with self.lock:
+                now = time.time()
+                due = [pid for pid, p in self.pending.items() if p["next"] <= now + VERIFY_COALESCE][:VERIFY_BATCH]
+                if not any(self.pending[pid]["next"] <= now for pid in due):
+                    wake = min((p["next"] for p in self.pending.values()), default=None)
+                    self.lock.wait(timeout=None if wake is None else max(0.0, wake - now))
+                    continue
             try:
-                import time
-                time.sleep(10)
+                states = self.lifecycle_states(due)
             except Exception:
-                pass
-            subprocess.run(full_cmd, check=True)
+                states = None
+            now = time.time()
+            for pid in due:
+                # One project's failure (e.g. copying its profile on a full disk) must not stop this thread
+                try:
+                    self.verify(pid, None if states is None else states.get(pid, ""), now)
+                except Exception as e:
+                    print(f"[ERROR] {pid}: verifying deletion failed: {e}", flush=True)
+                    self.finish(pid, f"error: {e}")
 
-        print(f"[INFO] ✅ Destroy completed for {project_id}")
-    finally:
-        os.chdir(cwd_before)
+    def verify(self, pid: str, state: Optional[str], now: float) -> None:
+        """Finish pid if its lifecycle state shows it deleted or it ran out of time, else back off."""
+        if state in ("", "DELETE_REQUESTED"):
+            self.remove_run_dir(pid)
+            self.finish(pid, "deleted")
+            return
+        with self.lock:
+            entry = self.pending[pid]
+            entry["state"] = state or entry["state"]
+            timed_out = now >= entry["deadline"]
+            entry["delay"] = min(entry["delay"] * 2, VERIFY_MAX_DELAY)
+            entry["next"] = now + entry["delay"]
+        if timed_out:
+            lifecycle = entry["state"] or "unknown"
+            self.log(pid, f"[WARN] {pid}: lifecycleState='{lifecycle}' after {VERIFY_TIMEOUT}s. Keeping run directory.")
+            self.finish(pid, f"unconfirmed ({lifecycle})")
+
+    def remove_run_dir(self, pid: str) -> None:
+        run_dir = os.path.join(self.project_root, ".tf-runs", pid)
+        # Keep destroy profiles, which live in the run dir, where profiling.profile_dir looks next
+        profile = os.path.join(run_dir, "profile")
+        if os.path.isdir(profile):
+            shutil.copytree(profile, os.path.join(self.project_root, ".tf-runs", ".profiles", pid), dirs_exist_ok=True)
+        shutil.rmtree(run_dir, ignore_errors=True)
+        self.log(pid, f"[INFO] {pid}: project deletion confirmed; removed run directory: {run_dir}")
+
+    def close(self) -> Dict[str, str]:
+        self.pool.shutdown(wait=True)
+        with self.lock:
+            if self.outstanding:
+                print(f"[INFO] Waiting for deletion of {self.outstanding} project(s) to be confirmed...")
+            while self.outstanding:
+                self.lock.wait()
+            return dict(self.results)
+
+def destroy_one(pid: str, action: str, auto_approve: bool, project_root: str, profile: bool,
+                deleter: ProjectDeleter, output: Optional[IO[str]] = None, log_path: Optional[str] = None) -> None:
+    profiler = Profiler("destroy", project_root, pid) if profile else contextlib.nullcontext()
+    with telemetry.project(pid), profiler:
+        # Always destroy modules/resources first
+        run_destroy_for_project(pid, auto_approve, output)
+
+    if action == "project":
+        # Project deletion and its verification continue in the background
+        deleter.submit(pid, log_path)
+
+def destroy_logged(pid: str, action: str, project_root: str, profile: bool, deleter: ProjectDeleter) -> dict:
+    """destroy_one with output to a per-project log; never raises, returns a result row."""
+    log_dir = os.path.join(project_root, ".tf-runs", ".destroy-logs")
+    os.makedirs(log_dir, exist_ok=True)
+    log_path = os.path.join(log_dir, f"{pid}-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.log")
+    started = time.perf_counter()
+    result = {"project_id": pid, "action": action, "status": "ok", "error": "", "log": log_path, "deletion": "-"}
+    with open(log_path, "w", encoding="utf-8") as log:
+        try:
+            destroy_one(pid, action, True, project_root, profile, deleter, output=log, log_path=log_path)
+        except subprocess.CalledProcessError as e:
+            result.update(status="failed", error=f"terraform exited with code {e.returncode}")
+        except Exception as e:
+            result.update(status="failed", error=str(e))
+        if result["error"]:
+            print(f"[ERROR] {result['error']}", file=log)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+def print_results(results: List[dict]) -> None:
+    width = max(len("PROJECT"), *(len(r["project_id"]) for r in results))
+    print(f"\n{'PROJECT':<{width}}  {'ACTION':<8}  {'RESULT':<6}  {'SECONDS':>8}  {'DELETION':<12}  LOG")
+    for r in results:
+        print(f"{r['project_id']:<{width}}  {r['action']:<8}  {r['status']:<6}  {r['seconds']:8.1f}  {r['deletion']:<12}  {r['log']}")
+    for r in results:
+        if r["status"] != "ok":
+            print(f"\n[ERROR] {r['project_id']}: {r['error']}")
+            print(f"        Last lines of {r['log']}:")
+            with open(r["log"], "r", encoding="utf-8", errors="replace") as f:
+                for line in f.readlines()[-20:]:
+                    print(f"    {line.rstrip()}")
+
+def destroy_parallel(targets: List[Tuple[str, str]], jobs: int, project_root: str, profile: bool,
+                     deleter: ProjectDeleter) -> List[dict]:
+    """Destroy every target with --jobs workers; results come back in target order."""
+    if profile and jobs > 1:
+        print("[WARN] --profile runs one project at a time (only one profiler can be active)")
+        jobs = 1
+    results: Dict[str, dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {pool.submit(destroy_logged, pid, action, project_root, profile, deleter): pid for pid, action in targets}
+        print(f"[INFO] Destroying {len(targets)} project(s), {max(1, jobs)} at a time; logs in {os.path.join(project_root, '.tf-runs', '.destroy-logs')}")
+        for future in as_completed(futures):
+            result = future.result()
+            results[result["project_id"]] = result
+            level = "INFO" if result["status"] == "ok" else "ERROR"
+            print(f"[{level}] {result['project_id']}: {result['action']} {result['status']} in {result['seconds']:.1f}s ({len(results)}/{len(targets)})")
+    return [results[pid] for pid, _ in targets]
 
 def main():
     print("=== Terraform Destroy Script ===")
+    args = parse_args(sys.argv[1:])
     try:
-        auto_approve, projects = parse_args(sys.argv[1:])
+        targets = resolve_targets(args)
     except Exception as e:
         print(f"[ERROR] {e}")
         sys.exit(1)
+    projects = [pid for pid, _ in targets]
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-    if not auto_approve:
+    if args.preview:
+        previewed = [preview_project(pid, project_root, action) for pid, action in targets]
+        sys.exit(0 if all(previewed) else 1)
+
+    telemetry.start("destroy")
+
+    if not args.force:
         confirm = input(f"This will destroy {len(projects)} project(s): {', '.join(projects)}. Proceed? (yes/no): ")
         if confirm.lower() not in ("yes", "y"):
             print("[INFO] Destroy cancelled.")
             sys.exit(0)
 
+    if all(action for _, action in targets):
+        # Non-interactive: the confirmation above (or --force) approves every Terraform destroy,
+        # since concurrent runs cannot share the terminal for prompts
+        deleter = ProjectDeleter(project_root, args.jobs)
+        results = destroy_parallel(targets, args.jobs, project_root, args.profile, deleter)
+        for pid, outcome in deleter.close().items():
+            next(r for r in results if r["project_id"] == pid)["deletion"] = outcome
+        print_results(results)
+        if any(r["status"] != "ok" for r in results):
+            sys.exit(1)
+        return
+
+    deleter = ProjectDeleter(project_root, args.jobs)
     try:
-        for pid in projects:
+        for pid, _ in targets:
             # Ask per-project what to do
             while True:
                 print(f"\nChoose action for project '{pid}':")
@@ -208,50 +808,18 @@ def main():
                 print("[INFO] Exiting by user request.")
                 sys.exit(0)
 
-            # Always destroy modules/resources first
-            run_destroy_for_project(pid, auto_approve)
-
-            if action == "p":
-                # Attempt to delete the project explicitly
-                print(f"[INFO] Attempting to unlink billing and delete project '{pid}' via gcloud...")
-                gcloud_bin = resolve_gcloud_bin()
-                if not gcloud_bin:
-                    print("[WARN] gcloud not found. Set GCLOUD_BIN env var or add Cloud SDK to PATH.")
-                else:
-                    try:
-                        subprocess.run([gcloud_bin, "beta", "billing", "projects", "unlink", pid], check=False)
-                    except Exception as e:
-                        print(f"[WARN] Could not unlink billing for {pid}: {e}")
-                    try:
-                        subprocess.run([gcloud_bin, "projects", "delete", pid, "--quiet"], check=False)
-                    except Exception as e:
-                        print(f"[WARN] Could not delete project {pid}: {e}")
-
-                # Remove run directory only if project is confirmed deleted or in delete-requested state
-                try:
-                    gcloud_bin = resolve_gcloud_bin()
-                    check = subprocess.run(
-                        [gcloud_bin if gcloud_bin else "gcloud", "projects", "describe", pid, "--format=value(lifecycleState)"],
-                        capture_output=True, text=True
-                    )
-                    lifecycle = (check.stdout or "").strip()
-                    if check.returncode != 0 or lifecycle == "DELETE_REQUESTED":
-                        script_dir = os.path.dirname(os.path.abspath(__file__))
-                        project_root = os.path.dirname(script_dir)
-                        run_dir = os.path.join(project_root, ".tf-runs", pid)
-                        import shutil
-                        shutil.rmtree(run_dir, ignore_errors=True)
-                        print(f"[INFO] Removed run directory: {run_dir}")
-                    else:
-                        print(f"[INFO] Project '{pid}' lifecycleState='{lifecycle}'. Keeping run directory.")
-                except Exception as e:
-                    print(f"[WARN] Could not verify project deletion for {pid}: {e}")
+            destroy_one(pid, ACTIONS[action], args.force, project_root, args.profile, deleter)
     except subprocess.CalledProcessError as e:
         print(f"[ERROR] Terraform destroy failed with exit code {e.returncode}")
         sys.exit(1)
     except Exception as e:
         print(f"[ERROR] {e}")
         sys.exit(1)
+    finally:
+        # Projects already submitted still get their deletion confirmed (and run dir removed)
+        for pid, outcome in deleter.close().items():
+            if outcome != "deleted":
+                print(f"[WARN] {pid}: project deletion {outcome}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,243 @@
+#for usage cd to the repo root and python scripts/drift_scan.py [--jobs 8] [--rate 2] [--force]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import toolchain
+
+INDEX_NAME = ".drift-index.json"
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def parse_ts(value: Optional[str]) -> float:
+    if not value:
+        return 0.0
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return 0.0
+
+def discover_run_dirs(runs_root: str) -> List[str]:
+    """Return project ids under runs_root that look like deploy.py run directories."""
+    if not os.path.isdir(runs_root):
+        return []
+    result: List[str] = []
+    for name in sorted(os.listdir(runs_root)):
+        run_dir = os.path.join(runs_root, name)
+        if name.startswith(".") or not os.path.isdir(run_dir):
+            continue
+        if os.path.exists(os.path.join(run_dir, "main.tf")) and os.path.exists(os.path.join(run_dir, "terraform.tfvars.json")):
+            result.append(name)
+    return result
+
+def load_index(index_path: str) -> dict:
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get("projects"), dict):
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"updated_at": None, "projects": {}}
+
+def save_index(index: dict, index_path: str) -> None:
+    """Write the index atomically so readers (e.g. the GUI) never see a partial file."""
+    index["updated_at"] = utc_now()
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, index_path)
+
+def state_mtime(run_dir: str) -> float:
+    try:
+        return os.path.getmtime(os.path.join(run_dir, "terraform.tfstate"))
+    except OSError:
+        return 0.0
+
+def is_due(entry: Optional[dict], run_dir: str, now: float) -> bool:
+    """A project is due when never scanned, past its next_due, or applied to since the last scan."""
+    if not entry or not entry.get("last_scan"):
+        return True
+    if state_mtime(run_dir) > parse_ts(entry.get("last_scan")):
+        return True
+    return now >= parse_ts(entry.get("next_due"))
+
+def next_interval(entry: Optional[dict], status: str, min_interval: float, max_interval: float) -> float:
+    """Back off exponentially for projects that keep scanning clean; reset on drift or error."""
+    if status != "clean" or not entry:
+        return min_interval
+    previous = float(entry.get("interval_seconds") or min_interval)
+    return min(max(previous * 2, min_interval), max_interval)
+
+class RateLimiter:
+    """Allow at most `rate` subprocess launches per second across all workers."""
+
+    def __init__(self, rate: float):
+        self.min_gap = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.min_gap:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.min_gap
+        if slot > now:
+            time.sleep(slot - now)
+
+def scan_project(run_dir: str, limiter: RateLimiter, timeout: int) -> dict:
+    """Run a refresh-only plan in run_dir and summarise the drifted resources."""
+    started = time.monotonic()
+    tfvars = os.path.join(run_dir, "terraform.tfvars.json")
+    if not os.path.isdir(os.path.join(run_dir, ".terraform")):
+        limiter.wait()
+        init = subprocess.run(
+            [toolchain.command("terraform"), "init", "-input=false", "-no-color"],
+            cwd=run_dir, capture_output=True, text=True, timeout=timeout,
+        )
+        if init.returncode != 0:
+            return {
+                "status": "error",
+                "error": (init.stderr or init.stdout).strip()[-2000:],
+                "drifted": [],
+                "duration_seconds": round(time.monotonic() - started, 2),
+            }
+
+    limiter.wait()
+    cmd = [
+        toolchain.command("terraform"), "plan",
+        "-refresh-only",
+        "-detailed-exitcode",
+        "-input=false",
+        "-lock=false",
+        "-json",
+        "-var-file", tfvars,
+    ]
+    proc = subprocess.run(cmd, cwd=run_dir, capture_output=True, text=True, timeout=timeout)
+
+    drifted: List[dict] = []
+    errors: List[str] = []
+    for line in proc.stdout.splitlines():
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            continue
+        if msg.get("type") == "resource_drift":
+            change = msg.get("change", {})
+            drifted.append({
+                "address": change.get("resource", {}).get("addr"),
+                "action": change.get("action"),
+            })
+        elif msg.get("@level") == "error":
+            errors.append(msg.get("@message", ""))
+
+    # -detailed-exitcode: 0 = no changes, 2 = drift detected, anything else = error
+    if proc.returncode == 0:
+        status = "clean"
+    elif proc.returncode == 2:
+        status = "drift"
+    else:
+        status = "error"
+    result = {
+        "status": status,
+        "drifted": drifted,
+        "duration_seconds": round(time.monotonic() - started, 2),
+    }
+    if status == "error":
+        result["error"] = ("\n".join(errors) or proc.stderr.strip())[-2000:]
+    return result
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scan .tf-runs projects for drift with refresh-only plans.")
+    parser.add_argument("--runs-root", help="Directory holding per-project run dirs (default: <repo>/.tf-runs)")
+    parser.add_argument("--project", action="append", default=[], help="Only scan this project id (repeatable)")
+    parser.add_argument("--jobs", type=int, default=8, help="Concurrent terraform plans (default: 8)")
+    parser.add_argument("--rate", type=float, default=2.0, help="Max terraform launches per second (default: 2, 0 = unlimited)")
+    parser.add_argument("--min-interval", type=float, default=6.0, help="Hours between scans after drift/error (default: 6)")
+    parser.add_argument("--max-interval", type=float, default=168.0, help="Upper bound in hours for clean projects (default: 168)")
+    parser.add_argument("--timeout", type=int, default=1800, help="Per-project terraform timeout in seconds (default: 1800)")
+    parser.add_argument("--force", action="store_true", help="Scan every project regardless of schedule")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args(sys.argv[1:])
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(script_dir)
+    runs_root = args.runs_root or os.path.join(project_root, ".tf-runs")
+    index_path = os.path.join(runs_root, INDEX_NAME)
+
+    project_ids = discover_run_dirs(runs_root)
+    if args.project:
+        wanted = set(args.project)
+        project_ids = [p for p in project_ids if p in wanted]
+    if not project_ids:
+        print(f"[INFO] No run directories found under {runs_root}")
+        return
+
+    index = load_index(index_path)
+    now = time.time()
+    due = [
+        pid for pid in project_ids
+        if args.force or is_due(index["projects"].get(pid), os.path.join(runs_root, pid), now)
+    ]
+    print(f"[INFO] {len(due)} of {len(project_ids)} project(s) due for a drift scan")
+    if not due:
+        return
+
+    min_interval = args.min_interval * 3600
+    max_interval = args.max_interval * 3600
+    limiter = RateLimiter(args.rate)
+    index_lock = threading.Lock()
+    counts: Dict[str, int] = {"clean": 0, "drift": 0, "error": 0}
+
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {
+            pool.submit(scan_project, os.path.join(runs_root, pid), limiter, args.timeout): pid
+            for pid in due
+        }
+        for future in as_completed(futures):
+            pid = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"status": "error", "error": str(e), "drifted": [], "duration_seconds": None}
+
+            with index_lock:
+                previous = index["projects"].get(pid)
+                interval = next_interval(previous, result["status"], min_interval, max_interval)
+                scanned_at = time.time()
+                entry = dict(result)
+                entry["last_scan"] = utc_now()
+                entry["interval_seconds"] = interval
+                entry["next_due"] = datetime.fromtimestamp(scanned_at + interval, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+                entry["consecutive_clean"] = (previous or {}).get("consecutive_clean", 0) + 1 if result["status"] == "clean" else 0
+                index["projects"][pid] = entry
+                counts[result["status"]] = counts.get(result["status"], 0) + 1
+                # Persist after every project so an interrupted scan keeps its progress
+                save_index(index, index_path)
+
+            if result["status"] == "drift":
+                print(f"[WARN] {pid}: drift in {len(result['drifted'])} resource(s)")
+                for item in result["drifted"]:
+                    print(f"         {item['action']}: {item['address']}")
+            elif result["status"] == "error":
+                print(f"[ERROR] {pid}: {result.get('error', 'unknown error')}")
+            else:
+                print(f"[INFO] {pid}: no drift")
+
+    print(f"[INFO] Drift scan complete: {counts['clean']} clean, {counts['drift']} drifted, {counts['error']} error(s). Index -> {index_path}")
+    if counts["drift"] or counts["error"]:
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
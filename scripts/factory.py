@@ -0,0 +1,299 @@
+#for usage cd to the repo root and python scripts/factory.py --base configs/proj-a.yaml projects.csv [--deploy]
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+import telemetry
+from deploy import project_exists_in_gcloud, render_run_dir, run_terraform_in_dir, yaml_to_dict
+from fanout import deep_merge, substitute, validate_project_id
+
+# Written to .tf-runs/<project_id>/ when a row is submitted: which manifest row renders into it
+CLAIM_FILE = ".factory-row"
+
+def stream_rows(path: str, fmt: str) -> Iterator[Tuple[int, dict, Optional[str]]]:
+    """Yield (row number, row, parse error) one at a time; row numbers start at 1 and skip nothing.
+
+    A JSONL line that is not a JSON object comes back as an empty row with an error, so one bad
+    line does not stop the rows after it.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            for number, row in enumerate(csv.DictReader(f), start=1):
+                yield number, row, None
+        else:
+            for number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    yield number, {}, None
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield number, {}, f"invalid JSON: {e}"
+                    continue
+                if not isinstance(row, dict):
+                    yield number, {}, f"row is a JSON {type(row).__name__}, not an object"
+                    continue
+                yield number, row, None
+
+def row_overlay(row: dict) -> dict:
+    """Turn a manifest row into a config overlay. Dotted CSV columns (labels.team) become nested keys."""
+    overlay: dict = {}
+    for key, value in row.items():
+        if value is None or value == "" or key is None:
+            continue
+        target = overlay
+        parts = key.split(".")
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    return overlay
+
+def build_row_config(base: dict, row: dict) -> dict:
+    """Fill {column} placeholders in the base from the row, then merge the row over it."""
+    variables = {k: v for k, v in row.items() if k and isinstance(v, (str, int, float)) and "." not in k}
+    config = substitute(base, variables) if variables else json.loads(json.dumps(base))
+    return deep_merge(config, row_overlay(row))
+
+def validate_row_config(config: dict, base: dict) -> Optional[str]:
+    error = validate_project_id(config.get("project_id"))
+    if error:
+        return error
+    if config["project_id"] == base.get("project_id"):
+        # Every row would otherwise render into the base config's .tf-runs/<project_id>
+        return "project_id is not set by the row (it is the base config's)"
+    if not config.get("billing_account"):
+        return "billing_account is missing"
+    return None
+
+def prepare_row(number: int, row: dict, base: dict) -> Tuple[Optional[dict], Optional[dict]]:
+    """(config, None) for a row that can be rendered, else (None, its "invalid" result)."""
+    try:
+        config = build_row_config(base, row)
+    except Exception as e:
+        return None, {"row": number, "status": "invalid", "error": f"{type(e).__name__}: {e}"}
+    error = validate_row_config(config, base)
+    if error:
+        return None, {"row": number, "project_id": config.get("project_id"), "status": "invalid", "error": error}
+    return config, None
+
+class Checkpoint:
+    """Resume point for a manifest, kept small no matter how many rows it has.
+
+    Stores a watermark (every row <= watermark is finished) plus the few finished
+    rows above it that completed out of order; failed rows are appended to a
+    JSONL error log and count as finished.
+    """
+
+    def __init__(self, path: str, manifest_digest: str):
+        self.path = path
+        self.manifest_digest = manifest_digest
+        self.watermark = 0
+        self.finished_above: set = set()
+        self.lock = threading.Lock()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("manifest_digest") != self.manifest_digest:
+            print(f"[WARN] Manifest changed since checkpoint {self.path}; starting from the first row")
+            return
+        self.watermark = int(data.get("watermark", 0))
+        self.finished_above = set(data.get("finished_above", []))
+
+    def is_done(self, number: int) -> bool:
+        return number <= self.watermark or number in self.finished_above
+
+    def mark(self, number: int) -> None:
+        with self.lock:
+            self.finished_above.add(number)
+            while self.watermark + 1 in self.finished_above:
+                self.watermark += 1
+                self.finished_above.discard(self.watermark)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "manifest_digest": self.manifest_digest,
+                    "watermark": self.watermark,
+                    "finished_above": sorted(self.finished_above),
+                    "updated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                }, f)
+            os.replace(tmp_path, self.path)
+
+def manifest_digest(path: str) -> str:
+    """Identify a manifest by path, size and the first 64 KiB, without reading the whole file."""
+    stat = os.stat(path)
+    h = hashlib.sha256(f"{os.path.abspath(path)}:{stat.st_size}".encode("utf-8"))
+    with open(path, "rb") as f:
+        h.update(f.read(65536))
+    return h.hexdigest()
+
+def claim_run_dir(runs_root: str, project_id: str, digest: str, number: int) -> Optional[int]:
+    """Claim .tf-runs/<project_id> for a row of this manifest; returns the other row holding it, if any.
+
+    Claims live in the run dirs rather than in memory, so catching duplicate project_ids costs
+    one small file per row however long the manifest is, and rows claimed by an earlier
+    (interrupted) run of the same manifest still count. Other manifests' claims are replaced.
+    """
+    path = os.path.join(runs_root, project_id, CLAIM_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            claim = json.load(f)
+        if claim["manifest_digest"] == digest and int(claim["row"]) != number:
+            return int(claim["row"])
+    except (OSError, ValueError, TypeError, KeyError):
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"manifest_digest": digest, "row": number}, f)
+    return None
+
+def process_row(number: int, config: dict, project_root: str, runs_root: str, args: argparse.Namespace) -> dict:
+    with telemetry.span(f"row {number}", {"manifest.row": number}):
+        result = build_row(number, config, project_root, runs_root, args)
+        telemetry.set_attributes({"project.id": result.get("project_id"), "row.status": result["status"]})
+        return result
+
+def build_row(number: int, config: dict, project_root: str, runs_root: str, args: argparse.Namespace) -> dict:
+    project_id = config["project_id"]
+    run_dir = os.path.join(runs_root, project_id)
+    os.makedirs(run_dir, exist_ok=True)
+    try:
+        project_exists = project_exists_in_gcloud(project_id) if args.deploy else args.project_exists
+        tfvars_path = render_run_dir(run_dir, project_root, config, project_exists, for_each=args.for_each)
+        if not args.deploy:
+            return {"row": number, "project_id": project_id, "status": "rendered"}
+        log_dir = os.path.join(run_dir, "logs")
+        os.makedirs(log_dir, exist_ok=True)
+        log_path = os.path.join(log_dir, f"factory-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.log")
+        with open(log_path, "w", encoding="utf-8") as log:
+            run_terraform_in_dir(run_dir, tfvars_path, project_id, has_project_module=not project_exists,
+                                 auto_answer="yes" if args.apply else "no", output=log)
+        return {"row": number, "project_id": project_id, "status": "applied" if args.apply else "planned", "log": log_path}
+    except KeyError as e:
+        return {"row": number, "project_id": project_id, "status": "invalid", "error": f"required field {e} missing"}
+    except Exception as e:
+        return {"row": number, "project_id": project_id, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stream a CSV/JSONL project manifest into rendered (or deployed) .tf-runs projects.")
+    parser.add_argument("manifest", help="CSV (header row) or JSONL manifest, one project per row")
+    parser.add_argument("--base", required=True, help="Base YAML config every row is applied to")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Manifest format (default: from file extension)")
+    parser.add_argument("--jobs", type=int, default=4, help="Rows processed concurrently (default: 4)")
+    parser.add_argument("--deploy", action="store_true", help="Run terraform init/plan for each row after rendering")
+    parser.add_argument("--apply", action="store_true", help="With --deploy, also apply (non-interactive)")
+    parser.add_argument("--for-each", action="store_true", help="Use for_each rendering (see deploy.py --for-each)")
+    parser.add_argument("--project-exists", action="store_true", help="Render without the project module (render-only mode)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: .tf-runs/.factory/<manifest name>.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint and start from the first row")
+    args = parser.parse_args(argv)
+    if args.apply and not args.deploy:
+        parser.error("--apply requires --deploy")
+    return args
+
+def main():
+    args = parse_args(sys.argv[1:])
+    recorder = telemetry.start("factory")
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(script_dir)
+    runs_root = os.path.join(project_root, ".tf-runs")
+
+    fmt = args.format or ("csv" if args.manifest.lower().endswith(".csv") else "jsonl")
+    try:
+        base = yaml_to_dict(args.base)
+        if not isinstance(base, dict):
+            raise ValueError(f"Base config is empty or invalid: {args.base}")
+        digest = manifest_digest(args.manifest)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+    factory_dir = os.path.join(runs_root, ".factory")
+    os.makedirs(factory_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(args.manifest))[0]
+    checkpoint = Checkpoint(args.checkpoint or os.path.join(factory_dir, f"{name}.checkpoint.json"), digest)
+    if not args.restart:
+        checkpoint.load()
+        if checkpoint.watermark:
+            print(f"[INFO] Resuming after row {checkpoint.watermark} ({checkpoint.path})")
+    errors_path = os.path.join(factory_dir, f"{name}.errors.jsonl")
+
+    counts: Dict[str, int] = {}
+    max_in_flight = max(1, args.jobs) * 2
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool, open(errors_path, "a", encoding="utf-8") as errors:
+        in_flight = set()
+
+        def record(result: dict) -> None:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+            if result.get("project_id"):
+                recorder.result(result["project_id"], "failure" if result["status"] in ("invalid", "error") else "success")
+            if result["status"] in ("invalid", "error"):
+                print(f"[ERROR] Row {result['row']} ({result.get('project_id')}): {result['error']}")
+                errors.write(json.dumps(result) + "\n")
+                errors.flush()
+            else:
+                print(f"[INFO] Row {result['row']}: {result['project_id']} {result['status']}")
+            checkpoint.mark(result["row"])
+
+        def drain() -> None:
+            nonlocal in_flight
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                record(future.result())
+
+        try:
+            # Backpressure: the reader blocks once max_in_flight rows are queued, so memory stays flat
+            for number, row, parse_error in stream_rows(args.manifest, fmt):
+                done = checkpoint.is_done(number)
+                if parse_error:
+                    if not done:
+                        record({"row": number, "status": "invalid", "error": parse_error})
+                    continue
+                if not any(v not in (None, "") for v in row.values()):
+                    # Blank line or a CSV row of empty cells
+                    if not done:
+                        checkpoint.mark(number)
+                    continue
+                config, invalid = prepare_row(number, row, base)
+                if invalid:
+                    if not done:
+                        record(invalid)
+                    continue
+                if done:
+                    continue
+                # Claimed here on the reader thread, so two rows never render into one run dir at once
+                pid = config["project_id"]
+                holder = claim_run_dir(runs_root, pid, digest, number)
+                if holder is not None:
+                    record({"row": number, "project_id": pid, "status": "invalid", "error": f"project_id collides with row {holder}"})
+                    continue
+                in_flight.add(pool.submit(process_row, number, config, project_root, runs_root, args))
+                if len(in_flight) >= max_in_flight:
+                    drain()
+        except (OSError, csv.Error) as e:
+            print(f"[ERROR] Manifest read error: {e}")
+            counts["error"] = counts.get("error", 0) + 1
+        while in_flight:
+            drain()
+
+    summary = ", ".join(f"{v} {k}" for k, v in sorted(counts.items())) or "nothing to do"
+    print(f"[INFO] Factory run complete: {summary}. Checkpoint: {checkpoint.path}")
+    if counts.get("invalid") or counts.get("error"):
+        print(f"[INFO] Failed rows -> {errors_path}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
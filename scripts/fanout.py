@@ -0,0 +1,235 @@
+#for usage cd to the repo root and python scripts/fanout.py templates/team-matrix.yaml [--jobs 8]
+import argparse
+import contextlib
+import copy
+import hashlib
+import io
+import ipaddress
+import itertools
+import json
+import os
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional
+
+import yaml
+
+import render
+from deploy import render_run_dir, yaml_to_dict
+
+HASH_FILE = ".render-hash"
+PROJECT_ID_RE = re.compile(r"^[a-z][a-z0-9-]{4,28}[a-z0-9]$")
+
+def deep_merge(base: dict, overlay: dict) -> dict:
+    """Merge overlay into base in place: dicts merge recursively, everything else is replaced."""
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            deep_merge(base[key], value)
+        else:
+            base[key] = copy.deepcopy(value)
+    return base
+
+def substitute(value, variables: Dict[str, str]):
+    """Replace {name} placeholders for known variables only, so other braces (e.g. ${var} in scripts) survive."""
+    if isinstance(value, str):
+        if "{" not in value:
+            return value
+        pattern = re.compile(r"\{(" + "|".join(re.escape(k) for k in variables) + r")\}")
+        return pattern.sub(lambda m: str(variables[m.group(1)]), value)
+    if isinstance(value, dict):
+        return {substitute(k, variables): substitute(v, variables) for k, v in value.items()}
+    if isinstance(value, list):
+        return [substitute(v, variables) for v in value]
+    return value
+
+def shift_cidrs(value, offset: int):
+    """Shift every ip_cidr_range by `offset` addresses (recursively, including secondary ranges)."""
+    if isinstance(value, dict):
+        result = {}
+        for k, v in value.items():
+            if k == "ip_cidr_range" and isinstance(v, str):
+                network = ipaddress.ip_network(v, strict=False)
+                shifted = ipaddress.ip_address(int(network.network_address) + offset)
+                result[k] = f"{shifted}/{network.prefixlen}"
+            else:
+                result[k] = shift_cidrs(v, offset)
+        return result
+    if isinstance(value, list):
+        return [shift_cidrs(v, offset) for v in value]
+    return value
+
+def validate_project_id(project_id) -> Optional[str]:
+    """Return an error message if project_id is not a valid GCP project id."""
+    if not isinstance(project_id, str) or not project_id:
+        return "project_id is missing"
+    if not PROJECT_ID_RE.match(project_id):
+        return f"project_id '{project_id}' must be 6-30 lowercase letters, digits or hyphens, start with a letter and not end with a hyphen"
+    return None
+
+def load_template(path: str) -> dict:
+    """Load a fan-out template and resolve its base config (parsed once, shared by all variants)."""
+    template = yaml_to_dict(path) or {}
+    if not isinstance(template, dict) or not isinstance(template.get("matrix"), dict) or not template["matrix"]:
+        raise ValueError(f"Template needs a non-empty 'matrix' mapping: {path}")
+    base = template.get("base")
+    if isinstance(base, str):
+        base_path = base if os.path.isabs(base) else os.path.join(os.path.dirname(os.path.abspath(path)), base)
+        base = yaml_to_dict(base_path)
+    if not isinstance(base, dict):
+        raise ValueError(f"Template 'base' must be a config mapping or a path to a YAML config: {path}")
+    for axis, values in template["matrix"].items():
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"Matrix axis '{axis}' must be a non-empty list")
+    template["base"] = base
+    return template
+
+def expand_variants(template: dict) -> Iterator[Dict[str, str]]:
+    """Lazily yield one {axis: value} mapping per matrix combination."""
+    axes = list(template["matrix"])
+    for combo in itertools.product(*(template["matrix"][a] for a in axes)):
+        yield dict(zip(axes, combo))
+
+def build_variant(template: dict, variables: Dict[str, str]) -> dict:
+    """Apply overlay, per-axis overlays, placeholders and CIDR offsets to the base config."""
+    config = copy.deepcopy(template["base"])
+    deep_merge(config, template.get("overlay") or {})
+    for axis, value in variables.items():
+        axis_overlays = (template.get("overlays") or {}).get(axis) or {}
+        deep_merge(config, axis_overlays.get(value) or {})
+    if template.get("project_id"):
+        config["project_id"] = template["project_id"]
+    config = substitute(config, variables)
+
+    # CIDR offsets are per axis: the value's position in the axis list times the axis stride.
+    # Appending new values to an axis therefore never moves existing variants.
+    offset = 0
+    for axis, stride in (template.get("cidr_offsets") or {}).items():
+        if axis in variables:
+            offset += template["matrix"][axis].index(variables[axis]) * int(stride)
+    if offset and "resources" in config:
+        config["resources"] = shift_cidrs(config["resources"], offset)
+    return config
+
+def config_hash(config: dict, for_each: bool, renderer_digest: str) -> str:
+    payload = json.dumps({"config": config, "for_each": for_each, "renderer": renderer_digest}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# Worker state, set once per process by init_worker so the template is pickled per worker, not per task
+_WORKER: dict = {}
+
+def init_worker(template: dict, project_root: str, runs_root: str, for_each: bool, project_exists: bool, renderer_digest: str) -> None:
+    _WORKER.update(template=template, project_root=project_root, runs_root=runs_root,
+                   for_each=for_each, project_exists=project_exists, renderer_digest=renderer_digest)
+
+def render_variant(variables: Dict[str, str]) -> dict:
+    w = _WORKER
+    try:
+        config = build_variant(w["template"], variables)
+        project_id = config.get("project_id")
+        error = validate_project_id(project_id)
+        if error:
+            return {"variables": variables, "project_id": project_id, "status": "invalid", "error": error}
+
+        run_dir = os.path.join(w["runs_root"], project_id)
+        digest = config_hash(config, w["for_each"], w["renderer_digest"])
+        hash_path = os.path.join(run_dir, HASH_FILE)
+        try:
+            with open(hash_path, "r", encoding="utf-8") as f:
+                if f.read().strip() == digest and os.path.exists(os.path.join(run_dir, "main.tf")):
+                    return {"variables": variables, "project_id": project_id, "status": "unchanged"}
+        except OSError:
+            pass
+
+        os.makedirs(run_dir, exist_ok=True)
+        # render_run_dir logs per file; keep worker output to one summary line per variant
+        with contextlib.redirect_stdout(io.StringIO()):
+            render_run_dir(run_dir, w["project_root"], config, w["project_exists"], for_each=w["for_each"])
+        with open(hash_path, "w", encoding="utf-8") as f:
+            f.write(digest + "\n")
+        return {"variables": variables, "project_id": project_id, "status": "rendered"}
+    except Exception as e:
+        return {"variables": variables, "project_id": None, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Render one base config into many .tf-runs projects via an overlay matrix.")
+    parser.add_argument("template", help="Fan-out template YAML (base + matrix + overlays)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 4, help="Render worker processes (default: CPU count)")
+    parser.add_argument("--only", help="Regex; only variants whose project_id matches are rendered")
+    parser.add_argument("--limit", type=int, help="Stop after this many variants")
+    parser.add_argument("--for-each", action="store_true", help="Use for_each rendering (see deploy.py --for-each)")
+    parser.add_argument("--project-exists", action="store_true", help="Render without the project module (projects already exist)")
+    parser.add_argument("--dry-run", action="store_true", help="List the variants' project ids without rendering")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args(sys.argv[1:])
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(script_dir)
+    runs_root = os.path.join(project_root, ".tf-runs")
+
+    try:
+        template = load_template(args.template)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+    variants = expand_variants(template)
+    if args.only:
+        only = re.compile(args.only)
+        variants = (v for v in variants if only.search(str(build_variant(template, v).get("project_id"))))
+    if args.limit:
+        variants = itertools.islice(variants, args.limit)
+
+    if args.dry_run:
+        for variables in variants:
+            print(f"{build_variant(template, variables).get('project_id')}\t{json.dumps(variables)}")
+        return
+
+    # Renderer changes must invalidate the per-variant hashes
+    renderer_digest = render.renderer_digest()
+
+    os.makedirs(runs_root, exist_ok=True)
+    counts: Dict[str, int] = {"rendered": 0, "unchanged": 0, "invalid": 0, "error": 0}
+    seen_projects: Dict[str, dict] = {}
+    max_in_flight = max(1, args.jobs) * 4
+    with ProcessPoolExecutor(
+        max_workers=max(1, args.jobs),
+        initializer=init_worker,
+        initargs=(template, project_root, runs_root, args.for_each, args.project_exists, renderer_digest),
+    ) as pool:
+        in_flight = set()
+
+        def drain() -> None:
+            nonlocal in_flight
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                status = result["status"]
+                pid = result.get("project_id")
+                if pid and pid in seen_projects and status in ("rendered", "unchanged"):
+                    status = "error"
+                    result["error"] = f"project_id collides with variant {json.dumps(seen_projects[pid])}"
+                if pid and status in ("rendered", "unchanged"):
+                    seen_projects[pid] = result["variables"]
+                counts[status] += 1
+                if status == "rendered":
+                    print(f"[INFO] Rendered {pid}")
+                elif status in ("invalid", "error"):
+                    print(f"[ERROR] {json.dumps(result['variables'])}: {result['error']}")
+
+        # Submit lazily with a bounded window so thousands of variants never sit in memory at once
+        for variables in variants:
+            in_flight.add(pool.submit(render_variant, variables))
+            if len(in_flight) >= max_in_flight:
+                drain()
+        while in_flight:
+            drain()
+
+    print(f"[INFO] Fan-out complete: {counts['rendered']} rendered, {counts['unchanged']} unchanged, "
+          f"{counts['invalid']} invalid, {counts['error']} error(s) -> {runs_root}")
+    if counts["invalid"] or counts["error"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
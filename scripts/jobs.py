@@ -0,0 +1,545 @@
+#for usage import from the GUI; runs deploy.py/destroy.py in the background with output in .tf-runs/.gui-jobs/<job_id>.log
+import codecs
+import contextlib
+import hashlib
+import json
+import os
+import re
+import secrets
+import signal
+import sqlite3
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import telemetry
+
+ANSI_ESCAPE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+POLL_SECONDS = 1.0   # how often progress trackers look at files other than the job's own output
+DEFAULT_WORKERS = int(os.environ.get("GUI_JOB_WORKERS", "2"))  # jobs the queue runs at once
+SCHEMA_VERSION = 1
+FINISHED = ("succeeded", "failed", "cancelled", "interrupted")
+
+_jobs: Dict[str, "Job"] = {}
+_lock = threading.Lock()
+
+def new_job_id() -> str:
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(3)}"
+
+def strip_ansi(text: str) -> str:
+    return ANSI_ESCAPE.sub("", text)
+
+def jobs_dir(project_root: str) -> str:
+    return os.path.join(project_root, ".tf-runs", ".gui-jobs")
+
+def format_elapsed(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m {seconds:02d}s" if hours else f"{minutes}m {seconds:02d}s"
+
+class Progress:
+    """Fraction done (0..1) and a label, parsed from a job's output; never moves backwards."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.fraction = 0.0
+        self.label = "Starting..."
+
+    def advance(self, fraction: float, label: Optional[str] = None) -> None:
+        self.fraction = max(self.fraction, min(fraction, 1.0))
+        if label:
+            self.label = label
+
+    def feed(self, line: str) -> None:
+        pass
+
+    def poll(self) -> None:
+        """Called every POLL_SECONDS while the job runs, for trackers that also follow other files."""
+
+    def finish(self, status: str) -> None:
+        with self.lock:
+            if status == "succeeded":
+                self.advance(1.0, "Completed")
+            else:
+                self.label = {"cancelled": "Cancelled", "failed": "Failed"}.get(status, status)
+
+class DeployProgress(Progress):
+    """deploy.py's phases, then one step per resource Terraform reports as applied."""
+
+    MILESTONES: Sequence[Tuple["re.Pattern", float, str]] = [
+        (re.compile(r"^=== Processing: "), 0.05, "Loading configuration"),
+        (re.compile(r"^\[INFO\] Wrote tfvars"), 0.10, "Rendered Terraform files"),
+        (re.compile(r"^\[INFO\] Running Terraform in"), 0.15, "terraform init"),
+        (re.compile(r"^Terraform has been successfully initialized"), 0.20, "Initialized"),
+        (re.compile(r"^\[INFO\] Phase 1: Plan project"), 0.25, "Planning project and APIs"),
+        (re.compile(r"^\[INFO\] Phase 2: Full plan"), 0.35, "Planning remaining resources"),
+        (re.compile(r"^\[INFO\] Proceeding to apply"), 0.50, "Applying"),
+        (re.compile(r"^\[INFO\] Skipped apply"), 1.0, "Plan complete; apply skipped"),
+        (re.compile(r"Resume: apply already completed"), 1.0, "Already applied"),
+    ]
+    PLAN = re.compile(r"^Plan: (\d+) to import, (\d+) to add, (\d+) to change, (\d+) to destroy|^Plan: (\d+) to add, (\d+) to change, (\d+) to destroy")
+    APPLIED = re.compile(r": (?:Creation|Modifications|Destruction|Import) complete after ")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.applying = False
+        self.planned = 0
+        self.applied = 0
+
+    def feed(self, line: str) -> None:
+        with self.lock:
+            for pattern, fraction, label in self.MILESTONES:
+                if pattern.search(line):
+                    self.applying = self.applying or fraction == 0.50
+                    self.advance(fraction, label)
+                    return
+            plan = self.PLAN.match(line)
+            if plan:
+                # Each apply (project module, then the rest) prints its own plan first
+                if self.applying:
+                    self.planned += sum(int(n) for n in plan.groups() if n)
+                self.label = line.rstrip(".")
+            elif self.applying and self.APPLIED.search(line):
+                self.applied += 1
+                total = max(self.planned, self.applied)
+                self.advance(0.50 + 0.49 * self.applied / total, f"Applied {self.applied}/{total} resource change(s)")
+
+class DestroyProgress(Progress):
+    """Per-project completion from destroy.py's summary lines, refined by the destroy waves
+    each project's own log (.tf-runs/.destroy-logs/<project_id>-<timestamp>.log) reports."""
+
+    DONE = re.compile(r"^\[(?:INFO|ERROR)\] (\S+): \w+ \w+ in [\d.]+s \((\d+)/(\d+)\)")
+    WAVE = re.compile(r"^\[INFO\] Wave (\d+)/(\d+):")
+
+    def __init__(self, projects: Sequence[str], logs_dir: str) -> None:
+        super().__init__()
+        self.projects = list(dict.fromkeys(projects))
+        self.logs_dir = logs_dir
+        self.started = time.time()
+        self.done: Dict[str, bool] = {}
+        self.waves: Dict[str, float] = {}
+        self.logs: Dict[str, str] = {}
+        self.offsets: Dict[str, int] = {}
+
+    def update(self) -> None:
+        total = max(1, len(self.projects))
+        share = sum(1.0 if self.done.get(pid) else self.waves.get(pid, 0.0) for pid in self.projects)
+        self.advance(0.95 * share / total)
+
+    def feed(self, line: str) -> None:
+        with self.lock:
+            done = self.DONE.match(line)
+            if done:
+                self.done[done.group(1)] = True
+                self.update()
+                self.label = f"{done.group(2)}/{done.group(3)} project(s) finished"
+            elif line.startswith("[INFO] Waiting for deletion"):
+                self.label = "Confirming project deletion"
+
+    def poll(self) -> None:
+        for pid in self.projects:
+            path = self.logs.get(pid) or self.find_log(pid)
+            if not path:
+                continue
+            self.logs[pid] = path
+            try:
+                with open(path, "rb") as f:
+                    f.seek(self.offsets.get(pid, 0))
+                    data = f.read()
+            except OSError:
+                continue
+            # Only whole lines; a partial one is read again next time
+            end = data.rfind(b"\n") + 1
+            self.offsets[pid] = self.offsets.get(pid, 0) + end
+            with self.lock:
+                for line in strip_ansi(data[:end].decode("utf-8", errors="replace")).splitlines():
+                    wave = self.WAVE.match(line)
+                    if wave:
+                        n, count = int(wave.group(1)), int(wave.group(2))
+                        self.waves[pid] = (n - 1) / count
+                        if len(self.projects) == 1:
+                            self.label = f"Destroy wave {n}/{count}"
+                self.update()
+
+    def find_log(self, pid: str) -> Optional[str]:
+        try:
+            names = [name for name in os.listdir(self.logs_dir) if name.startswith(f"{pid}-") and name.endswith(".log")]
+        except OSError:
+            return None
+        paths = [os.path.join(self.logs_dir, name) for name in sorted(names)]
+        # A log from an earlier run of the same project is not this job's
+        paths = [p for p in paths if os.path.getmtime(p) >= self.started - 1]
+        return paths[-1] if paths else None
+
+class Job:
+    """One deploy.py/destroy.py run in the background.
+
+    Output (stdout and stderr) goes to log_path as it arrives, which is what the GUI's log
+    viewer reads (see logindex.py); the job only parses it for progress. There is no timeout; cancel() interrupts
+    the whole process group (Terraform then stops gracefully), cancel(force=True) kills it.
+    With a recorder, the run is one `phase` span of the caller's trace and each of `projects`
+    gets a success/failure result.
+    """
+
+    def __init__(self, kind: str, title: str, cmd: List[str], cwd: str, env: Optional[Dict[str, str]] = None,
+                 stdin_text: Optional[str] = None, progress: Optional[Progress] = None,
+                 recorder: Optional[telemetry.Recorder] = None, phase: Optional[str] = None,
+                 projects: Sequence[str] = (), job_id: Optional[str] = None):
+        self.id = job_id or new_job_id()
+        self.kind = kind
+        self.title = title
+        self.cmd = cmd
+        self.cwd = cwd
+        # env holds only what differs from this process's environment
+        self.env = {**os.environ, **(env or {})}
+        self.stdin_text = stdin_text
+        self.progress = progress or Progress()
+        self.recorder = recorder
+        self.phase = phase or kind
+        self.projects = list(projects)
+        self.log_path = os.path.join(jobs_dir(cwd), f"{self.id}.log")
+        self.partial = ""
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+        self.proc: Optional[subprocess.Popen] = None
+        self.status = "queued"
+        self.returncode: Optional[int] = None
+        self.error = ""
+        self.cancel_requested = False
+        self.started_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished.is_set()
+
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.ended_at or time.time()) - self.started_at
+
+    def popen(self) -> subprocess.Popen:
+        # Own process group, so cancel() reaches Terraform as well as the script
+        if os.name == "nt":
+            group = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            group = {"start_new_session": True}
+        proc = subprocess.Popen(
+            self.cmd, cwd=self.cwd, env=self.env,
+            stdin=subprocess.PIPE if self.stdin_text is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, **group,
+        )
+        if self.stdin_text is not None:
+            try:
+                proc.stdin.write(self.stdin_text.encode("utf-8"))
+                proc.stdin.close()
+            except OSError:
+                pass
+        return proc
+
+    def append(self, text: str) -> None:
+        pieces = (self.partial + strip_ansi(text)).split("\n")
+        self.partial = pieces.pop()
+        for piece in pieces:
+            self.progress.feed(piece.rstrip("\r"))
+
+    def pump(self, log) -> None:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while True:
+            chunk = self.proc.stdout.read1(65536)
+            text = decoder.decode(chunk, final=not chunk)
+            if text:
+                log.write(text)
+                log.flush()
+                self.append(text)
+            if not chunk:
+                return
+
+    def follow(self) -> None:
+        while not self.finished.wait(POLL_SECONDS):
+            try:
+                self.progress.poll()
+            except Exception:
+                pass  # progress is cosmetic; never let it take the job down
+
+    def run(self) -> None:
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        self.started_at = time.time()
+        self.status = "running"
+        threading.Thread(target=self.follow, name=f"job-{self.id}-progress", daemon=True).start()
+        with open(self.log_path, "w", encoding="utf-8") as log:
+            try:
+                with self.recorder.phase(self.phase) if self.recorder else contextlib.nullcontext():
+                    if self.recorder:
+                        # The script's trace joins the caller's via TRACEPARENT
+                        self.env["TRACEPARENT"] = self.recorder.traceparent()
+                    with self.lock:
+                        self.proc = self.popen()
+                    self.pump(log)
+                    self.returncode = self.proc.wait()
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                log.write(f"\n[ERROR] {self.error}\n")
+                self.append(f"\n[ERROR] {self.error}\n")
+        self.ended_at = time.time()
+        if self.cancel_requested:
+            self.status = "cancelled"
+        else:
+            self.status = "succeeded" if self.returncode == 0 else "failed"
+        with contextlib.suppress(Exception):
+            self.progress.poll()
+        self.progress.finish(self.status)
+        if self.recorder:
+            for pid in self.projects:
+                self.recorder.result(pid, "success" if self.status == "succeeded" else "failure")
+            with contextlib.suppress(Exception):
+                self.recorder.flush()
+        self.finished.set()
+
+    def cancel(self, force: bool = False) -> None:
+        """Interrupt the job (Ctrl+C for the whole process group); force=True kills it outright."""
+        with self.lock:
+            proc = self.proc
+            if proc is None or self.done or proc.poll() is not None:
+                return
+            self.cancel_requested = True
+        try:
+            if os.name == "nt":
+                if force:
+                    subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True)
+                else:
+                    proc.send_signal(signal.CTRL_BREAK_EVENT)
+            else:
+                os.killpg(proc.pid, signal.SIGKILL if force else signal.SIGINT)
+        except OSError:
+            pass
+
+def get(job_id: Optional[str]) -> Optional[Job]:
+    """The Job object for a job running (or finished) in this process; JobQueue.get has the record."""
+    with _lock:
+        return _jobs.get(job_id) if job_id else None
+
+def make_progress(kind: str, projects: Sequence[str], project_root: str) -> Progress:
+    if kind == "deploy":
+        return DeployProgress()
+    if kind == "destroy":
+        return DestroyProgress(projects, os.path.join(project_root, ".tf-runs", ".destroy-logs"))
+    return Progress()
+
+class JobQueue:
+    """GUI jobs recorded in SQLite (.tf-runs/.gui-jobs/jobs.db) and run by a bounded worker pool.
+
+    enqueue() stores a job as "queued" and returns at once; an identical job (same kind, config,
+    options and projects) that is still queued is returned instead of adding another. A dispatcher
+    thread starts queued jobs oldest first, at most `limit` at a time, and never two jobs touching
+    the same project at once. Records outlive the GUI: queued jobs run after a restart, jobs that
+    were running when the GUI stopped are marked "interrupted".
+    """
+
+    COLUMNS = ("id", "kind", "title", "config", "options", "projects", "cmd", "env", "stdin", "phase", "dedup_key",
+               "status", "created_at", "started_at", "ended_at", "returncode", "error", "log_path",
+               "progress", "label", "project_logs")
+    JSON_COLUMNS = ("options", "projects", "cmd", "env", "project_logs")
+
+    def __init__(self, project_root: str, limit: int = DEFAULT_WORKERS):
+        self.project_root = project_root
+        self.db_path = os.path.join(jobs_dir(project_root), "jobs.db")
+        self.limit = max(1, limit)
+        self.wakeup = threading.Condition()
+        self.running: Dict[str, Job] = {}
+        os.makedirs(jobs_dir(project_root), exist_ok=True)
+        with self.connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, kind TEXT NOT NULL, title TEXT, config TEXT, options TEXT, projects TEXT,
+                cmd TEXT, env TEXT, stdin TEXT, phase TEXT, dedup_key TEXT, status TEXT NOT NULL,
+                created_at REAL, started_at REAL, ended_at REAL, returncode INTEGER, error TEXT, log_path TEXT,
+                progress REAL, label TEXT, project_logs TEXT)""")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_by_created ON jobs (created_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_by_kind ON jobs (kind, created_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_by_dedup ON jobs (dedup_key, status)")
+            db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            # Nothing can still be attached to jobs a previous GUI process was running
+            db.execute("UPDATE jobs SET status='interrupted', ended_at=?, error='GUI stopped while the job was running' "
+                       "WHERE status='running'", (time.time(),))
+        threading.Thread(target=self.dispatch, name="job-dispatcher", daemon=True).start()
+
+    def connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+    @contextlib.contextmanager
+    def transaction(self):
+        db = self.connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            yield db
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def record(self, row: sqlite3.Row) -> Dict[str, Any]:
+        found = dict(row)
+        for column in self.JSON_COLUMNS:
+            if column in found:
+                found[column] = json.loads(found[column]) if found[column] else None
+        return found
+
+    def enqueue(self, kind: str, title: str, cmd: List[str], config: str = "", options: Optional[dict] = None,
+                projects: Sequence[str] = (), env: Optional[Dict[str, str]] = None, stdin_text: Optional[str] = None,
+                phase: Optional[str] = None) -> Tuple[str, bool]:
+        """Queue a job; returns (job_id, deduplicated) where deduplicated means an identical job was already queued."""
+        options = options or {}
+        key = hashlib.sha256(json.dumps([kind, config, options, sorted(projects)], sort_keys=True).encode("utf-8")).hexdigest()
+        with self.transaction() as db:
+            existing = db.execute("SELECT id FROM jobs WHERE dedup_key=? AND status='queued' LIMIT 1", (key,)).fetchone()
+            if existing:
+                return existing["id"], True
+            job_id = new_job_id()
+            db.execute(
+                "INSERT INTO jobs (id, kind, title, config, options, projects, cmd, env, stdin, phase, dedup_key, status, "
+                "created_at, log_path, progress, label) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'queued', ?, ?, 0, 'Queued')",
+                (job_id, kind, title, config, json.dumps(options), json.dumps(list(projects)), json.dumps(cmd),
+                 json.dumps(env or {}), stdin_text, phase or kind, key, time.time(),
+                 os.path.join(jobs_dir(self.project_root), f"{job_id}.log")))
+        with self.wakeup:
+            self.wakeup.notify_all()
+        return job_id, False
+
+    def get(self, job_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not job_id:
+            return None
+        with contextlib.closing(self.connect()) as db:
+            row = db.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return self.record(row) if row else None
+
+    def where(self, statuses: Sequence[str] = (), kind: Optional[str] = None, search: str = "") -> Tuple[str, list]:
+        clauses, params = [], []
+        if statuses:
+            clauses.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if kind:
+            clauses.append("kind=?")
+            params.append(kind)
+        if search:
+            clauses.append("(title LIKE ? OR config LIKE ? OR projects LIKE ? OR id LIKE ?)")
+            params.extend([f"%{search}%"] * 4)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, statuses: Sequence[str] = (), kind: Optional[str] = None, search: str = "") -> int:
+        where, params = self.where(statuses, kind, search)
+        with contextlib.closing(self.connect()) as db:
+            return db.execute(f"SELECT COUNT(*) FROM jobs{where}", params).fetchone()[0]
+
+    def list(self, statuses: Sequence[str] = (), kind: Optional[str] = None, search: str = "",
+             limit: int = 25, offset: int = 0) -> List[Dict[str, Any]]:
+        """One page of job records matching the filters, newest first."""
+        where, params = self.where(statuses, kind, search)
+        columns = ", ".join(c for c in self.COLUMNS if c not in ("cmd", "env", "stdin"))
+        with contextlib.closing(self.connect()) as db:
+            rows = db.execute(f"SELECT {columns} FROM jobs{where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                              [*params, limit, offset]).fetchall()
+        return [self.record(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with contextlib.closing(self.connect()) as db:
+            return {row[0]: row[1] for row in db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")}
+
+    def latest(self, kind: str) -> Dict[str, Dict[str, Any]]:
+        """The newest job of a kind for each config: {config: {"status", "created_at", "ended_at"}}."""
+        with contextlib.closing(self.connect()) as db:
+            # SQLite takes the other columns from the row holding MAX(created_at)
+            rows = db.execute("SELECT config, status, MAX(created_at) AS created_at, ended_at FROM jobs "
+                              "WHERE kind=? GROUP BY config", (kind,)).fetchall()
+        return {row["config"]: dict(row) for row in rows}
+
+    def queue_position(self, job_id: str) -> int:
+        with contextlib.closing(self.connect()) as db:
+            return db.execute("SELECT COUNT(*) FROM jobs WHERE status='queued' AND created_at <= "
+                              "(SELECT created_at FROM jobs WHERE id=?)", (job_id,)).fetchone()[0]
+
+    def set_limit(self, limit: int) -> None:
+        with self.wakeup:
+            self.limit = max(1, limit)
+            self.wakeup.notify_all()
+
+    def cancel(self, job_id: str, force: bool = False) -> None:
+        """Drop a queued job, or interrupt (force: kill) a running one."""
+        with self.transaction() as db:
+            db.execute("UPDATE jobs SET status='cancelled', ended_at=?, label='Cancelled' WHERE id=? AND status='queued'",
+                       (time.time(), job_id))
+        job = self.running.get(job_id)
+        if job:
+            job.cancel(force=force)
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Mark the oldest startable queued job running and return it, or None."""
+        with self.transaction() as db:
+            busy = set()
+            for row in db.execute("SELECT projects FROM jobs WHERE status='running'"):
+                busy.update(json.loads(row["projects"] or "[]"))
+            for row in db.execute("SELECT * FROM jobs WHERE status='queued' ORDER BY created_at"):
+                if busy.isdisjoint(json.loads(row["projects"] or "[]")):
+                    db.execute("UPDATE jobs SET status='running', started_at=?, label='Starting...' WHERE id=?",
+                               (time.time(), row["id"]))
+                    return self.record(row)
+        return None
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a claimed job that never started failed, freeing its projects."""
+        try:
+            with self.transaction() as db:
+                db.execute("UPDATE jobs SET status='failed', ended_at=?, error=?, label='Failed' WHERE id=?",
+                           (time.time(), error, job_id))
+        except sqlite3.Error:
+            pass
+
+    def dispatch(self) -> None:
+        while True:
+            with self.wakeup:
+                while len(self.running) >= self.limit:
+                    self.wakeup.wait()
+            try:
+                record = self.claim()
+            except sqlite3.Error:
+                record = None
+            if record is None:
+                with self.wakeup:
+                    # Also look again now and then: a running job elsewhere may have freed its projects
+                    self.wakeup.wait(timeout=POLL_SECONDS * 5)
+                continue
+            try:
+                job = Job(record["kind"], record["title"], record["cmd"], self.project_root, record["env"],
+                          stdin_text=record["stdin"], progress=make_progress(record["kind"], record["projects"], self.project_root),
+                          # GUI-side metrics and trace: end-to-end action time as the user sees it (the scripts record their own phases)
+                          recorder=telemetry.Recorder("gui", root_name=f"gui {record['kind']}"),
+                          phase=record["phase"], projects=record["projects"], job_id=record["id"])
+            except Exception as e:
+                # The row is already running: fail it here or it holds its projects until the GUI restarts
+                self.fail(record["id"], f"Could not start job: {e}")
+                continue
+            with self.wakeup:
+                self.running[job.id] = job
+            with _lock:
+                _jobs[job.id] = job
+            threading.Thread(target=self.work, args=(job,), name=f"job-{job.id}", daemon=True).start()
+
+    def work(self, job: Job) -> None:
+        try:
+            job.run()
+        finally:
+            project_logs = getattr(job.progress, "logs", None)
+            with self.transaction() as db:
+                db.execute("UPDATE jobs SET status=?, started_at=?, ended_at=?, returncode=?, error=?, progress=?, label=?, "
+                           "project_logs=? WHERE id=?",
+                           (job.status, job.started_at, job.ended_at, job.returncode, job.error, job.progress.fraction,
+                            job.progress.label, json.dumps(project_logs) if project_logs else None, job.id))
+            with self.wakeup:
+                self.running.pop(job.id, None)
+                self.wakeup.notify_all()
@@ -0,0 +1,195 @@
+#for usage import from the GUI (log viewer); indexes deploy/destroy logs in place: <log>.idx + <log>.idx.json
+import array
+import bisect
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Tuple
+
+from jobs import strip_ansi
+
+INDEX_VERSION = 1
+CHUNK_BYTES = 1024 * 1024   # how much log is read at a time while indexing or searching
+PARTIAL_MAX = 64 * 1024     # most of an unterminated last line (e.g. a prompt) that is shown
+ERROR_BLOCK_LINES = 8       # a Terraform "with <address>," this soon after an Error: names the failed resource
+
+ERROR_LINE = re.compile(r"\[ERROR\]|(?:^|[\s│╷])Error: |^Traceback \(most recent call last\)")
+WARN_LINE = re.compile(r"\[WARN\]|(?:^|[\s│╷])Warning: ")
+WITH_ADDRESS = re.compile(r"^[\s│]*with ([^\s,]+),")
+
+_indexes: Dict[str, "LogIndex"] = {}
+_lock = threading.Lock()
+
+class LogIndex:
+    """Byte offset of every line of a (possibly growing) log, plus its ERROR/WARN lines and the
+    Terraform resource addresses named in its errors.
+
+    refresh() indexes only what was appended since the last call, and the index is kept beside the
+    log (<log>.idx holds the offsets as int64s, <log>.idx.json the rest), so reopening a finished
+    200k-line log does not read it again. Reads then seek straight to the byte ranges they need.
+    Only complete lines are indexed; partial() returns an unterminated last line.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.offsets = array.array("q", [0])  # offsets[i] = start of line i; offsets[-1] = end of indexed data
+        self.errors: List[int] = []
+        self.warnings: List[int] = []
+        self.failed: Dict[str, int] = {}
+        self.last_error = -ERROR_BLOCK_LINES - 1
+        self.load()
+
+    @property
+    def lines(self) -> int:
+        return len(self.offsets) - 1
+
+    def sidecar(self) -> dict:
+        return {"version": INDEX_VERSION, "indexed": self.offsets[-1], "lines": self.lines, "errors": self.errors,
+                "warnings": self.warnings, "failed": self.failed, "last_error": self.last_error}
+
+    def load(self) -> None:
+        try:
+            with open(f"{self.path}.idx.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            offsets = array.array("q")
+            with open(f"{self.path}.idx", "rb") as f:
+                offsets.frombytes(f.read())
+        except (OSError, ValueError):
+            return
+        # Only trust an index that matches itself and a log at least as long as what it covers
+        if (meta.get("version") != INDEX_VERSION or len(offsets) != meta.get("lines", -1) + 1 or not offsets
+                or offsets[-1] != meta.get("indexed") or self.size() < offsets[-1]):
+            return
+        self.offsets = offsets
+        self.errors, self.warnings = meta["errors"], meta["warnings"]
+        self.failed, self.last_error = meta["failed"], meta["last_error"]
+
+    def save(self, new_offsets: array.array, rewrite: bool) -> None:
+        try:
+            with open(f"{self.path}.idx", "wb" if rewrite else "ab") as f:
+                (self.offsets if rewrite else new_offsets).tofile(f)
+            tmp_path = f"{self.path}.idx.json.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.sidecar(), f)
+            os.replace(tmp_path, f"{self.path}.idx.json")
+        except OSError:
+            pass  # a read-only log is still indexed in memory
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def classify(self, line_no: int, raw: bytes) -> None:
+        # Cheap byte checks first: almost every line is neither
+        if b"rror" not in raw and b"arn" not in raw and b"with " not in raw and b"Traceback" not in raw:
+            return
+        text = strip_ansi(raw.decode("utf-8", errors="replace"))
+        if ERROR_LINE.search(text):
+            self.errors.append(line_no)
+            self.last_error = line_no
+        elif WARN_LINE.search(text):
+            self.warnings.append(line_no)
+        elif line_no - self.last_error <= ERROR_BLOCK_LINES:
+            found = WITH_ADDRESS.match(text)
+            if found:
+                self.failed.setdefault(found.group(1), line_no)
+
+    def refresh(self) -> "LogIndex":
+        """Index whatever was appended to the log since the last refresh."""
+        with self.lock:
+            size = self.size()
+            rewrite = size < self.offsets[-1]
+            if rewrite:
+                # The log was replaced; start over
+                self.offsets, self.errors, self.warnings, self.failed = array.array("q", [0]), [], [], {}
+                self.last_error = -ERROR_BLOCK_LINES - 1
+            start = self.offsets[-1]
+            if size == start:
+                return self
+            new_offsets = array.array("q")
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                position = start
+                carry = b""
+                while position < size:
+                    chunk = f.read(min(CHUNK_BYTES, size - position))
+                    if not chunk:
+                        break
+                    data = carry + chunk
+                    base = position - len(carry)
+                    line_start = 0
+                    newline = data.find(b"\n")
+                    while newline != -1:
+                        self.classify(self.lines + len(new_offsets), data[line_start:newline])
+                        new_offsets.append(base + newline + 1)
+                        line_start = newline + 1
+                        newline = data.find(b"\n", line_start)
+                    carry = data[line_start:]
+                    position += len(chunk)
+            if new_offsets:
+                self.offsets.extend(new_offsets)
+                # The first save also writes offsets[0]
+                self.save(new_offsets, rewrite or start == 0)
+            return self
+
+    def read_lines(self, first: int, last: int) -> List[str]:
+        """Lines first..last-1 (0-based), ANSI codes stripped, from one read of their byte range."""
+        first, last = max(0, first), min(last, self.lines)
+        if first >= last:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self.offsets[first])
+            data = f.read(self.offsets[last] - self.offsets[first])
+        return [line.rstrip("\r") for line in strip_ansi(data.decode("utf-8", errors="replace")).split("\n")[: last - first]]
+
+    def read_numbered(self, line_numbers: List[int]) -> List[Tuple[int, str]]:
+        """Specific lines, each read from its own byte range (runs of neighbours in one read)."""
+        found: List[Tuple[int, str]] = []
+        run: List[int] = []
+        for n in sorted(line_numbers) + [None]:
+            if run and (n is None or n != run[-1] + 1):
+                found.extend(zip(run, self.read_lines(run[0], run[-1] + 1)))
+                run = []
+            if n is not None:
+                run.append(n)
+        return found
+
+    def partial(self) -> str:
+        """An unterminated last line (such as a prompt), or ''."""
+        start = self.offsets[-1]
+        size = self.size()
+        if size <= start:
+            return ""
+        with open(self.path, "rb") as f:
+            f.seek(max(start, size - PARTIAL_MAX))
+            return strip_ansi(f.read().decode("utf-8", errors="replace"))
+
+    def search(self, query: str, after: int = -1, limit: int = 200) -> Tuple[List[Tuple[int, str]], bool]:
+        """Up to `limit` (line number, text) pairs after line `after` containing query (case-insensitive),
+        and whether there may be more. Reads the log forward from `after` only as far as it needs to."""
+        needle = query.lower()
+        found: List[Tuple[int, str]] = []
+        line = after + 1
+        while line < self.lines:
+            # A chunk of whole lines, about CHUNK_BYTES long
+            end = max(line + 1, bisect.bisect_right(self.offsets, self.offsets[line] + CHUNK_BYTES, lo=line) - 1)
+            end = min(end, self.lines)
+            for n, text in enumerate(self.read_lines(line, end), start=line):
+                if needle in text.lower():
+                    found.append((n, text))
+                    if len(found) == limit:
+                        return found, n + 1 < self.lines
+            line = end
+        return found, False
+
+def open_index(path: str) -> LogIndex:
+    """The up-to-date index for a log, shared by every caller in this process."""
+    with _lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = LogIndex(path)
+    return index.refresh()
@@ -0,0 +1,118 @@
+#for usage python scripts/deploy.py --profile ... / python scripts/destroy.py --profile ...; reports land in .tf-runs/<project_id>/profile/
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import telemetry
+
+TOP_FUNCTIONS = 30
+
+def profile_dir(project_root: str, project_id: str) -> str:
+    """.tf-runs/<project_id>/profile, or .tf-runs/.profiles/<project_id> once the run dir is gone (project destroy)."""
+    run_dir = os.path.join(project_root, ".tf-runs", project_id)
+    if os.path.isdir(run_dir):
+        return os.path.join(run_dir, "profile")
+    return os.path.join(project_root, ".tf-runs", ".profiles", project_id)
+
+class Profiler:
+    """CPU profile (cProfile), peak traced memory (tracemalloc) and the subprocess calls of the enclosed block.
+
+    On exit it writes <label>-<timestamp>.prof (pstats, e.g. for snakeviz), .txt (human report)
+    and .json (summary) into profile_dir(project_root, project_id). Subprocess timings come
+    from telemetry.run, so only calls made through it are listed.
+    """
+
+    def __init__(self, label: str, project_root: str, project_id: str):
+        self.label = label
+        self.project_root = project_root
+        self.project_id = project_id
+        self.profile = cProfile.Profile()
+        self.started_tracemalloc = False
+        self.summary: Dict = {}
+        self.report = ""
+        self.paths: Dict[str, str] = {}
+
+    def __enter__(self) -> "Profiler":
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+            self.started_tracemalloc = True
+        self.start_ns = time.time_ns()
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.profile.disable()
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        _, peak = tracemalloc.get_traced_memory()
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+        calls = telemetry.subprocess_calls(self.start_ns)
+        try:
+            self.write(wall, cpu, peak, calls, failed=exc_type is not None)
+        except OSError as e:
+            print(f"[WARN] Could not write profile: {e}")
+
+    def write(self, wall: float, cpu: float, peak: int, calls: List[dict], failed: bool) -> None:
+        by_tool: Dict[str, float] = {}
+        for call in calls:
+            by_tool[call["tool"]] = by_tool.get(call["tool"], 0.0) + call["seconds"]
+        subprocess_seconds = sum(by_tool.values())
+        self.summary = {
+            "label": self.label,
+            "project_id": self.project_id,
+            "failed": failed,
+            "wall_seconds": round(wall, 3),
+            "python_cpu_seconds": round(cpu, 3),
+            "subprocess_seconds": round(subprocess_seconds, 3),
+            "subprocess_seconds_by_tool": {t: round(v, 3) for t, v in sorted(by_tool.items())},
+            "python_wall_seconds": round(max(0.0, wall - subprocess_seconds), 3),
+            "peak_traced_memory_bytes": peak,
+            "subprocess_calls": [dict(c, seconds=round(c["seconds"], 3)) for c in calls],
+        }
+
+        lines = [
+            f"Profile: {self.label} {self.project_id}" + (" (failed)" if failed else ""),
+            f"Wall time:            {wall:10.3f} s",
+            f"Subprocess time:      {subprocess_seconds:10.3f} s  "
+            + ", ".join(f"{t} {v:.3f}" for t, v in sorted(by_tool.items())),
+            f"Python wall time:     {max(0.0, wall - subprocess_seconds):10.3f} s  (wall minus subprocesses)",
+            f"Python CPU time:      {cpu:10.3f} s",
+            f"Peak traced memory:   {peak / (1024 * 1024):10.2f} MiB",
+            "",
+        ]
+        if calls:
+            lines.append("Subprocess calls")
+            lines.append(f"  {'seconds':>9}  {'exit':>4}  command")
+            for call in calls:
+                exit_code = "" if call["exit_code"] is None else call["exit_code"]
+                lines.append(f"  {call['seconds']:9.3f}  {exit_code:>4}  {call['command']}")
+            lines.append("")
+        for sort_key, title in (("cumulative", "cumulative"), ("tottime", "own")):
+            out = io.StringIO()
+            pstats.Stats(self.profile, stream=out).sort_stats(sort_key).print_stats(TOP_FUNCTIONS)
+            lines.append(f"Top {TOP_FUNCTIONS} functions by {title} time")
+            lines.append(out.getvalue().strip())
+            lines.append("")
+        self.report = "\n".join(lines)
+
+        out_dir = profile_dir(self.project_root, self.project_id)
+        os.makedirs(out_dir, exist_ok=True)
+        base = os.path.join(out_dir, f"{self.label}-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}")
+        self.paths = {"prof": base + ".prof", "report": base + ".txt", "summary": base + ".json"}
+        self.profile.dump_stats(self.paths["prof"])
+        with open(self.paths["report"], "w", encoding="utf-8") as f:
+            f.write(self.report + "\n")
+        with open(self.paths["summary"], "w", encoding="utf-8") as f:
+            json.dump(self.summary, f, indent=2)
+        print(f"[INFO] Profile written -> {self.paths['report']} (pstats: {self.paths['prof']})")
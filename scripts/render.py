@@ -0,0 +1,1265 @@
+#for usage import from deploy.py and the GUI; python scripts/bench_render.py shows the cost of re-rendering after one edit
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Tuple
+
+# Rendered blocks are memoized per resource, keyed by a hash of the resource's canonical JSON and
+# whatever else the block depends on (its position, its module source, ...), so editing one bucket
+# re-renders one block. The memo is shared by every caller in the process and dropped when it fills.
+MEMO_LIMIT = 50000
+# Files whose content decides what gets rendered (see renderer_digest)
+RENDERER_FILES = ("render.py", "deploy.py")
+
+_memo: Dict[tuple, str] = {}
+_stats = {"hits": 0, "misses": 0}
+_lock = threading.Lock()
+
+def canonical_hash(item) -> str:
+    return hashlib.sha256(json.dumps(item, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")).hexdigest()
+
+def memoized(kind: str, item, context: tuple, build: Callable[[], str]) -> str:
+    """build() for an item of a resource kind, or the block built earlier for the same content and context."""
+    key = (kind, canonical_hash(item), context)
+    with _lock:
+        block = _memo.get(key)
+        if block is not None:
+            _stats["hits"] += 1
+            return block
+        _stats["misses"] += 1
+    block = build()
+    with _lock:
+        if len(_memo) >= MEMO_LIMIT:
+            _memo.clear()
+        _memo[key] = block
+    return block
+
+def memo_stats() -> Dict[str, int]:
+    """Memo hits and misses since the last clear_memo()."""
+    with _lock:
+        return dict(_stats, blocks=len(_memo))
+
+def clear_memo() -> None:
+    with _lock:
+        _memo.clear()
+        _stats.update(hits=0, misses=0)
+
+def renderer_digest() -> str:
+    """Hash of the rendering code, for caches of rendered output (deploy journal, fan-out run dirs)."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in RENDERER_FILES:
+        with open(os.path.join(script_dir, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def rel(from_dir: str, to_path: str) -> str:
+    return os.path.relpath(to_path, start=from_dir).replace("\\", "/")
+
+# ---- Module blocks (deploy.py) ----
+
+DEFAULT_VM_SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+
+# Argument builders: one per resource type. Each returns the full set of module
+# arguments (with YAML defaults applied) so every item of a type has the same shape.
+def storage_bucket_args(b: dict) -> dict:
+    return {
+        "name": b["name"],
+        "location": b.get("location", "US"),
+        "uniform_bucket_level_access": bool(b.get("uniform_bucket_level_access", True)),
+        "enable_versioning": bool(b.get("enable_versioning", False)),
+        "force_destroy": bool(b.get("force_destroy", False)),
+        "storage_class": b.get("storage_class"),
+        "public_access_prevention": b.get("public_access_prevention"),
+        "default_kms_key_name": b.get("default_kms_key_name"),
+        "logging": b.get("logging"),
+        "cors": b.get("cors", []),
+        "lifecycle_rules": b.get("lifecycle_rules", []),
+        "retention_policy": b.get("retention_policy"),
+        "labels": b.get("labels", {}),
+    }
+
+def vpc_args(vpc: dict) -> dict:
+    return {
+        "name": vpc["name"],
+        "routing_mode": vpc.get("routing_mode", "GLOBAL"),
+        "description": vpc.get("description"),
+        "mtu": vpc.get("mtu"),
+        "auto_create_subnetworks": bool(vpc.get("auto_create_subnetworks", False)),
+        "bgp_best_path_selection_mode": vpc.get("bgp_best_path_selection_mode"),
+        "bgp_always_compare_med": vpc.get("bgp_always_compare_med"),
+        "bgp_inter_region_cost": vpc.get("bgp_inter_region_cost"),
+        "enable_ula_internal_ipv6": bool(vpc.get("enable_ula_internal_ipv6", False)),
+        "internal_ipv6_range": vpc.get("internal_ipv6_range"),
+        "network_firewall_policy_enforcement_order": vpc.get("network_firewall_policy_enforcement_order"),
+        "network_profile": vpc.get("network_profile"),
+        "delete_default_routes_on_create": bool(vpc.get("delete_default_routes_on_create", False)),
+        "resource_manager_tags": vpc.get("resource_manager_tags", {}),
+    }
+
+def subnet_args(sn: dict) -> dict:
+    return {
+        "name": sn["name"],
+        "region": sn["region"],
+        "ip_cidr_range": sn["ip_cidr_range"],
+        "network": sn["network"],
+        "private_ip_google_access": bool(sn.get("private_ip_google_access", True)),
+        "purpose": sn.get("purpose"),
+        "description": sn.get("description"),
+        "reserved_internal_range": sn.get("reserved_internal_range"),
+        "role": sn.get("role"),
+        "private_ipv6_google_access": sn.get("private_ipv6_google_access"),
+        "stack_type": sn.get("stack_type", "IPV4_ONLY"),
+        "ipv6_access_type": sn.get("ipv6_access_type"),
+        "external_ipv6_prefix": sn.get("external_ipv6_prefix"),
+        "ip_collection": sn.get("ip_collection"),
+        "allow_subnet_cidr_routes_overlap": bool(sn.get("allow_subnet_cidr_routes_overlap", False)),
+        "send_secondary_ip_range_if_empty": bool(sn.get("send_secondary_ip_range_if_empty", False)),
+        "resource_manager_tags": sn.get("resource_manager_tags", {}),
+        "secondary_ip_ranges": sn.get("secondary_ip_ranges", []),
+        "secondary_ip_range": sn.get("secondary_ip_range", []),
+        "log_config": sn.get("log_config"),
+    }
+
+def firewall_args(fw: dict) -> dict:
+    return {
+        "name": fw["name"],
+        "network": fw["network"],
+        "direction": fw.get("direction", "INGRESS"),
+        "priority": int(fw.get("priority", 1000)),
+        "protocol": fw.get("protocol", "tcp"),
+        "ports": fw.get("ports", ["22"]),
+        "source_ranges": fw.get("source_ranges", ["0.0.0.0/0"]),
+        "source_tags": fw.get("source_tags", []),
+        "source_service_accounts": fw.get("source_service_accounts", []),
+        "target_tags": fw.get("target_tags", []),
+        "target_service_accounts": fw.get("target_service_accounts", []),
+        "destination_ranges": fw.get("destination_ranges", []),
+        "disabled": bool(fw.get("disabled", False)),
+        "description": fw.get("description"),
+        "enable_logging": bool(fw.get("enable_logging", False)),
+        "log_config": fw.get("log_config"),
+        "allows": fw.get("allows", []),
+        "denies": fw.get("denies", []),
+    }
+
+def service_account_args(sa: dict) -> dict:
+    return {
+        "account_id": sa["account_id"],
+        "display_name": sa.get("display_name"),
+        "description": sa.get("description"),
+        "disabled": bool(sa.get("disabled", False)),
+        "create_ignore_already_exists": bool(sa.get("create_ignore_already_exists", False)),
+        "roles": sa.get("roles", []),
+        "create_key": bool(sa.get("create_key", False)),
+        "key_algorithm": sa.get("key_algorithm"),
+        "public_key_type": sa.get("public_key_type"),
+        "private_key_type": sa.get("private_key_type"),
+        "key_file_path": sa.get("key_file_path"),
+    }
+
+def iam_args(ib: dict) -> dict:
+    return {
+        "iam_type": ib.get("iam_type", "member"),
+        "role": ib.get("role"),
+        "member": ib.get("member"),
+        "members": ib.get("members", []),
+        "policy_data": ib.get("policy_data"),
+        "service": ib.get("service"),
+        "audit_log_configs": ib.get("audit_log_configs", []),
+        "condition": ib.get("condition"),
+    }
+
+def pubsub_topic_args(pt: dict) -> dict:
+    return {
+        "name": pt["name"],
+        "labels": pt.get("labels", {}),
+        "subscriptions": pt.get("subscriptions", []),
+    }
+
+def cloud_run_args(cr: dict) -> dict:
+    return {
+        "name": cr["name"],
+        "location": cr.get("location", "us-central1"),
+        "image": cr["image"],
+        "allow_unauthenticated": bool(cr.get("allow_unauthenticated", False)),
+        "vpc_connector": cr.get("vpc_connector") or None,
+        "egress": cr.get("egress") or None,
+    }
+
+def cloud_sql_args(cs: dict) -> dict:
+    return {
+        "name": cs["name"],
+        "database_version": cs.get("database_version", "POSTGRES_14"),
+        "region": cs.get("region", "us-central1"),
+        "tier": cs.get("tier", "db-f1-micro"),
+        "deletion_protection": bool(cs.get("deletion_protection", False)),
+        "availability_type": cs.get("availability_type"),
+        "disk_size": cs.get("disk_size"),
+        "disk_type": cs.get("disk_type"),
+        "ipv4_enabled": bool(cs.get("ipv4_enabled", False)),
+        "private_network": cs.get("private_network"),
+        "authorized_networks": cs.get("authorized_networks", []),
+        "backup_configuration": cs.get("backup_configuration"),
+        "maintenance_window": cs.get("maintenance_window"),
+        "database_flags": cs.get("database_flags", []),
+        "insights_config": cs.get("insights_config"),
+        "kms_key_name": cs.get("kms_key_name"),
+    }
+
+def artifact_registry_args(ar: dict) -> dict:
+    return {
+        "name": ar["name"],
+        "location": ar.get("location", "us"),
+        "format": ar.get("format", "DOCKER"),
+        "description": ar.get("description"),
+    }
+
+def secret_args(sm: dict) -> dict:
+    return {
+        "name": sm["name"],
+        "value": sm.get("value", ""),
+        "replication": sm.get("replication"),
+        "additional_versions": sm.get("additional_versions", []),
+    }
+
+def dns_zone_args(dz: dict) -> dict:
+    return {
+        "name": dz["name"],
+        "dns_name": dz["dns_name"],
+        "description": dz.get("description"),
+        "record_sets": dz.get("record_sets", []),
+    }
+
+def static_ip_args(ip: dict) -> dict:
+    return {
+        "name": ip["name"],
+        "address_type": ip.get("address_type", "EXTERNAL"),
+        "region": ip.get("region"),
+        "network_tier": ip.get("network_tier"),
+        "subnetwork": ip.get("subnetwork"),
+        "purpose": ip.get("purpose"),
+        "address": ip.get("address"),
+        "description": ip.get("description"),
+    }
+
+def compute_instance_args(vm: dict) -> dict:
+    return {
+        "name": vm["name"],
+        "zone": vm.get("zone", "us-central1-a"),
+        "machine_type": vm.get("machine_type", "e2-micro"),
+        "image": vm.get("image", "debian-cloud/debian-11"),
+        "description": vm.get("description"),
+        "labels": vm.get("labels", {}),
+        "metadata": vm.get("metadata", {}),
+        "metadata_startup_script": vm.get("metadata_startup_script"),
+        "subnetwork": vm.get("subnetwork"),
+        "network": vm.get("network"),
+        "network_ip": vm.get("network_ip"),
+        "assign_external_ip": bool(vm.get("assign_external_ip", vm.get("create_public_ip", False))),
+        "external_network_tier": vm.get("external_network_tier"),
+        "allow_stopping_for_update": bool(vm.get("allow_stopping_for_update", True)),
+        "can_ip_forward": bool(vm.get("can_ip_forward", False)),
+        "deletion_protection": bool(vm.get("deletion_protection", False)),
+        "hostname": vm.get("hostname"),
+        "min_cpu_platform": vm.get("min_cpu_platform"),
+        "scheduling_preemptible": bool(vm.get("scheduling_preemptible", False)),
+        "scheduling_automatic_restart": bool(vm.get("scheduling_automatic_restart", True)),
+        "scheduling_on_host_maintenance": vm.get("scheduling_on_host_maintenance"),
+        "scheduling_provisioning_model": vm.get("scheduling_provisioning_model"),
+        "enable_display": bool(vm.get("enable_display", False)),
+        "enable_shielded_vm": bool(vm.get("enable_shielded_vm", False)),
+        "shielded_secure_boot": bool(vm.get("shielded_secure_boot", False)),
+        "shielded_vtpm": bool(vm.get("shielded_vtpm", True)),
+        "shielded_integrity_monitoring": bool(vm.get("shielded_integrity_monitoring", True)),
+        "enable_confidential_compute": bool(vm.get("enable_confidential_compute", False)),
+        "confidential_instance_type": vm.get("confidential_instance_type"),
+        "guest_accelerators": vm.get("guest_accelerators", []),
+        "boot_disk_size_gb": vm.get("boot_disk_size_gb"),
+        "boot_disk_type": vm.get("boot_disk_type"),
+        "boot_disk_auto_delete": bool(vm.get("boot_disk_auto_delete", True)),
+        "boot_disk_labels": vm.get("boot_disk_labels", {}),
+        "service_account_email": vm.get("service_account_email"),
+        "service_account_scopes": vm.get("service_account_scopes", DEFAULT_VM_SCOPES),
+        "additional_disks": vm.get("additional_disks", []),
+        "advanced_machine_features": vm.get("advanced_machine_features", {}),
+        "tags": vm.get("tags", []),
+    }
+
+def disk_args(dk: dict) -> dict:
+    return {
+        "name": dk["name"],
+        "zone": dk.get("zone", "us-central1-a"),
+        "size_gb": int(dk.get("size_gb", 10)),
+        "type": dk.get("type", "pd-standard"),
+        "image": dk.get("image"),
+        "snapshot": dk.get("snapshot"),
+        "labels": dk.get("labels", {}),
+        "kms_key_self_link": dk.get("kms_key_self_link"),
+    }
+
+def bigquery_dataset_args(ds: dict) -> dict:
+    return {
+        "dataset_id": ds["dataset_id"],
+        "location": ds.get("location", "US"),
+        "labels": ds.get("labels", {}),
+    }
+
+def cloud_function_args(fn: dict) -> dict:
+    return {
+        "name": fn["name"],
+        "location": fn.get("location", "us-central1"),
+        "description": fn.get("description"),
+        "runtime": fn["runtime"],
+        "entry_point": fn["entry_point"],
+        "source_bucket": fn["source_bucket"],
+        "source_object": fn["source_object"],
+        "memory": fn.get("memory", "256M"),
+        "timeout_seconds": int(fn.get("timeout_seconds", 60)),
+        "ingress_settings": fn.get("ingress_settings", "ALLOW_ALL"),
+        "max_instance_count": int(fn.get("max_instance_count", 1)),
+    }
+
+def gke_args(gke: dict) -> dict:
+    return {
+        "name": gke["name"],
+        "location": gke.get("location", "us-central1"),
+        "node_pool_name": gke.get("node_pool_name", "default-pool"),
+        "node_count": int(gke.get("node_count", 1)),
+        "machine_type": gke.get("machine_type", "e2-standard-2"),
+        "labels": gke.get("labels", {}),
+        "tags": gke.get("tags", []),
+        "network": gke.get("network"),
+        "subnetwork": gke.get("subnetwork"),
+        "cluster_secondary_range_name": gke.get("cluster_secondary_range_name"),
+        "services_secondary_range_name": gke.get("services_secondary_range_name"),
+        "enable_private_nodes": bool(gke.get("enable_private_nodes", False)),
+        "master_ipv4_cidr_block": gke.get("master_ipv4_cidr_block"),
+        "enable_network_policy": bool(gke.get("enable_network_policy", False)),
+        "node_auto_scaling": gke.get("node_auto_scaling"),
+        "node_labels": gke.get("node_labels", {}),
+        "node_taints": gke.get("node_taints", []),
+    }
+
+def cloud_router_args(cr: dict) -> dict:
+    return {
+        "name": cr["name"],
+        "region": cr["region"],
+        "network": cr["network"],
+        "asn": cr.get("asn"),
+        "bgp_advertised_ip_ranges": cr.get("bgp_advertised_ip_ranges", []),
+        "interfaces": cr.get("interfaces", []),
+        "bgp_peers": cr.get("bgp_peers", []),
+    }
+
+def cloud_nat_args(nat: dict) -> dict:
+    return {
+        "name": nat["name"],
+        "region": nat["region"],
+        "router": nat["router"],
+        "nat_ip_allocation": nat.get("nat_ip_allocation", "AUTO_ONLY"),
+        "source_subnetwork_ip_ranges_to_nat": nat.get("source_subnetwork_ip_ranges_to_nat", "ALL_SUBNETWORKS_ALL_IP_RANGES"),
+    }
+
+def redis_args(r: dict) -> dict:
+    return {
+        "name": r["name"],
+        "region": r.get("region", "us-central1"),
+        "tier": r.get("tier", "BASIC"),
+        "memory_size_gb": int(r.get("memory_size_gb", 1)),
+        "redis_version": r.get("redis_version", "REDIS_6_X"),
+        "display_name": r.get("display_name"),
+        "connect_mode": r.get("connect_mode", "DIRECT_PEERING"),
+        "authorized_network": r.get("authorized_network"),
+        "maintenance_policy": r.get("maintenance_policy"),
+        "persistence_config": r.get("persistence_config"),
+        "labels": r.get("labels", {}),
+    }
+
+def serverless_vpc_connector_args(c: dict) -> dict:
+    return {
+        "name": c["name"],
+        "region": c["region"],
+        "network": c["network"],
+        "ip_cidr_range": c["ip_cidr_range"],
+    }
+
+# Resource types in render order.
+#   key:        list under `resources:` in the YAML
+#   single_key: optional older key that holds one object (or a list); its items come first,
+#               and older renders named the first of them just <prefix>
+#   module:     directory under modules/
+#   prefix:     module name; per-item blocks are named <prefix>_<key>
+MODULE_TYPES: List[dict] = [
+    {"key": "storage_buckets", "module": "storage_bucket", "prefix": "storage_bucket", "args": storage_bucket_args},
+    {"key": "vpcs", "single_key": "vpc", "module": "vpc", "prefix": "vpc", "args": vpc_args},
+    {"key": "subnets", "module": "subnet", "prefix": "subnet", "args": subnet_args},
+    {"key": "firewall_rules", "module": "firewall", "prefix": "firewall", "args": firewall_args},
+    {"key": "service_accounts", "module": "service_account", "prefix": "service_account", "args": service_account_args},
+    {"key": "iam", "module": "iam", "prefix": "iam", "args": iam_args},
+    {"key": "pubsub_topics", "module": "pubsub", "prefix": "pubsub_topic", "args": pubsub_topic_args},
+    {"key": "cloud_run_services", "module": "cloud_run", "prefix": "cloud_run", "args": cloud_run_args},
+    {"key": "cloud_sql_instances", "module": "cloud_sql", "prefix": "cloud_sql", "args": cloud_sql_args},
+    {"key": "artifact_repos", "module": "artifact_registry", "prefix": "artifact_registry", "args": artifact_registry_args},
+    {"key": "secrets", "module": "secret_manager", "prefix": "secret", "args": secret_args},
+    {"key": "dns_zones", "module": "cloud_dns", "prefix": "dns_zone", "args": dns_zone_args},
+    {"key": "static_ips", "module": "static_ip", "prefix": "static_ip", "args": static_ip_args},
+    {"key": "compute_instances", "module": "compute_instance", "prefix": "compute_instance", "args": compute_instance_args},
+    {"key": "disks", "module": "compute_disk", "prefix": "disk", "args": disk_args},
+    {"key": "bigquery_datasets", "module": "bigquery_dataset", "prefix": "bigquery_dataset", "args": bigquery_dataset_args},
+    {"key": "cloud_functions", "module": "cloud_functions", "prefix": "cloud_function", "args": cloud_function_args},
+    {"key": "gke_clusters", "single_key": "gke", "module": "gke", "prefix": "gke", "args": gke_args},
+    {"key": "cloud_routers", "single_key": "cloud_router", "module": "cloud_router", "prefix": "cloud_router", "args": cloud_router_args},
+    {"key": "cloud_nats", "single_key": "cloud_nat", "module": "cloud_nat", "prefix": "cloud_nat", "args": cloud_nat_args},
+    {"key": "redis_instances", "module": "memorystore_redis", "prefix": "redis", "args": redis_args},
+    {"key": "serverless_vpc_connectors", "module": "serverless_vpc_connector", "prefix": "serverless_vpc_connector", "args": serverless_vpc_connector_args},
+]
+
+def type_items(resources: dict, spec: dict) -> List[dict]:
+    """Return the YAML items for a resource type as a list."""
+    single_key = spec.get("single_key")
+    if single_key:
+        # A single object or a list under the older key (vpc, gke, ...), plus the list under the key
+        items: List[dict] = []
+        if isinstance(resources.get(single_key), list):
+            items.extend([v for v in resources[single_key] if isinstance(v, dict)])
+        elif isinstance(resources.get(single_key), dict):
+            items.append(resources[single_key])
+        if isinstance(resources.get(spec["key"]), list):
+            items.extend([v for v in resources[spec["key"]] if isinstance(v, dict)])
+        return items
+    return list(resources.get(spec["key"]) or [])
+
+def condition_label(condition) -> str:
+    """Title (or, failing that, expression) of an IAM condition; accepts the state's one-element list too."""
+    if isinstance(condition, list):
+        condition = condition[0] if condition else None
+    if not isinstance(condition, dict):
+        return ""
+    return str(condition.get("title") or condition.get("expression") or "")
+
+def item_key(spec: dict, args: dict) -> str:
+    """Stable, name-based key for an item (used as the for_each key and in module names)."""
+    if spec["key"] == "iam":
+        target = args["member"] or ",".join(args["members"]) or args["service"] or "policy"
+        key = f"{args['iam_type']}:{args['role'] or ''}:{target}"
+        # The same role and member may be bound more than once under different conditions
+        condition = condition_label(args["condition"])
+        return f"{key}:{condition}" if condition else key
+    return args.get("name") or args.get("account_id") or args.get("dataset_id")
+
+def module_name(spec: dict, key: str) -> str:
+    """Per-item module name, derived from the item's key so it survives list reordering."""
+    return f"{spec['prefix']}_{re.sub(r'[^A-Za-z0-9_-]', '_', key)}"
+
+def module_address(spec: dict, key: str, for_each: bool) -> str:
+    if for_each:
+        return f"module.{spec['prefix']}[{json.dumps(key)}]"
+    return f"module.{module_name(spec, key)}"
+
+def keyed_items(resources: dict, spec: dict) -> List[tuple]:
+    """Return [(key, args)] for a resource type, rejecting keys that would collide."""
+    result: List[tuple] = []
+    seen_keys: set = set()
+    seen_names: dict = {}
+    for item in type_items(resources, spec):
+        args = spec["args"](item)
+        key = item_key(spec, args)
+        if key in seen_keys:
+            raise ValueError(f"Duplicate {spec['key']} entry '{key}'; names must be unique per resource type")
+        name = module_name(spec, key)
+        if name in seen_names:
+            raise ValueError(f"{spec['key']} entries '{seen_names[name]}' and '{key}' map to the same module name '{name}'")
+        seen_keys.add(key)
+        seen_names[name] = key
+        result.append((key, args))
+    return result
+
+def hcl_block(header: str, attrs: List[tuple]) -> str:
+    """Render `header { k = v ... }` with aligned '=' signs; values are pre-rendered HCL."""
+    width = max(len(k) for k, _ in attrs)
+    lines = [f"{header} {{"]
+    lines.extend(f"  {k.ljust(width)} = {v}" for k, v in attrs)
+    lines.append("}\n")
+    return "\n".join(lines)
+
+def module_block(spec: dict, key: str, args: dict, source: str, deps: List[str]) -> str:
+    attrs = [("source", source), ("project_id", "var.project_id")]
+    attrs.extend((k, json.dumps(v)) for k, v in args.items())
+    if deps:
+        attrs.append(("depends_on", f"[ {', '.join(deps)} ]"))
+    return hcl_block(f"module \"{module_name(spec, key)}\"", attrs)
+
+def build_module_items(data: dict) -> dict:
+    """Return {prefix: {item_key: args}} for every resource type present in the YAML."""
+    resources = data.get("resources", {}) or {}
+    module_items: dict = {}
+    for spec in MODULE_TYPES:
+        keyed = dict(keyed_items(resources, spec))
+        if keyed:
+            module_items[spec["prefix"]] = keyed
+    return module_items
+
+def build_module_blocks(run_dir: str, project_root: str, data: dict, for_each: bool = False) -> str:
+    """Render module blocks for the YAML resources.
+
+    Default mode emits one module block per item, named after the item's key;
+    each block is memoized on the item's arguments, module source and depends_on.
+    With for_each=True a single module call per resource type iterates over
+    var.module_items[<prefix>], which must be written to tfvars (see
+    build_module_items).
+    """
+    resources = data.get("resources", {}) or {}
+    blocks: List[str] = []
+    # Track modules created to wire dependencies
+    subnet_name_to_module: dict = {}
+    vpc_connector_name_to_module: dict = {}
+
+    def mod_source(name: str) -> str:
+        return rel(run_dir, os.path.join(project_root, "modules", name))
+
+    typed_items = [(spec, keyed_items(resources, spec)) for spec in MODULE_TYPES]
+    for spec, items in typed_items:
+        for key, args in items:
+            address = f"module.{spec['prefix']}" if for_each else f"module.{module_name(spec, key)}"
+            if spec["key"] == "subnets":
+                subnet_name_to_module[args["name"]] = address
+            elif spec["key"] == "serverless_vpc_connectors":
+                vpc_connector_name_to_module[args["name"]] = address
+
+    for spec, items in typed_items:
+        if not items:
+            continue
+        # depends_on wiring: VMs wait for their subnets, Cloud Run waits for its connector
+        deps_per_item: List[List[str]] = []
+        for _, args in items:
+            deps: List[str] = []
+            if spec["key"] == "compute_instances" and isinstance(args["subnetwork"], str) and args["subnetwork"] in subnet_name_to_module:
+                deps.append(subnet_name_to_module[args["subnetwork"]])
+            elif spec["key"] == "cloud_run_services" and args["vpc_connector"] in vpc_connector_name_to_module:
+                deps.append(vpc_connector_name_to_module[args["vpc_connector"]])
+            deps_per_item.append(deps)
+
+        source = json.dumps(mod_source(spec["module"]))
+        if for_each:
+            attrs = [
+                ("for_each", f"var.module_items.{spec['prefix']}"),
+                ("source", source),
+                ("project_id", "var.project_id"),
+            ]
+            attrs.extend((k, f"each.value.{k}") for k in items[0][1])
+            deps = sorted({d for item_deps in deps_per_item for d in item_deps})
+            if deps:
+                attrs.append(("depends_on", f"[ {', '.join(deps)} ]"))
+            blocks.append(hcl_block(f"module \"{spec['prefix']}\"", attrs))
+            continue
+
+        for (key, args), deps in zip(items, deps_per_item):
+            blocks.append(memoized(spec["prefix"], args, (source, tuple(deps)),
+                                   lambda: module_block(spec, key, args, source, deps)))
+
+    return "\n".join(blocks)
+
+
+# ---- Inline resources (the GUI's standalone Terraform export) ----
+# One renderer per resource type: (item, position in its list from 1, whether the config has a VPC) -> HCL.
+# Blocks are named by position (vpc_1, bucket_2, ...) and reference google_compute_network.vpc_1 when a VPC exists.
+
+def inline_vpc(vpc: dict, i: int, has_vpc: bool) -> str:
+    name = vpc.get('name', f'vpc-{i}')
+    routing_mode = vpc.get('routing_mode', 'GLOBAL')
+    description = vpc.get('description', 'VPC created via GUI')
+    auto_create = vpc.get('auto_create_subnetworks', False)
+    mtu = vpc.get('mtu', 1460)
+
+    content = f'''resource "google_compute_network" "vpc_{i}" {{
+  name                    = "{name}"
+  auto_create_subnetworks = {str(auto_create).lower()}
+  routing_mode            = "{routing_mode}"
+  description             = "{description}"
+  mtu                     = {mtu}
+'''
+
+    # Advanced options
+    if vpc.get('delete_default_routes_on_create'):
+        content += f'  delete_default_routes_on_create = {str(vpc.get("delete_default_routes_on_create")).lower()}\n'
+
+    if vpc.get('enable_ula_internal_ipv6'):
+        content += f'  enable_ula_internal_ipv6 = {str(vpc.get("enable_ula_internal_ipv6")).lower()}\n'
+        if vpc.get('internal_ipv6_range'):
+            content += f'  internal_ipv6_range = "{vpc.get("internal_ipv6_range")}"\n'
+
+    if vpc.get('network_firewall_policy_enforcement_order') and vpc.get('network_firewall_policy_enforcement_order') != 'AFTER_CLASSIC_FIREWALL':
+        content += f'  network_firewall_policy_enforcement_order = "{vpc.get("network_firewall_policy_enforcement_order")}"\n'
+
+    if vpc.get('network_profile'):
+        content += f'  network_profile = "{vpc.get("network_profile")}"\n'
+
+    content += '}\n\n'
+    return content
+
+def inline_subnet(subnet: dict, i: int, has_vpc: bool) -> str:
+    name = subnet.get('name', f'subnet-{i}')
+    region = subnet.get('region', 'us-central1')
+    network = subnet.get('network', 'default')
+    ip_cidr_range = subnet.get('ip_cidr_range', f'10.0.{i}.0/24')
+
+    content = f'''resource "google_compute_subnetwork" "subnet_{i}" {{
+  name          = "{name}"
+  region        = "{region}"
+  network       = {f'google_compute_network.vpc_1.name' if has_vpc else json.dumps(network)}
+  ip_cidr_range = "{ip_cidr_range}"
+'''
+
+    # Standard options
+    if subnet.get('private_ip_google_access') is not None:
+        content += f'  private_ip_google_access = {str(subnet.get("private_ip_google_access")).lower()}\n'
+
+    if subnet.get('description'):
+        content += f'  description = {json.dumps(subnet.get("description"))}\n'
+
+    if subnet.get('purpose') and subnet.get('purpose') != 'PRIVATE':
+        content += f'  purpose = "{subnet.get("purpose")}"\n'
+
+    if subnet.get('role'):
+        content += f'  role = "{subnet.get("role")}"\n'
+
+    # IPv6 options
+    if subnet.get('stack_type') and subnet.get('stack_type') != 'IPV4_ONLY':
+        content += f'  stack_type = "{subnet.get("stack_type")}"\n'
+
+    if subnet.get('ipv6_access_type'):
+        content += f'  ipv6_access_type = "{subnet.get("ipv6_access_type")}"\n'
+
+    if subnet.get('private_ipv6_google_access'):
+        content += f'  private_ipv6_google_access = "{subnet.get("private_ipv6_google_access")}"\n'
+
+    if subnet.get('external_ipv6_prefix'):
+        content += f'  external_ipv6_prefix = "{subnet.get("external_ipv6_prefix")}"\n'
+
+    # Advanced options
+    if subnet.get('reserved_internal_range'):
+        content += f'  reserved_internal_range = "{subnet.get("reserved_internal_range")}"\n'
+
+    if subnet.get('allow_subnet_cidr_routes_overlap'):
+        content += f'  allow_subnet_cidr_routes_overlap = {str(subnet.get("allow_subnet_cidr_routes_overlap")).lower()}\n'
+
+    # Logging configuration
+    log_config = subnet.get('log_config')
+    if log_config:
+        content += '\n  log_config {\n'
+        content += f'    aggregation_interval = "{log_config.get("aggregation_interval", "INTERVAL_5_SEC")}"\n'
+        content += f'    flow_sampling        = {log_config.get("flow_sampling", 0.5)}\n'
+        content += f'    metadata             = "{log_config.get("metadata", "INCLUDE_ALL_METADATA")}"\n'
+        content += '  }\n'
+
+    content += '}\n\n'
+    return content
+
+def inline_storage_bucket(bucket: dict, i: int, has_vpc: bool) -> str:
+    name = bucket.get('name', f'bucket-{i}')
+    location = bucket.get('location', 'US')
+    force_destroy = bucket.get('force_destroy', False)
+    uniform_access = bucket.get('uniform_bucket_level_access', True)
+    versioning = bucket.get('enable_versioning', False)
+    storage_class = bucket.get('storage_class', 'STANDARD')
+    labels = bucket.get('labels', {})
+
+    content = f'''resource "google_storage_bucket" "bucket_{i}" {{
+  name          = "{name}"
+  location      = "{location}"
+  force_destroy = {str(force_destroy).lower()}
+  storage_class = "{storage_class}"
+
+  uniform_bucket_level_access {{
+    enabled = {str(uniform_access).lower()}
+  }}
+
+  versioning {{
+    enabled = {str(versioning).lower()}
+  }}
+'''
+
+    # Add labels if present
+    if labels:
+        content += '\n  labels = {\n'
+        for key, val in labels.items():
+            content += f'    {key} = "{val}"\n'
+        content += '  }\n'
+
+    content += '}\n\n'
+    return content
+
+def inline_compute_instance(vm: dict, i: int, has_vpc: bool) -> str:
+    # Prepare optional fields
+    desc = vm.get('description')
+    labels = vm.get('labels', {})
+    metadata = vm.get('metadata', {})
+    startup = vm.get('metadata_startup_script')
+    tags = vm.get('tags', [])
+    # Boot disk
+    b_size = vm.get('boot_disk_size_gb')
+    b_type = vm.get('boot_disk_type')
+    b_auto = vm.get('boot_disk_auto_delete', True)
+    b_labels = vm.get('boot_disk_labels', {})
+    # Network
+    net = vm.get('network')
+    sub = vm.get('subnetwork')
+    nip = vm.get('network_ip')
+    assign_eip = vm.get('assign_external_ip', vm.get('create_public_ip', False))
+    eip_tier = vm.get('external_network_tier')
+    # Scheduling
+    preempt = vm.get('scheduling_preemptible')
+    auto_restart = vm.get('scheduling_automatic_restart')
+    ohm = vm.get('scheduling_on_host_maintenance')
+    prov_model = vm.get('scheduling_provisioning_model')
+    # Shielded / Confidential / GPUs
+    enable_display = vm.get('enable_display')
+    enable_shielded = vm.get('enable_shielded_vm')
+    shielded_secure_boot = vm.get('shielded_secure_boot')
+    shielded_vtpm = vm.get('shielded_vtpm')
+    shielded_integrity = vm.get('shielded_integrity_monitoring')
+    enable_conf = vm.get('enable_confidential_compute')
+    conf_type = vm.get('confidential_instance_type')
+    gpus = vm.get('guest_accelerators', [])
+    # SA
+    sa_email = vm.get('service_account_email')
+    sa_scopes = vm.get('service_account_scopes', DEFAULT_VM_SCOPES) or []
+    # Misc
+    allow_stop = vm.get('allow_stopping_for_update', True)
+    can_ip_forward = vm.get('can_ip_forward', False)
+    del_prot = vm.get('deletion_protection', False)
+    hostname = vm.get('hostname')
+    min_cpu = vm.get('min_cpu_platform')
+
+    # Build HCL
+    content = f'''resource "google_compute_instance" "vm_{i}" {{
+  name         = "{vm.get('name', f'vm-{i}')}"
+  zone         = "{vm.get('zone', 'us-central1-a')}"
+  machine_type = "{vm.get('machine_type', 'e2-micro')}"
+'''
+    if desc is not None:
+        content += f"  description  = {json.dumps(desc)}\n"
+    if tags:
+        content += f"  tags         = {json.dumps(tags)}\n"
+    if labels:
+        content += f"  labels       = {json.dumps(labels)}\n"
+    if metadata:
+        content += f"  metadata     = {json.dumps(metadata)}\n"
+    if startup is not None:
+        content += f"  metadata_startup_script = {json.dumps(startup)}\n"
+    if enable_display is not None:
+        content += f"  enable_display = {str(bool(enable_display)).lower()}\n"
+    if can_ip_forward is not None:
+        content += f"  can_ip_forward = {str(bool(can_ip_forward)).lower()}\n"
+    if del_prot is not None:
+        content += f"  deletion_protection = {str(bool(del_prot)).lower()}\n"
+    if hostname is not None:
+        content += f"  hostname = {json.dumps(hostname)}\n"
+    if min_cpu is not None:
+        content += f"  min_cpu_platform = {json.dumps(min_cpu)}\n"
+    if allow_stop is not None:
+        content += f"  allow_stopping_for_update = {str(bool(allow_stop)).lower()}\n"
+
+    # Boot disk
+    content += "\n  boot_disk {\n"
+    if b_auto is not None:
+        content += f"    auto_delete = {str(bool(b_auto)).lower()}\n"
+    content += "    initialize_params {\n"
+    content += f"      image = \"{vm.get('image', 'debian-cloud/debian-11')}\"\n"
+    if b_labels:
+        content += f"      labels = {json.dumps(b_labels)}\n"
+    if b_type is not None:
+        content += f"      type  = {json.dumps(b_type)}\n"
+    if b_size is not None:
+        content += f"      size  = {int(b_size)}\n"
+    content += "    }\n  }\n\n"
+
+    # Network interface
+    content += "  network_interface {\n"
+    if net is not None:
+        content += f"    network = {json.dumps(net)}\n"
+    else:
+        # Fallback to first network example reference if not provided
+        content += "    network = google_compute_network.vpc_1.name\n"
+    if sub is not None:
+        content += f"    subnetwork = {json.dumps(sub)}\n"
+    if nip is not None:
+        content += f"    network_ip = {json.dumps(nip)}\n"
+    if assign_eip:
+        content += "    access_config {\n"
+        if eip_tier is not None:
+            content += f"      network_tier = {json.dumps(eip_tier)}\n"
+        content += "    }\n"
+    content += "  }\n\n"
+
+    # Guest accelerators
+    for ga in gpus or []:
+        t = ga.get('type'); c = ga.get('count')
+        if t and c:
+            content += f"  guest_accelerator {{\n    type = \"{t}\"\n    count = {int(c)}\n  }}\n\n"
+
+    # Shielded VM
+    if enable_shielded:
+        content += "  shielded_instance_config {\n"
+        content += f"    enable_secure_boot = {str(bool(shielded_secure_boot)).lower()}\n"
+        content += f"    enable_vtpm = {str(bool(shielded_vtpm if shielded_vtpm is not None else True)).lower()}\n"
+        content += f"    enable_integrity_monitoring = {str(bool(shielded_integrity if shielded_integrity is not None else True)).lower()}\n"
+        content += "  }\n\n"
+
+    # Confidential compute
+    if enable_conf:
+        content += "  confidential_instance_config {\n"
+        content += "    enable_confidential_compute = true\n"
+        if conf_type:
+            content += f"    confidential_instance_type = {json.dumps(conf_type)}\n"
+        content += "  }\n\n"
+
+    # Service account
+    if sa_email:
+        content += "  service_account {\n"
+        content += f"    email  = {json.dumps(sa_email)}\n"
+        content += f"    scopes = {json.dumps(sa_scopes)}\n"
+        content += "  }\n\n"
+
+    # Scheduling
+    if any(v is not None for v in [preempt, auto_restart, ohm, prov_model]):
+        content += "  scheduling {\n"
+        if preempt is not None:
+            content += f"    preemptible = {str(bool(preempt)).lower()}\n"
+        if auto_restart is not None:
+            content += f"    automatic_restart = {str(bool(auto_restart)).lower()}\n"
+        if ohm is not None:
+            content += f"    on_host_maintenance = {json.dumps(ohm)}\n"
+        if prov_model is not None:
+            content += f"    provisioning_model = {json.dumps(prov_model)}\n"
+        content += "  }\n\n"
+
+    content += "}\n\n"
+    return content
+
+def inline_service_account(sa: dict, i: int, has_vpc: bool) -> str:
+    account_id = sa.get('account_id', f'sa-{i}')
+    display_name = sa.get('display_name', f'Service Account {i}')
+    description = sa.get('description', 'Service account created via GUI')
+    disabled = sa.get('disabled', False)
+
+    content = f'''resource "google_service_account" "sa_{i}" {{
+  account_id   = "{account_id}"
+  display_name = "{display_name}"
+'''
+    if description:
+        content += f'  description  = "{description}"\n'
+    if disabled:
+        content += f'  disabled     = {str(disabled).lower()}\n'
+    content += '}\n\n'
+
+    # Add IAM role bindings for the service account
+    for role_idx, role in enumerate(sa.get('roles', []) or [], 1):
+        content += f'''resource "google_project_iam_member" "sa_{i}_role_{role_idx}" {{
+  project = var.project_id
+  role    = "{role}"
+  member  = "serviceAccount:${{google_service_account.sa_{i}.email}}"
+}}
+
+'''
+
+    # Add service account key if requested
+    if sa.get('create_key', False):
+        content += f'''resource "google_service_account_key" "sa_{i}_key" {{
+  service_account_id = google_service_account.sa_{i}.name
+'''
+        if sa.get('key_algorithm'):
+            content += f'  key_algorithm      = "{sa.get("key_algorithm")}"\n'
+        if sa.get('public_key_type'):
+            content += f'  public_key_type    = "{sa.get("public_key_type")}"\n'
+        if sa.get('private_key_type'):
+            content += f'  private_key_type   = "{sa.get("private_key_type")}"\n'
+        content += '}\n\n'
+
+        # Output for the private key
+        content += f'''output "sa_{i}_private_key" {{
+  value     = google_service_account_key.sa_{i}_key.private_key
+  sensitive = true
+}}
+
+'''
+    return content
+
+def inline_firewall(fw: dict, i: int, has_vpc: bool) -> str:
+    name = fw.get('name', f'firewall-{i}')
+    network = fw.get('network', 'default')
+    direction = fw.get('direction', 'INGRESS')
+    priority = fw.get('priority', 1000)
+    disabled = fw.get('disabled', False)
+    description = fw.get('description', '')
+
+    source_ranges = fw.get('source_ranges', [])
+    source_tags = fw.get('source_tags', [])
+    source_service_accounts = fw.get('source_service_accounts', [])
+    target_tags = fw.get('target_tags', [])
+    target_service_accounts = fw.get('target_service_accounts', [])
+    destination_ranges = fw.get('destination_ranges', [])
+
+    # Get allows from the firewall rule
+    allows = fw.get('allows', [{"protocol": fw.get('protocol', 'tcp'), "ports": fw.get('ports', ['22'])}])
+
+    content = f'''resource "google_compute_firewall" "firewall_{i}" {{
+  name     = "{name}"
+  network  = {f'google_compute_network.vpc_1.name' if has_vpc else json.dumps(network)}
+  direction = "{direction}"
+  priority = {priority}
+'''
+    if disabled:
+        content += f'  disabled = {str(disabled).lower()}\n'
+    if description:
+        content += f'  description = {json.dumps(description)}\n'
+
+    # Add allow blocks
+    for allow in allows:
+        content += '\n  allow {\n'
+        content += f'    protocol = "{allow.get("protocol", "tcp")}"\n'
+        if allow.get('ports'):
+            ports_hcl = json.dumps(allow['ports'])
+            content += f'    ports    = {ports_hcl}\n'
+        content += '  }\n'
+
+    # Add source/target configurations
+    if source_ranges:
+        content += f'\n  source_ranges = {json.dumps(source_ranges)}\n'
+    if source_tags:
+        content += f'  source_tags = {json.dumps(source_tags)}\n'
+    if source_service_accounts:
+        content += f'  source_service_accounts = {json.dumps(source_service_accounts)}\n'
+    if target_tags:
+        content += f'  target_tags = {json.dumps(target_tags)}\n'
+    if target_service_accounts:
+        content += f'  target_service_accounts = {json.dumps(target_service_accounts)}\n'
+    if destination_ranges:
+        content += f'  destination_ranges = {json.dumps(destination_ranges)}\n'
+
+    # Add logging configuration
+    if fw.get('enable_logging'):
+        content += '\n  log_config {\n'
+        content += '    metadata = "INCLUDE_ALL_METADATA"\n'
+        content += '  }\n'
+
+    content += '}\n\n'
+    return content
+
+def inline_cloud_run(cr: dict, i: int, has_vpc: bool) -> str:
+    name = cr.get('name', f'run-{i}')
+    location = cr.get('location', 'us-central1')
+    image = cr.get('image', 'gcr.io/cloudrun/hello')
+
+    content = f'''resource "google_cloud_run_service" "run_{i}" {{
+  name     = "{name}"
+  location = "{location}"
+
+  template {{
+    spec {{
+      containers {{
+        image = "{image}"
+      }}
+    }}
+  }}
+
+  traffic {{
+    percent         = 100
+    latest_revision = true
+  }}
+}}
+
+'''
+    # Add IAM policy for unauthenticated access if requested
+    if cr.get('allow_unauthenticated', False):
+        content += f'''resource "google_cloud_run_service_iam_member" "run_{i}_noauth" {{
+  service  = google_cloud_run_service.run_{i}.name
+  location = google_cloud_run_service.run_{i}.location
+  role     = "roles/run.invoker"
+  member   = "allUsers"
+}}
+
+'''
+    return content
+
+def inline_cloud_sql(sql: dict, i: int, has_vpc: bool) -> str:
+    return f'''resource "google_sql_database_instance" "sql_{i}" {{
+  name             = "{sql.get('name', f'sql-{i}')}"
+  database_version = "{sql.get('database_version', 'POSTGRES_14')}"
+  region           = "{sql.get('region', 'us-central1')}"
+  
+  settings {{
+    tier = "{sql.get('tier', 'db-f1-micro')}"
+  }}
+  
+  deletion_protection = {str(sql.get('deletion_protection', False)).lower()}
+}}
+'''
+
+def inline_pubsub_topic(topic: dict, i: int, has_vpc: bool) -> str:
+    return f'''resource "google_pubsub_topic" "topic_{i}" {{
+  name = "{topic.get('name', f'topic-{i}')}"
+}}
+'''
+
+def inline_secret(secret: dict, i: int, has_vpc: bool) -> str:
+    return f'''resource "google_secret_manager_secret" "secret_{i}" {{
+  secret_id = "{secret.get('name', f'secret-{i}')}"
+  
+  replication {{
+    auto {{
+    }}
+  }}
+}}
+
+resource "google_secret_manager_secret_version" "secret_version_{i}" {{
+  secret = google_secret_manager_secret.secret_{i}.id
+  secret_data = "{secret.get('value', 'dummy-value')}"
+}}
+'''
+
+def inline_bigquery_dataset(dataset: dict, i: int, has_vpc: bool) -> str:
+    return f'''resource "google_bigquery_dataset" "dataset_{i}" {{
+  dataset_id = "{dataset.get('dataset_id', f'dataset-{i}')}"
+  location   = "{dataset.get('location', 'US')}"
+}}
+'''
+
+def inline_artifact_registry(repo: dict, i: int, has_vpc: bool) -> str:
+    return f'''resource "google_artifact_registry_repository" "repo_{i}" {{
+  location      = "{repo.get('location', 'us')}"
+  repository_id = "{repo.get('name', f'repo-{i}')}"
+  description   = "{repo.get('description', 'Repository created via GUI')}"
+  format        = "{repo.get('format', 'DOCKER')}"
+}}
+'''
+
+def inline_dns_zone(zone: dict, i: int, has_vpc: bool) -> str:
+    return f'''resource "google_dns_managed_zone" "zone_{i}" {{
+  name        = "{zone.get('name', f'zone-{i}')}"
+  dns_name    = "{zone.get('dns_name', 'example.com.')}"
+  description = "{zone.get('description', 'DNS zone created via GUI')}"
+}}
+'''
+
+def inline_cloud_function(func: dict, i: int, has_vpc: bool) -> str:
+    name = func.get('name', f'function-{i}')
+    runtime = func.get('runtime', 'python39')
+    entry_point = func.get('entry_point', 'hello_world')
+    source_archive_bucket = func.get('source_archive_bucket', 'my-bucket')
+    source_archive_object = func.get('source_archive_object', 'function-source.zip')
+
+    return f'''resource "google_cloudfunctions_function" "function_{i}" {{
+  name        = "{name}"
+  runtime     = "{runtime}"
+  entry_point = "{entry_point}"
+
+  source_archive_bucket = "{source_archive_bucket}"
+  source_archive_object = "{source_archive_object}"
+
+  trigger_http = true
+  available_memory_mb = {func.get('memory', 256)}
+}}
+
+'''
+
+def inline_static_ip(ip: dict, i: int, has_vpc: bool) -> str:
+    name = ip.get('name', f'static-ip-{i}')
+    region = ip.get('region', 'us-central1')
+    address_type = ip.get('address_type', 'EXTERNAL')
+
+    return f'''resource "google_compute_address" "static_ip_{i}" {{
+  name         = "{name}"
+  region       = "{region}"
+  address_type = "{address_type}"
+}}
+
+'''
+
+def inline_disk(disk: dict, i: int, has_vpc: bool) -> str:
+    name = disk.get('name', f'disk-{i}')
+    zone = disk.get('zone', 'us-central1-a')
+    disk_type = disk.get('type', 'pd-standard')
+    size = disk.get('size', 10)
+
+    return f'''resource "google_compute_disk" "disk_{i}" {{
+  name = "{name}"
+  zone = "{zone}"
+  type = "{disk_type}"
+  size = {size}
+}}
+
+'''
+
+def inline_redis(redis: dict, i: int, has_vpc: bool) -> str:
+    name = redis.get('name', f'redis-{i}')
+    region = redis.get('region', 'us-central1')
+    memory_size_gb = redis.get('memory_size_gb', 1)
+    tier = redis.get('tier', 'BASIC')
+
+    return f'''resource "google_redis_instance" "redis_{i}" {{
+  name           = "{name}"
+  region         = "{region}"
+  memory_size_gb = {memory_size_gb}
+  tier           = "{tier}"
+}}
+
+'''
+
+def inline_serverless_vpc_connector(conn: dict, i: int, has_vpc: bool) -> str:
+    name = conn.get('name', f'vpc-connector-{i}')
+    region = conn.get('region', 'us-central1')
+    ip_cidr_range = conn.get('ip_cidr_range', '10.8.0.0/28')
+    network = conn.get('network', 'default')
+
+    return f'''resource "google_vpc_access_connector" "connector_{i}" {{
+  name          = "{name}"
+  region        = "{region}"
+  ip_cidr_range = "{ip_cidr_range}"
+  network       = "{network}"
+}}
+
+'''
+
+def inline_gke(gke: dict, i: int, has_vpc: bool) -> str:
+    name = gke.get('name', f'gke-cluster-{i}')
+    location = gke.get('location', 'us-central1')
+    node_count = gke.get('node_count', 1)
+    machine_type = gke.get('machine_type', 'e2-standard-2')
+
+    return f'''resource "google_container_cluster" "gke_{i}" {{
+  name     = "{name}"
+  location = "{location}"
+
+  remove_default_node_pool = true
+  initial_node_count       = 1
+}}
+
+resource "google_container_node_pool" "gke_{i}_nodes" {{
+  name       = "default-pool"
+  location   = "{location}"
+  cluster    = google_container_cluster.gke_{i}.name
+  node_count = {node_count}
+
+  node_config {{
+    machine_type = "{machine_type}"
+  }}
+}}
+
+'''
+
+def inline_cloud_router(router: dict, i: int, has_vpc: bool) -> str:
+    name = router.get('name', f'router-{i}')
+    region = router.get('region', 'us-central1')
+    network = router.get('network', 'default')
+
+    return f'''resource "google_compute_router" "router_{i}" {{
+  name    = "{name}"
+  region  = "{region}"
+  network = {f'google_compute_network.vpc_1.name' if has_vpc else json.dumps(network)}
+}}
+
+'''
+
+def inline_cloud_nat(nat: dict, i: int, has_vpc: bool) -> str:
+    name = nat.get('name', f'nat-{i}')
+    region = nat.get('region', 'us-central1')
+
+    return f'''resource "google_compute_router_nat" "nat_{i}" {{
+  name   = "{name}"
+  region = "{region}"
+  router = google_compute_router.router_1.name
+
+  nat_ip_allocate_option = "AUTO_ONLY"
+  source_subnetwork_ip_ranges_to_nat = "ALL_SUBNETWORKS_ALL_IP_RANGES"
+}}
+
+'''
+
+def inline_iam_condition(condition) -> str:
+    if not (condition and condition.get('title')):
+        return ''
+    content = '\n  condition {\n'
+    content += f'    title       = {json.dumps(condition.get("title"))}\n'
+    content += f'    description = {json.dumps(condition.get("description", ""))}\n'
+    content += f'    expression  = {json.dumps(condition.get("expression"))}\n'
+    content += '  }\n'
+    return content
+
+def inline_iam(iam: dict, i: int, has_vpc: bool) -> str:
+    iam_type = iam.get('iam_type', 'member')
+
+    if iam_type == 'member':
+        # Single member binding
+        role = iam.get('role', 'roles/viewer')
+        member = iam.get('member', 'user:example@domain.com')
+        return f'''resource "google_project_iam_member" "iam_member_{i}" {{
+  project = var.project_id
+  role    = "{role}"
+  member  = "{member}"
+''' + inline_iam_condition(iam.get('condition')) + '}\n\n'
+
+    if iam_type == 'binding':
+        # Multiple members for a role
+        role = iam.get('role', 'roles/viewer')
+        members = iam.get('members', [])
+        if not members:
+            return ''
+        return f'''resource "google_project_iam_binding" "iam_binding_{i}" {{
+  project = var.project_id
+  role    = "{role}"
+  members = {json.dumps(members)}
+''' + inline_iam_condition(iam.get('condition')) + '}\n\n'
+
+    if iam_type == 'policy':
+        # Full policy data
+        policy_data = iam.get('policy_data')
+        if policy_data:
+            return f'''resource "google_project_iam_policy" "iam_policy_{i}" {{
+  project     = var.project_id
+  policy_data = {json.dumps(policy_data)}
+}}
+
+'''
+    return ''
+
+# Resource types in inline render order: (resources key, renderer). Items are read with
+# type_items(), so the single-object keys (vpc, gke, cloud_router, cloud_nat) render too.
+INLINE_TYPES: List[Tuple[str, Callable[[dict, int, bool], str]]] = [
+    ("vpcs", inline_vpc),
+    ("subnets", inline_subnet),
+    ("storage_buckets", inline_storage_bucket),
+    ("compute_instances", inline_compute_instance),
+    ("service_accounts", inline_service_account),
+    ("firewall_rules", inline_firewall),
+    ("cloud_run_services", inline_cloud_run),
+    ("cloud_sql_instances", inline_cloud_sql),
+    ("pubsub_topics", inline_pubsub_topic),
+    ("secrets", inline_secret),
+    ("bigquery_datasets", inline_bigquery_dataset),
+    ("artifact_repos", inline_artifact_registry),
+    ("dns_zones", inline_dns_zone),
+    ("cloud_functions", inline_cloud_function),
+    ("static_ips", inline_static_ip),
+    ("disks", inline_disk),
+    ("redis_instances", inline_redis),
+    ("serverless_vpc_connectors", inline_serverless_vpc_connector),
+    ("gke_clusters", inline_gke),
+    ("cloud_routers", inline_cloud_router),
+    ("cloud_nats", inline_cloud_nat),
+    ("iam", inline_iam),
+]
+
+def inline_resources(resources: dict) -> str:
+    """Inline resource blocks (no modules) for the YAML resources, as in the GUI's standalone export."""
+    resources = resources or {}
+    specs = {spec["key"]: spec for spec in MODULE_TYPES}
+    has_vpc = bool(type_items(resources, specs["vpcs"]))
+    blocks: List[str] = []
+    for key, renderer in INLINE_TYPES:
+        for i, item in enumerate(type_items(resources, specs[key]), 1):
+            blocks.append(memoized(f"inline:{key}", item, (i, has_vpc), lambda: renderer(item, i, has_vpc)))
+    return "".join(blocks)
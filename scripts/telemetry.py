@@ -0,0 +1,425 @@
+#for usage import from deploy.py/destroy.py (or the GUI); metrics land in .tf-runs/.metrics/<script>.prom
+import atexit
+import contextlib
+import itertools
+import json
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: runs are not expected to overlap there
+    fcntl = None
+
+METRIC_PREFIX = "gcp_provision"
+DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+TOOLS = ("terraform", "gcloud")
+# OTLP enums: SPAN_KIND_INTERNAL, STATUS_CODE_OK / STATUS_CODE_ERROR
+SPAN_KIND_INTERNAL = 1
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+def project_root() -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def metrics_dir() -> str:
+    return os.path.join(project_root(), ".tf-runs", ".metrics")
+
+def textfile_dir() -> str:
+    """Where the .prom file goes: PROM_TEXTFILE_DIR (node_exporter --collector.textfile.directory) or .tf-runs/.metrics."""
+    return os.environ.get("PROM_TEXTFILE_DIR", "").strip() or metrics_dir()
+
+def trace_dir() -> str:
+    """Where OTLP JSON trace files go: OTLP_TRACE_DIR or .tf-runs/.traces."""
+    return os.environ.get("OTLP_TRACE_DIR", "").strip() or os.path.join(project_root(), ".tf-runs", ".traces")
+
+def parse_traceparent(value: str) -> Optional[tuple]:
+    """Return (trace_id, parent_span_id) from a W3C traceparent header value, or None."""
+    parts = (value or "").strip().split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return parts[1], parts[2]
+    return None
+
+def otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def otlp_attributes(attributes: dict) -> List[dict]:
+    return [{"key": k, "value": otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+def tool_name(cmd: List[str]) -> str:
+    base = os.path.basename(str(cmd[0])).lower()
+    for ext in (".exe", ".cmd", ".bat"):
+        if base.endswith(ext):
+            base = base[:-len(ext)]
+    return base
+
+class Recorder:
+    """Collects one invocation's measurements; flush() folds them into the cumulative textfile
+    and writes the invocation's spans as one OTLP JSON trace file.
+
+    Counters and histograms accumulate across runs in <script>.state.json (the
+    textfile collector only ever sees the latest file), gauges describe the last run.
+    Spans nest per thread under a root span for the invocation; a TRACEPARENT
+    environment variable (set by the GUI) makes that root a child of the caller's span.
+    """
+
+    def __init__(self, script: str, root_name: Optional[str] = None, traceparent: Optional[str] = None):
+        self.script = script
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.phases: List[tuple] = []
+        self.results: Dict[tuple, int] = {}
+        self.retries: Dict[str, int] = {}
+        self.resources: Dict[tuple, int] = {}
+        self.tool_seconds: Dict[str, float] = {}
+        self.flushed = False
+
+        parent = parse_traceparent(traceparent if traceparent is not None else os.environ.get("TRACEPARENT", ""))
+        self.trace_id = parent[0] if parent else secrets.token_hex(16)
+        self.spans: List[dict] = []
+        self.local = threading.local()
+        self.root = self.new_span(root_name or script, parent[1] if parent else "",
+                                  {"script": script, "process.pid": os.getpid(), "process.command_args": " ".join(sys.argv)})
+
+    def new_span(self, name: str, parent_span_id: str, attributes: Optional[dict] = None) -> dict:
+        return {"name": name, "spanId": secrets.token_hex(8), "parentSpanId": parent_span_id,
+                "start": time.time_ns(), "end": None, "attributes": dict(attributes or {}), "status": {"code": STATUS_OK}}
+
+    def stack(self) -> List[dict]:
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def current_span(self) -> dict:
+        stack = self.stack()
+        return stack[-1] if stack else self.root
+
+    def traceparent(self) -> str:
+        """W3C traceparent for the current span, for passing to child processes."""
+        return f"00-{self.trace_id}-{self.current_span()['spanId']}-01"
+
+    @contextlib.contextmanager
+    def span(self, name: str, attributes: Optional[dict] = None) -> Iterator[dict]:
+        span = self.new_span(name, self.current_span()["spanId"], attributes)
+        stack = self.stack()
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            if not (isinstance(e, SystemExit) and e.code in (0, None)):
+                span["status"] = {"code": STATUS_ERROR, "message": f"{type(e).__name__}: {e}"}
+            raise
+        finally:
+            stack.pop()
+            span["end"] = time.time_ns()
+            with self.lock:
+                self.spans.append(span)
+
+    def set_attributes(self, attributes: dict) -> None:
+        self.current_span()["attributes"].update(attributes)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            with self.span(name, {"phase": name}):
+                yield
+        finally:
+            with self.lock:
+                self.phases.append((name, time.perf_counter() - started))
+
+    @contextlib.contextmanager
+    def project(self, project_id: str) -> Iterator[None]:
+        """Count the enclosed work as one success or failure for project_id."""
+        try:
+            with self.span(f"project {project_id}", {"project.id": project_id}):
+                yield
+        except BaseException:
+            self.result(project_id, "failure")
+            raise
+        self.result(project_id, "success")
+
+    def result(self, project_id: str, result: str) -> None:
+        with self.lock:
+            key = (project_id, result)
+            self.results[key] = self.results.get(key, 0) + 1
+
+    def retry(self, phase: str) -> None:
+        with self.lock:
+            self.retries[phase] = self.retries.get(phase, 0) + 1
+
+    def resource_counts(self, project_id: str, counts: Dict[str, int]) -> None:
+        with self.lock:
+            for resource_type, count in counts.items():
+                self.resources[(project_id, resource_type)] = count
+        self.set_attributes({f"resources.{t}": n for t, n in counts.items()})
+        self.set_attributes({"resources.total": sum(counts.values())})
+
+    def run(self, cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+        """subprocess.run, with the wall time charged to the tool (terraform, gcloud, ...) and a span per call."""
+        tool = tool_name(cmd)
+        # Span name is the tool plus up to two leading subcommand words ("terraform state list",
+        # "gcloud projects describe"); flags and the full command line go in attributes
+        subcommand = " ".join(itertools.islice(itertools.takewhile(lambda a: not a.startswith("-"), map(str, cmd[1:])), 2))
+        attributes = {"process.executable.name": tool, "process.command_args": " ".join(str(a) for a in cmd)}
+        if kwargs.get("cwd"):
+            attributes["process.working_directory"] = str(kwargs["cwd"])
+        started = time.perf_counter()
+        with self.span(f"{tool} {subcommand}".strip(), attributes) as span:
+            try:
+                result = subprocess.run(cmd, **kwargs)
+                span["attributes"]["process.exit_code"] = result.returncode
+                if result.returncode != 0:
+                    span["status"] = {"code": STATUS_ERROR, "message": f"exit code {result.returncode}"}
+                return result
+            except subprocess.CalledProcessError as e:
+                span["attributes"]["process.exit_code"] = e.returncode
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                with self.lock:
+                    self.tool_seconds[tool] = self.tool_seconds.get(tool, 0.0) + elapsed
+
+    def subprocess_calls(self, since_ns: int = 0) -> List[dict]:
+        """Finished subprocess spans started at or after since_ns, oldest first."""
+        with self.lock:
+            spans = [sp for sp in self.spans if "process.executable.name" in sp["attributes"] and sp["start"] >= since_ns]
+        return [{
+            "tool": sp["attributes"]["process.executable.name"],
+            "command": sp["attributes"]["process.command_args"],
+            "exit_code": sp["attributes"].get("process.exit_code"),
+            "seconds": (sp["end"] - sp["start"]) / 1e9,
+        } for sp in sorted(spans, key=lambda sp: sp["start"])]
+
+    def flush(self) -> Dict[str, str]:
+        """Merge this run into the cumulative metrics, rewrite <script>.prom and write the trace file.
+
+        Returns the written paths keyed by "metrics" and "trace" (empty if already flushed).
+        """
+        with self.lock:
+            if self.flushed:
+                return {}
+            self.flushed = True
+            wall = time.perf_counter() - self.started
+            self.root["end"] = time.time_ns()
+            spans = [self.root] + self.spans
+        os.makedirs(metrics_dir(), exist_ok=True)
+        state_path = os.path.join(metrics_dir(), f"{self.script}.state.json")
+        with open(state_path + ".lock", "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            state = load_state(state_path)
+            self.merge(state, wall)
+            write_atomic(state_path, json.dumps(state, indent=2, sort_keys=True))
+            prom_dir = textfile_dir()
+            os.makedirs(prom_dir, exist_ok=True)
+            prom_path = os.path.join(prom_dir, f"{self.script}.prom")
+            write_atomic(prom_path, render_textfile(self.script, state))
+        return {"metrics": prom_path, "trace": self.write_trace(spans)}
+
+    def write_trace(self, spans: List[dict]) -> str:
+        """Write spans as an OTLP/JSON ExportTraceServiceRequest, one file per invocation."""
+        now = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        out_dir = trace_dir()
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, f"{self.script}-{now}-{self.trace_id[:8]}.json")
+        otlp_spans = []
+        for span in spans:
+            entry = {
+                "traceId": self.trace_id,
+                "spanId": span["spanId"],
+                "name": span["name"],
+                "kind": SPAN_KIND_INTERNAL,
+                "startTimeUnixNano": str(span["start"]),
+                # Spans still open at exit (e.g. a thread killed mid-run) end with the root
+                "endTimeUnixNano": str(span["end"] or self.root["end"]),
+                "attributes": otlp_attributes(span["attributes"]),
+                "status": span["status"],
+            }
+            if span["parentSpanId"]:
+                entry["parentSpanId"] = span["parentSpanId"]
+            otlp_spans.append(entry)
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": otlp_attributes({"service.name": f"gcp-provision-{self.script}"})},
+            "scopeSpans": [{"scope": {"name": "scripts.telemetry"}, "spans": otlp_spans}],
+        }]}
+        write_atomic(path, json.dumps(payload))
+        return path
+
+    def merge(self, state: dict, wall: float) -> None:
+        histograms = state.setdefault("phase_duration", {})
+        for name, seconds in self.phases:
+            h = histograms.setdefault(name, {"buckets": [0] * len(DURATION_BUCKETS), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    h["buckets"][i] += 1
+            h["sum"] += seconds
+            h["count"] += 1
+        results = state.setdefault("project_runs", {})
+        for (project_id, result), n in self.results.items():
+            key = f"{project_id}|{result}"
+            results[key] = results.get(key, 0) + n
+        retries = state.setdefault("retries", {})
+        for name, n in self.retries.items():
+            retries[name] = retries.get(name, 0) + n
+        tools = state.setdefault("subprocess_seconds", {})
+        for tool, seconds in self.tool_seconds.items():
+            tools[tool] = tools.get(tool, 0.0) + seconds
+        state["run_seconds"] = state.get("run_seconds", 0.0) + wall
+        state["runs"] = state.get("runs", 0) + 1
+
+        # Gauges describe the latest run only
+        if self.resources:
+            state["resources"] = {f"{p}|{t}": n for (p, t), n in self.resources.items()}
+        subprocess_total = sum(self.tool_seconds.values())
+        known = {tool: self.tool_seconds.get(tool, 0.0) for tool in TOOLS}
+        last = {tool: round(seconds, 3) for tool, seconds in known.items()}
+        last["other_subprocess"] = round(subprocess_total - sum(known.values()), 3)
+        # With concurrent projects subprocess time is summed across threads and can exceed wall time
+        last["orchestration"] = round(max(0.0, wall - subprocess_total), 3)
+        state["last_run"] = {"seconds": last, "wall": round(wall, 3), "timestamp": time.time()}
+
+def load_state(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def write_atomic(path: str, content: str) -> None:
+    # The textfile collector may read at any moment; never let it see a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def labels(**kv) -> str:
+    return "{" + ",".join(f'{k}="{label_value(v)}"' for k, v in kv.items()) + "}"
+
+def render_textfile(script: str, state: dict) -> str:
+    p = METRIC_PREFIX
+    lines: List[str] = []
+
+    def header(name: str, kind: str, help_text: str) -> None:
+        lines.append(f"# HELP {p}_{name} {help_text}")
+        lines.append(f"# TYPE {p}_{name} {kind}")
+
+    header("phase_duration_seconds", "histogram", "Duration of each deploy/destroy phase.")
+    for phase, h in sorted(state.get("phase_duration", {}).items()):
+        for bound, count in zip(DURATION_BUCKETS, h["buckets"]):
+            lines.append(f"{p}_phase_duration_seconds_bucket{labels(script=script, phase=phase, le=bound)} {count}")
+        lines.append(f"{p}_phase_duration_seconds_bucket{labels(script=script, phase=phase, le='+Inf')} {h['count']}")
+        lines.append(f"{p}_phase_duration_seconds_sum{labels(script=script, phase=phase)} {h['sum']:.3f}")
+        lines.append(f"{p}_phase_duration_seconds_count{labels(script=script, phase=phase)} {h['count']}")
+
+    header("project_runs_total", "counter", "Per-project runs by result (success/failure).")
+    for key, n in sorted(state.get("project_runs", {}).items()):
+        project_id, result = key.rsplit("|", 1)
+        lines.append(f"{p}_project_runs_total{labels(script=script, project=project_id, result=result)} {n}")
+
+    header("retries_total", "counter", "Retried Terraform/gcloud steps by phase.")
+    for phase, n in sorted(state.get("retries", {}).items()):
+        lines.append(f"{p}_retries_total{labels(script=script, phase=phase)} {n}")
+
+    header("subprocess_seconds_total", "counter", "Wall time spent in external tools.")
+    for tool, seconds in sorted(state.get("subprocess_seconds", {}).items()):
+        lines.append(f"{p}_subprocess_seconds_total{labels(script=script, tool=tool)} {seconds:.3f}")
+
+    header("run_seconds_total", "counter", "Total wall time of all invocations.")
+    lines.append(f"{p}_run_seconds_total{labels(script=script)} {state.get('run_seconds', 0.0):.3f}")
+    header("runs_total", "counter", "Number of invocations.")
+    lines.append(f"{p}_runs_total{labels(script=script)} {state.get('runs', 0)}")
+
+    if state.get("resources"):
+        header("resources", "gauge", "Resources in the last rendered config, by project and type.")
+        for key, n in sorted(state["resources"].items()):
+            project_id, resource_type = key.rsplit("|", 1)
+            lines.append(f"{p}_resources{labels(script=script, project=project_id, type=resource_type)} {n}")
+
+    last = state.get("last_run")
+    if last:
+        header("last_run_seconds", "gauge", "Last invocation's wall time split into tool time and orchestration overhead.")
+        for component, seconds in sorted(last["seconds"].items()):
+            lines.append(f"{p}_last_run_seconds{labels(script=script, component=component)} {seconds}")
+        header("last_run_timestamp_seconds", "gauge", "Unix time the last invocation finished.")
+        lines.append(f"{p}_last_run_timestamp_seconds{labels(script=script)} {last['timestamp']:.0f}")
+    return "\n".join(lines) + "\n"
+
+# The invocation-wide recorder used by the CLI scripts; library callers without one record nothing
+_current: Optional[Recorder] = None
+
+def start(script: str) -> Recorder:
+    """Begin recording for this process; metrics and the trace are flushed automatically at exit."""
+    global _current
+    _current = Recorder(script)
+    atexit.register(_flush_at_exit, _current)
+    return _current
+
+def _flush_at_exit(recorder: Recorder) -> None:
+    try:
+        paths = recorder.flush()
+        if paths:
+            print(f"[INFO] Metrics written -> {paths['metrics']}")
+            print(f"[INFO] Trace written -> {paths['trace']}")
+    except Exception as e:
+        print(f"[WARN] Could not write metrics/trace: {e}")
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    if _current is None:
+        yield
+        return
+    with _current.phase(name):
+        yield
+
+@contextlib.contextmanager
+def project(project_id: str) -> Iterator[None]:
+    if _current is None:
+        yield
+        return
+    with _current.project(project_id):
+        yield
+
+def retry(phase_name: str) -> None:
+    if _current is not None:
+        _current.retry(phase_name)
+
+def resource_counts(project_id: str, counts: Dict[str, int]) -> None:
+    if _current is not None:
+        _current.resource_counts(project_id, counts)
+
+def run(cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+    if _current is None:
+        return subprocess.run(cmd, **kwargs)
+    return _current.run(cmd, **kwargs)
+
+@contextlib.contextmanager
+def span(name: str, attributes: Optional[dict] = None) -> Iterator[Optional[dict]]:
+    if _current is None:
+        yield None
+        return
+    with _current.span(name, attributes) as current:
+        yield current
+
+def set_attributes(attributes: dict) -> None:
+    if _current is not None:
+        _current.set_attributes(attributes)
+
+def subprocess_calls(since_ns: int = 0) -> List[dict]:
+    return _current.subprocess_calls(since_ns) if _current is not None else []
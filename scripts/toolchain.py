@@ -0,0 +1,177 @@
+#for usage python scripts/toolchain.py [--refresh]  (also imported by deploy.py, destroy.py, drift_scan.py and the GUI)
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Version probes are slow (gcloud --version takes seconds on Windows), so results are kept in
+# .tf-runs/.toolchain.json and in-process, and only re-probed when PATH, the override env var,
+# or the binary itself (mtime/size) changes.
+CACHE_VERSION = 1
+ENV_OVERRIDES = {"gcloud": "GCLOUD_BIN", "terraform": "TERRAFORM_BIN"}
+PROBE_TIMEOUT = {"gcloud": 30, "terraform": 20}
+
+_memo: Dict[str, dict] = {}
+_lock = threading.Lock()
+
+def cache_path() -> str:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, ".tf-runs", ".toolchain.json")
+
+def candidates(tool: str) -> List[str]:
+    """Places to look for a tool, in order: override env var, PATH, common Windows installs."""
+    found: List[str] = []
+    override = os.environ.get(ENV_OVERRIDES[tool], "").strip().strip('"')
+    if override:
+        found.append(override)
+    on_path = shutil.which(tool)
+    if on_path:
+        found.append(on_path)
+    if tool == "gcloud":
+        user = os.getenv("USERNAME", "")
+        found.extend([
+            r"C:\Program Files\Google\Cloud SDK\google-cloud-sdk\bin\gcloud.cmd",
+            r"C:\Program Files\Google\Cloud SDK\google-cloud-sdk\bin\gcloud.exe",
+            r"C:\Program Files (x86)\Google\Cloud SDK\google-cloud-sdk\bin\gcloud.cmd",
+            r"C:\Program Files (x86)\Google\Cloud SDK\google-cloud-sdk\bin\gcloud.exe",
+            rf"C:\Users\{user}\AppData\Local\Google\Cloud SDK\google-cloud-sdk\bin\gcloud.cmd",
+            rf"C:\Users\{user}\AppData\Local\Google\Cloud SDK\google-cloud-sdk\bin\gcloud",
+        ])
+    else:
+        found.extend([
+            r"C:\terraform\terraform.exe",
+            r"C:\Program Files\Terraform\terraform.exe",
+            r"C:\ProgramData\chocolatey\bin\terraform.exe",
+        ])
+    return found
+
+def locate(tool: str) -> str:
+    for path in candidates(tool):
+        if os.path.isfile(path):
+            return path
+    return ""
+
+def fingerprint(tool: str, path: str) -> dict:
+    """What a cached probe is valid for; any change means the binary or its lookup may have changed."""
+    stat = os.stat(path) if path else None
+    return {
+        "PATH": os.environ.get("PATH", ""),
+        "override": os.environ.get(ENV_OVERRIDES[tool], ""),
+        "path": path,
+        "mtime": stat.st_mtime if stat else None,
+        "size": stat.st_size if stat else None,
+    }
+
+def version_tuple(version: str) -> tuple:
+    parts = []
+    for piece in version.lstrip("v").split("."):
+        digits = "".join(c for c in piece if c.isdigit())
+        parts.append(int(digits) if digits else 0)
+    return tuple(parts)
+
+def probe_terraform(path: str) -> dict:
+    result = subprocess.run([path, "version", "-json"], capture_output=True, text=True, timeout=PROBE_TIMEOUT["terraform"])
+    version = json.loads(result.stdout).get("terraform_version", "") if result.returncode == 0 else ""
+    v = version_tuple(version) if version else ()
+    return {
+        "version": version,
+        "capabilities": {
+            "moved_blocks": v >= (1, 1),
+            "import_blocks": v >= (1, 5),
+            "refresh_only": v >= (0, 15, 4),
+            "module_for_each": v >= (0, 13),
+        },
+    }
+
+def probe_gcloud(path: str) -> dict:
+    result = subprocess.run([path, "version", "--format=json"], capture_output=True, text=True, timeout=PROBE_TIMEOUT["gcloud"])
+    components = json.loads(result.stdout) if result.returncode == 0 and result.stdout.strip() else {}
+    return {
+        "version": components.get("Google Cloud SDK", ""),
+        # destroy.py's billing unlink needs the beta component
+        "capabilities": {"beta": "beta" in components},
+    }
+
+PROBES = {"gcloud": probe_gcloud, "terraform": probe_terraform}
+
+def load_cache() -> dict:
+    try:
+        with open(cache_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) and data.get("version") == CACHE_VERSION else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(tool: str, info: dict) -> None:
+    cache = load_cache()
+    cache["version"] = CACHE_VERSION
+    cache.setdefault("tools", {})[tool] = info
+    path = cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # a read-only checkout still gets the in-process memo
+
+def resolve(tool: str, refresh: bool = False) -> dict:
+    """Return {"tool", "path", "version", "capabilities", "probed_at"} for gcloud or terraform.
+
+    path is "" when the tool is not found. Locating is cheap (stat calls) and happens on every
+    call; the version probe only runs when the fingerprint differs from the cached one.
+    """
+    if tool not in PROBES:
+        raise ValueError(f"Unknown tool: {tool}")
+    with _lock:
+        path = locate(tool)
+        current = fingerprint(tool, path)
+        if not refresh:
+            cached = _memo.get(tool) or load_cache().get("tools", {}).get(tool)
+            if cached and cached.get("fingerprint") == current:
+                _memo[tool] = cached
+                return cached
+        info = {"tool": tool, "path": path, "version": "", "capabilities": {}, "fingerprint": current,
+                "probed_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        if path:
+            try:
+                info.update(PROBES[tool](path))
+            except (OSError, ValueError, subprocess.TimeoutExpired) as e:
+                info["error"] = f"{type(e).__name__}: {e}"
+        _memo[tool] = info
+        save_cache(tool, info)
+        return info
+
+def command(tool: str) -> str:
+    """Executable to run for a tool: the resolved path, or the bare name so the OS error is the usual one."""
+    return resolve(tool)["path"] or tool
+
+def has_capability(tool: str, capability: str) -> Optional[bool]:
+    """True/False from the probe, or None when the tool or its version is unknown."""
+    info = resolve(tool)
+    if not info["version"]:
+        return None
+    return info["capabilities"].get(capability)
+
+def main():
+    parser = argparse.ArgumentParser(description="Show (and cache) the gcloud/terraform binaries the scripts will use.")
+    parser.add_argument("--refresh", action="store_true", help="Re-probe versions even if the cache is still valid")
+    args = parser.parse_args(sys.argv[1:])
+    for tool in ("terraform", "gcloud"):
+        info = resolve(tool, refresh=args.refresh)
+        if not info["path"]:
+            print(f"[WARN] {tool}: not found (set {ENV_OVERRIDES[tool]} or add it to PATH)")
+            continue
+        caps = ", ".join(f"{k}={'yes' if v else 'no'}" for k, v in sorted(info["capabilities"].items()))
+        print(f"[INFO] {tool} {info['version'] or '(version unknown)'} at {info['path']} [{caps}] (probed {info['probed_at']})")
+        if info.get("error"):
+            print(f"[WARN]   probe error: {info['error']}")
+
+if __name__ == "__main__":
+    main()